@@ -0,0 +1,148 @@
+"""
+Replay a long scripted call and compare the context the LLM gets each turn with the
+whole history against `ContextCompactor`'s window, summary and token cap.
+
+Prompt tokens are estimated like the compactor does (four characters per token). Time
+to first token is modelled as `--ttft` seconds plus `--ms-per-1k` milliseconds per
+thousand prompt tokens, so the TTFT columns show how the prompt size alone moves it. The
+summarizer is a stand-in that answers with a fixed-size summary; its request runs
+between turns, like while the user speaks. The cached column is the share of the
+compacted prompt that repeats the previous request's prefix, which is what a provider
+prompt cache can serve.
+
+    uv run python devtools/bench_context.py --turns 80 --window 6 --max-tokens 3000
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Never
+
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions, NotGivenOr, llm
+from livekit.agents.types import NOT_GIVEN
+
+from shared.context_compaction import ContextCompactor, estimate_tokens
+
+INSTRUCTIONS = "You are Lyra, a voice assistant that helps people find programming paths. " * 20
+SUMMARY = "Ana wants to learn backend development, prefers Python, studies evenings. " * 6
+
+
+class SummaryLLM(llm.LLM[Never]):
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools: list[llm.FunctionTool | llm.RawFunctionTool] | None = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        parallel_tool_calls: NotGivenOr[bool] = NOT_GIVEN,
+        tool_choice: NotGivenOr[llm.ToolChoice] = NOT_GIVEN,
+        extra_kwargs: NotGivenOr[dict[str, Any]] = NOT_GIVEN,
+    ) -> llm.LLMStream:
+        return SummaryStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class SummaryStream(llm.LLMStream):
+    async def _run(self) -> None:
+        self._event_ch.send_nowait(
+            llm.ChatChunk(id="bench", delta=llm.ChoiceDelta(content=SUMMARY))
+        )
+
+
+def _key(item: llm.ChatItem) -> tuple[str, str]:
+    if isinstance(item, llm.ChatMessage):
+        return item.role, item.text_content or ""
+    return item.type, item.id
+
+
+def shared_prefix(previous: list[llm.ChatItem], items: list[llm.ChatItem]) -> int:
+    """Tokens at the start of `items` identical to the start of `previous`."""
+    tokens = 0
+    for before, item in zip(previous, items, strict=False):
+        if _key(before) != _key(item):
+            break
+        tokens += estimate_tokens(item)
+    return tokens
+
+
+def add_reply(ctx: llm.ChatContext, turn: int) -> None:
+    """The agent's answer, with a tool call every fourth turn."""
+    if turn % 4 == 3:
+        call_id = f"call_{turn}"
+        ctx.items.append(
+            llm.FunctionCall(call_id=call_id, name="get_course", arguments='{"course_id":"py"}')
+        )
+        ctx.items.append(
+            llm.FunctionCallOutput(
+                call_id=call_id,
+                name="get_course",
+                output="Module, lessons, hours. " * 25,
+                is_error=False,
+            )
+        )
+    ctx.add_message(
+        role="assistant",
+        content="Good question. The next step is to practice with a small project. " * 4,
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    compactor = ContextCompactor(
+        SummaryLLM() if args.summary else None,
+        window_turns=args.window,
+        window_step=args.step,
+        max_tokens=args.max_tokens,
+    )
+    ctx = llm.ChatContext()
+    ctx.add_message(role="system", content=INSTRUCTIONS)
+    ctx.add_message(role="assistant", content="The user information is: {'user_name': 'Ana'}")
+
+    def ttft(tokens: int) -> float:
+        return args.ttft + args.ms_per_1k * tokens / 1_000_000
+
+    print(
+        f"{'turn':>5} {'full tokens':>12} {'compacted':>10} "
+        f"{'full TTFT':>10} {'compacted':>10} {'cached':>7} {'compact µs':>11}"
+    )
+    checkpoints = {1, 5, 10, 20, 40, args.turns} | set(range(80, args.turns, 40))
+    previous: list[llm.ChatItem] = []
+    total = cached = 0
+    for turn in range(1, args.turns + 1):
+        # the user's turn has just been committed: this is what reaches the LLM
+        ctx.add_message(role="user", content=f"Okay, and what about the next step, number {turn}?")
+        full = sum(estimate_tokens(item) for item in ctx.items)
+        started = time.perf_counter()
+        sent = compactor.compact(ctx).items
+        elapsed = time.perf_counter() - started
+        compacted = sum(estimate_tokens(item) for item in sent)
+        prefix = shared_prefix(previous, sent)
+        previous = sent
+        total, cached = total + compacted, cached + prefix
+        add_reply(ctx, turn)
+
+        # the agent is done speaking, the summary runs while the user answers
+        compactor.summarize_later(ctx)
+        await compactor.summarized()
+
+        if turn in checkpoints:
+            print(
+                f"{turn:>5} {full:>12} {compacted:>10} {ttft(full) * 1000:>8.0f}ms "
+                f"{ttft(compacted) * 1000:>8.0f}ms {prefix / compacted:>7.0%} "
+                f"{elapsed * 1e6:>11.0f}"
+            )
+    print(f"compactor: {compactor.stats()}, cacheable prefix: {cached / total:.0%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=80)
+    parser.add_argument("--window", type=int, default=6, help="turns sent verbatim")
+    parser.add_argument("--step", type=int, default=3, help="turns the window moves at once")
+    parser.add_argument("--max-tokens", type=int, default=3000)
+    parser.add_argument("--no-summary", dest="summary", action="store_false")
+    parser.add_argument("--ttft", type=float, default=0.35, help="seconds at zero tokens")
+    parser.add_argument("--ms-per-1k", type=float, default=60.0, help="ms per 1k prompt tokens")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
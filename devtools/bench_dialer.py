@@ -0,0 +1,95 @@
+"""
+Compare the per-dial cost of a fresh `LiveKitAPI` per call against the pooled
+`LiveKitClientManager`, both dialing a local stub server.
+
+    uv run python devtools/bench_dialer.py --calls 500 --concurrency 20 --latency 0.005
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+from livekit import api
+from livekit_stub import LiveKitStub
+
+from calls.api_client import LiveKitClientManager
+from calls.dialer import place_call
+
+API_KEY = "devkey"
+API_SECRET = "bench-secret-bench-secret-bench-secret"
+
+DialFn = Callable[[], Awaitable[None]]
+
+
+async def run(dial: DialFn, calls: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await dial()
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return latencies
+
+
+def report(name: str, latencies: list[float], elapsed: float, stub: LiveKitStub) -> None:
+    ms = sorted(x * 1000 for x in latencies)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(
+        f"{name:<10} mean {statistics.mean(ms):7.2f} ms  p50 {statistics.median(ms):7.2f} ms  "
+        f"p95 {p95:7.2f} ms  {len(ms) / elapsed:8.1f} calls/s  "
+        f"{stub.connections} connections"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub latency per request (s)")
+    parser.add_argument(
+        "--sequential", action="store_true", help="Send dispatch and SIP requests one after another"
+    )
+    args = parser.parse_args()
+
+    async def dial_with(lkapi: api.LiveKitAPI) -> None:
+        await place_call(
+            lkapi,
+            "+15550000000",
+            '{"user_name": "bench"}',
+            agent_name="bench-agent",
+            trunk_id="ST_bench",
+            room_name_prefix="bench-",
+            overlap=not args.sequential,
+        )
+
+    stub = LiveKitStub(latency=args.latency)
+    url = await stub.start()
+
+    async def per_call() -> None:
+        async with api.LiveKitAPI(url, API_KEY, API_SECRET) as lkapi:
+            await dial_with(lkapi)
+
+    started = time.perf_counter()
+    latencies = await run(per_call, args.calls, args.concurrency)
+    report("per-call", latencies, time.perf_counter() - started, stub)
+    await stub.aclose()
+
+    stub = LiveKitStub(latency=args.latency)
+    url = await stub.start()
+    async with LiveKitClientManager(
+        url, API_KEY, API_SECRET, pool_size=args.concurrency * 2
+    ) as lkapi:
+        started = time.perf_counter()
+        latencies = await run(lambda: dial_with(lkapi), args.calls, args.concurrency)
+        report("pooled", latencies, time.perf_counter() - started, stub)
+    await stub.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+Measure first-utterance latency, from the callee answering to the first TTS audio
+byte, against a local provider stand-in that charges a fixed cost per new connection.
+
+Each simulated job gets its own HTTP session, like a LiveKit job process, waits while
+the phone rings, then speaks the greeting over a fresh TTS websocket. Later in the
+call the websocket drops and the next utterance reconnects. With `ProviderPool`
+running from dispatch, both the greeting and the reconnect find a warm connection.
+
+    uv run python devtools/bench_first_utterance.py --calls 20 --handshake 0.15
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import aiohttp
+from provider_stub import ProviderStub
+
+from shared.provider_pool import ProviderPool
+from shared.providers import ProviderEndpoint
+
+
+async def utterance(session: aiohttp.ClientSession, url: str) -> float:
+    """Open the TTS websocket, send text and wait for the first audio byte."""
+    started = time.perf_counter()
+    async with session.ws_connect(f"{url}/tts/websocket") as ws:
+        await ws.send_str("Hola, ¿en qué te puedo ayudar?")
+        await ws.receive_bytes()
+        return time.perf_counter() - started
+
+
+async def call(url: str, *, pooled: bool, ring: float, gap: float) -> tuple[float, float]:
+    connector = aiohttp.TCPConnector(limit_per_host=50, keepalive_timeout=120)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        pool = ProviderPool(
+            [ProviderEndpoint("tts", f"{url}/voices/bench", {"X-API-Key": "bench"})],
+            session=session,
+            health_check_interval=gap / 2,
+        )
+        if pooled:
+            pool.start()
+        await asyncio.sleep(ring)
+        first = await utterance(session, url)
+        # the websocket dropped mid-call; the next utterance has to reconnect
+        await asyncio.sleep(gap)
+        reconnect = await utterance(session, url)
+        await pool.aclose()
+    return first, reconnect
+
+
+async def run(
+    url: str, pooled: bool, calls: int, concurrency: int, ring: float, gap: float
+) -> list[tuple[float, float]]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> tuple[float, float]:
+        async with semaphore:
+            return await call(url, pooled=pooled, ring=ring, gap=gap)
+
+    return await asyncio.gather(*(one() for _ in range(calls)))
+
+
+def report(name: str, latencies: list[float]) -> None:
+    ms = sorted(x * 1000 for x in latencies)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(
+        f"{name:<24} p50 {statistics.median(ms):7.1f} ms  p95 {p95:7.1f} ms  max {ms[-1]:7.1f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--handshake", type=float, default=0.15, help="Cost per new connection")
+    parser.add_argument("--ttfb", type=float, default=0.08, help="Stub TTS time to first byte")
+    parser.add_argument("--ring", type=float, default=1.0, help="Dispatch to answer (s)")
+    parser.add_argument("--gap", type=float, default=1.0, help="Time before the reconnect (s)")
+    args = parser.parse_args()
+
+    for pooled in (False, True):
+        stub = ProviderStub(handshake=args.handshake, ttfb=args.ttfb)
+        url = await stub.start()
+        results = await run(url, pooled, args.calls, args.concurrency, args.ring, args.gap)
+        name = "pooled" if pooled else "cold"
+        report(f"{name} first utterance", [first for first, _ in results])
+        report(f"{name} reconnect", [reconnect for _, reconnect in results])
+        await stub.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
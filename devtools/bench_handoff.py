@@ -0,0 +1,213 @@
+"""
+Measure agent handoff latency in the multi-agent session of `src/run.py`: greeter ->
+authenticator -> main, inside one `AgentSession`, with local stand-ins for the models.
+
+For each handoff it reports how long the next agent takes to take the call (from the
+tool returning it to its `on_enter`), and to listen again: with LiveKit's own STT node
+every agent opens a new STT stream, a websocket that takes `--connect` seconds with a
+real provider; with `SharedSTTStream` the agents keep the call's stream.
+
+    uv run python devtools/bench_handoff.py --calls 20 --connect 0.25
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import Any, Never
+
+from livekit.agents import (
+    DEFAULT_API_CONNECT_OPTIONS,
+    Agent,
+    AgentSession,
+    APIConnectOptions,
+    NotGivenOr,
+    RunContext,
+    llm,
+    stt,
+)
+from livekit.agents.llm import function_tool
+from livekit.agents.types import NOT_GIVEN
+from livekit.agents.utils import AudioBuffer
+
+from shared.config import AgentList, SessionInfo
+from shared.context_compaction import ContextCompactor
+from shared.handoff import HandoffAgent, SharedSTTStream
+
+
+class ScriptedLLM(llm.LLM[Never]):
+    """Answers each request with the next reply (a text, or `tool:<name>`) after `ttft`."""
+
+    def __init__(self, replies: list[str], ttft: float) -> None:
+        super().__init__()
+        self.replies = replies
+        self.ttft = ttft
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools: list[llm.FunctionTool | llm.RawFunctionTool] | None = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        parallel_tool_calls: NotGivenOr[bool] = NOT_GIVEN,
+        tool_choice: NotGivenOr[llm.ToolChoice] = NOT_GIVEN,
+        extra_kwargs: NotGivenOr[dict[str, Any]] = NOT_GIVEN,
+    ) -> llm.LLMStream:
+        return ScriptedStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class ScriptedStream(llm.LLMStream):
+    async def _run(self) -> None:
+        assert isinstance(self._llm, ScriptedLLM)
+        await asyncio.sleep(self._llm.ttft)
+        reply = self._llm.replies.pop(0) if self._llm.replies else "Okay."
+        if reply.startswith("tool:"):
+            call = llm.FunctionToolCall(name=reply[5:], arguments="{}", call_id=reply)
+            delta = llm.ChoiceDelta(role="assistant", tool_calls=[call])
+        else:
+            delta = llm.ChoiceDelta(role="assistant", content=reply)
+        self._event_ch.send_nowait(llm.ChatChunk(id="scripted", delta=delta))
+
+
+class ConnectingSTT(stt.STT[Never]):
+    """A streaming STT whose streams take `connect` seconds before they can listen."""
+
+    def __init__(self, connect: float) -> None:
+        super().__init__(capabilities=stt.STTCapabilities(streaming=True, interim_results=False))
+        self.connect = connect
+        self.streams: list[ConnectingStream] = []
+
+    async def _recognize_impl(
+        self,
+        buffer: AudioBuffer,
+        *,
+        language: NotGivenOr[str] = NOT_GIVEN,
+        conn_options: APIConnectOptions,
+    ) -> stt.SpeechEvent:
+        raise NotImplementedError
+
+    def stream(
+        self,
+        *,
+        language: NotGivenOr[str] = NOT_GIVEN,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> stt.RecognizeStream:
+        stream = ConnectingStream(stt=self, conn_options=conn_options)
+        self.streams.append(stream)
+        return stream
+
+
+class ConnectingStream(stt.RecognizeStream):
+    connected_at = float("inf")
+
+    async def _run(self) -> None:
+        assert isinstance(self._stt, ConnectingSTT)
+        await asyncio.sleep(self._stt.connect)
+        self.connected_at = time.perf_counter()
+        async for _ in self._input_ch:
+            pass
+
+
+# when each handoff of the current call started
+handoffs: list[float] = []
+
+
+class BenchAgent(HandoffAgent):
+    async def handoff(self, name: AgentList) -> Agent:
+        handoffs.append(time.perf_counter())
+        return await super().handoff(name)
+
+
+class Greeter(BenchAgent):
+    @function_tool
+    async def to_authenticator(self, _: RunContext[SessionInfo]):
+        """Hand the call to the authenticator."""
+        return await self.handoff("authenticator")
+
+
+class Authenticator(BenchAgent):
+    @function_tool
+    async def to_main(self, _: RunContext[SessionInfo]):
+        """Hand the call to the main agent."""
+        return await self.handoff("main")
+
+
+async def call(
+    *, shared: bool, connect: float, ttft: float, pause: float
+) -> tuple[list[float], list[float], int]:
+    """One call through both handoffs: (take-over seconds, listening seconds, STT streams)."""
+    speech = ConnectingSTT(connect)
+    stt_stream = SharedSTTStream(speech) if shared else None
+    compactor = ContextCompactor()
+    info = SessionInfo(
+        {
+            "greeter": Greeter(instructions="Greet", compactor=compactor, stt_stream=stt_stream),
+            "authenticator": Authenticator(
+                instructions="Authenticate", compactor=compactor, stt_stream=stt_stream
+            ),
+            "main": BenchAgent(instructions="Help", compactor=compactor, stt_stream=stt_stream),
+        }
+    )
+    replies = ["tool:to_authenticator", "Password?", "tool:to_main", "How can I help?"]
+    model = ScriptedLLM(replies, ttft)
+    handoffs.clear()
+    async with AgentSession[SessionInfo](userdata=info, llm=model, stt=speech) as session:
+        await session.start(info.agents["greeter"])
+        await asyncio.sleep(pause)
+        await session.run(user_input="Hi, this is Ana")
+        await asyncio.sleep(pause)
+        await session.run(user_input="My password is password")
+        await asyncio.sleep(pause)
+
+    # the stream serving each agent: its own, or the call's only one
+    streams = speech.streams if not shared else speech.streams * 3
+    listening = [
+        max(taken, streams[i + 1].connected_at - started)
+        for i, (started, taken) in enumerate(zip(handoffs, info.handoff_latencies, strict=True))
+    ]
+    if stt_stream is not None:
+        await stt_stream.aclose()
+    return info.handoff_latencies, listening, len(speech.streams)
+
+
+def report(name: str, taken: list[float], listening: list[float], streams: float) -> None:
+    def ms(values: list[float], q: int) -> float:
+        return statistics.quantiles(values, n=100)[q - 1] * 1000 if len(values) > 1 else 0.0
+
+    print(
+        f"{name:<14} {ms(taken, 50):>10.1f} {ms(taken, 95):>10.1f} "
+        f"{ms(listening, 50):>12.1f} {ms(listening, 95):>12.1f} {streams:>12.1f}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--connect", type=float, default=0.25, help="STT stream connect seconds")
+    parser.add_argument("--ttft", type=float, default=0.05, help="LLM time to first token")
+    parser.add_argument("--pause", type=float, default=0.5, help="seconds between user turns")
+    args = parser.parse_args()
+    # the stand-ins run without VAD, which LiveKit warns about on every session
+    logging.basicConfig(level=logging.ERROR)
+
+    print(
+        f"{'':<14} {'take p50':>10} {'take p95':>10} {'listen p50':>12} {'listen p95':>12} "
+        f"{'streams/call':>12}"
+    )
+    for name, shared in (("per-agent STT", False), ("shared STT", True)):
+        taken: list[float] = []
+        listening: list[float] = []
+        streams = 0
+        for _ in range(args.calls):
+            t, lst, n = await call(
+                shared=shared, connect=args.connect, ttft=args.ttft, pause=args.pause
+            )
+            taken += t
+            listening += lst
+            streams += n
+        report(name, taken, listening, streams / args.calls)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
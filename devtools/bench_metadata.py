@@ -0,0 +1,90 @@
+"""
+Compare the cost of getting per-call metadata from the dialer to the agent's prompt:
+the old path (`json.dumps` on dispatch, `json.loads` in the job, `json.dumps` again for
+the user information message) against `CallMetadata` (validate and encode on dispatch,
+decode the header and check the extra fields' JSON, then reuse its text, in the job).
+
+Each payload carries a name, an age and a synthetic CRM record of about `--sizes` KiB
+(contact details and an interaction history).
+
+    uv run python devtools/bench_metadata.py --sizes 1,8,32,60 --runs 2000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+from shared.metadata import CallMetadata
+
+
+def crm_record(kib: int, rng: random.Random) -> dict[str, Any]:
+    record: dict[str, Any] = {
+        "user_name": "Ana María",
+        "age": 41,
+        "crm": {"id": "0031x00000AbCdE", "plan": "pro", "email": "ana@example.com"},
+        "history": [],
+    }
+    while len(json.dumps(record)) < kib * 1024:
+        record["history"].append(
+            {
+                "date": f"2025-{rng.randint(1, 12):02}-{rng.randint(1, 28):02}",
+                "channel": rng.choice(["phone", "email", "chat"]),
+                "note": "Preguntó por el curso de Python y los horarios nocturnos.",
+                "score": rng.randint(1, 5),
+            }
+        )
+    return record
+
+
+def timed(fn: Callable[[], object], runs: int) -> float:
+    """Median microseconds per call."""
+    samples: list[float] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1,8,32,60", help="CRM record sizes in KiB")
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    print(
+        f"{'KiB':>4} {'json bytes':>10} {'codec bytes':>11} "
+        f"{'json enc µs':>11} {'codec enc µs':>12} {'json dec µs':>11} {'codec dec µs':>12}"
+    )
+    for kib in (int(s) for s in args.sizes.split(",")):
+        record = crm_record(kib, rng)
+        plain = json.dumps(record)
+        wire = CallMetadata.from_record(record).encode()
+
+        def json_encode(record: dict[str, Any] = record) -> str:
+            return json.dumps(record)
+
+        def codec_encode(record: dict[str, Any] = record) -> str:
+            return CallMetadata.from_record(record).encode()
+
+        def json_decode(plain: str = plain) -> str:
+            metadata = json.loads(plain)
+            return f"The user information is: {json.dumps(metadata, sort_keys=True)}"
+
+        def codec_decode(wire: str = wire) -> str:
+            return CallMetadata.decode(wire).describe()
+
+        print(
+            f"{kib:>4} {len(plain.encode()):>10} {len(wire.encode()):>11} "
+            f"{timed(json_encode, args.runs):>11.1f} {timed(codec_encode, args.runs):>12.1f} "
+            f"{timed(json_decode, args.runs):>11.1f} {timed(codec_decode, args.runs):>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
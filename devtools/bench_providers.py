@@ -0,0 +1,84 @@
+"""
+Measure what importing the agent config costs each entry point now that plugins are
+built lazily, against building them at import time like the config used to.
+
+Every scenario runs in a fresh interpreter, so module caches don't leak between runs:
+
+- dialer import: `import agents.starter.config`, all `make_call` needs for `agent_name`.
+- worker startup: importing the starter worker module in the main worker process.
+- "(eager)" variants: the same plus building every plugin, what the import used to cost.
+- job prewarm: a job process importing the worker module and running `prewarm`.
+- first call: building the agent's plugins after prewarm, what answering a call waits for.
+
+    uv run python devtools/bench_providers.py --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+
+SCENARIOS = {
+    "dialer import": ("", "import agents.starter.config"),
+    "dialer (eager)": (
+        "",
+        "import agents.starter.config as c\n"
+        "from livekit.plugins import cartesia, deepgram, google\n"
+        "c.providers.warm()",
+    ),
+    "worker startup": ("", "import agents.starter.run"),
+    "worker (eager)": (
+        "",
+        "import agents.starter.run\nimport agents.starter.config as c\nc.providers.warm()",
+    ),
+    "job prewarm": (
+        "",
+        "import agents.starter.run as r\nclass Proc: userdata = {}\nr.prewarm(Proc())",
+    ),
+    "first call": (
+        "import agents.starter.run as r\nimport agents.starter.config as c\n"
+        "class Proc: userdata = {}\nr.prewarm(Proc())",
+        "[p.get() for p in (c.agent_llm, c.agent_stt, c.agent_tts, c.agent_mcp_server)]",
+    ),
+}
+
+TIMER = """
+import time
+{setup}
+started = time.perf_counter()
+{code}
+print(time.perf_counter() - started)
+"""
+
+
+def run_once(setup: str, code: str) -> float:
+    env = {**os.environ, "PYTHONPATH": str(SRC), "ENV": os.getenv("ENV", "test")}
+    out = subprocess.run(
+        [sys.executable, "-c", TIMER.format(setup=setup, code=code)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per scenario")
+    args = parser.parse_args()
+
+    for name, (setup, code) in SCENARIOS.items():
+        timings = [run_once(setup, code) for _ in range(args.runs)]
+        print(
+            f"{name:<16} median {statistics.median(timings) * 1000:8.1f} ms  "
+            f"min {min(timings) * 1000:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
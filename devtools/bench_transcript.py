@@ -0,0 +1,110 @@
+"""
+Measure how long saving transcripts blocks the event loop when several long sessions
+end at once: the old synchronous `json.dump(..., indent=2)` on the loop, the same dump
+pushed to a thread, `TranscriptWriter`, and closing a `TranscriptStream` that recorded
+the items during the call.
+
+    uv run python devtools/bench_transcript.py --sessions 8 --turns 2000
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from livekit.agents import ChatContext
+
+from shared.transcripts import TranscriptStream, TranscriptWriter
+
+SaveFn = Callable[[int, ChatContext], Awaitable[None]]
+
+
+def build_history(turns: int) -> ChatContext:
+    chat_ctx = ChatContext()
+    for i in range(turns):
+        chat_ctx.add_message(role="user", content=f"Turno {i}: ¿me ayudas con un bucle en Python?")
+        chat_ctx.add_message(
+            role="assistant", content="Claro, usa un for sobre range y acumula el resultado. " * 4
+        )
+    return chat_ctx
+
+
+async def watch_lag(stop: asyncio.Event, interval: float = 0.001) -> list[float]:
+    """Record how late each short sleep wakes up: the time the loop was blocked."""
+    lags: list[float] = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+    return lags
+
+
+async def measure(name: str, save: SaveFn, sessions: int, history: ChatContext) -> None:
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_lag(stop))
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    await asyncio.gather(*(save(i, history) for i in range(sessions)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    lags = sorted(await watcher)
+    p99 = lags[int(len(lags) * 0.99) - 1] if lags else 0.0
+    print(
+        f"{name:<18} total {elapsed * 1000:8.1f} ms  "
+        f"max loop lag {lags[-1] * 1000:8.1f} ms  p99 {p99 * 1000:7.1f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=8, help="Sessions ending at once")
+    parser.add_argument("--turns", type=int, default=2000, help="User/agent turns per session")
+    args = parser.parse_args()
+
+    history = build_history(args.turns)
+    size = len(json.dumps(history.to_dict(), indent=2))
+    print(f"{args.sessions} sessions x {len(history.items)} items ({size / 1e6:.1f} MB indented)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+
+        def dump_indented(i: int, payload: dict[str, Any]) -> None:
+            with open(output_dir / f"sync_{i}.json", "w") as f:
+                json.dump(payload, f, indent=2)
+
+        async def sync_on_loop(i: int, chat_ctx: ChatContext) -> None:
+            dump_indented(i, chat_ctx.to_dict())
+
+        async def sync_in_thread(i: int, chat_ctx: ChatContext) -> None:
+            await asyncio.to_thread(dump_indented, i, chat_ctx.to_dict())
+
+        writer = TranscriptWriter(output_dir)
+
+        async def transcript_writer(i: int, chat_ctx: ChatContext) -> None:
+            await writer.write(f"writer_{i}.json", chat_ctx.to_dict())
+
+        # Streams record items as the calls go, so only closing them happens at shutdown.
+        streams = [TranscriptStream(output_dir / f"stream_{i}.jsonl") for i in range(args.sessions)]
+        started = time.perf_counter()
+        for stream in streams:
+            for item in history.items:
+                stream.append(item)
+        append_us = (time.perf_counter() - started) / (args.sessions * len(history.items)) * 1e6
+        print(f"TranscriptStream.append {append_us:.1f} us per item")
+        await asyncio.sleep(1.5)
+
+        async def close_stream(i: int, chat_ctx: ChatContext) -> None:
+            await streams[i].close()
+
+        await measure("sync on loop", sync_on_loop, args.sessions, history)
+        await measure("json.dump thread", sync_in_thread, args.sessions, history)
+        await measure("TranscriptWriter", transcript_writer, args.sessions, history)
+        await measure("TranscriptStream", close_stream, args.sessions, history)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+Measure time to first audio per sentence when agent replies are spoken through
+`CachedTTS`, against sending every sentence to the provider.
+
+A stand-in TTS answers after `ttfb` seconds with 24 kHz audio. Each simulated call
+speaks a scripted mix of stock sentences, which repeat across calls, and one-off ones.
+Every call starts with a fresh memory tier, like a new job process, so stock sentences,
+the scripted phrases that are persisted, are served from the memory-mapped disk tier after
+the first call.
+
+    uv run python devtools/bench_tts_cache.py --calls 20 --ttfb 0.12
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Never
+
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions, tts
+
+from shared.audio_cache import AudioCache
+from shared.cached_tts import CachedTTS
+
+SAMPLE_RATE = 24000
+
+STOCK = [
+    "Un momento, por favor.",
+    "Claro, con gusto te ayudo.",
+    "¿Hay algo más en lo que pueda ayudarte?",
+    "Perfecto, ya lo anoté.",
+    "Gracias por tu paciencia.",
+]
+
+
+class SlowTTS(tts.TTS[Never]):
+    """Waits `ttfb` seconds, then returns 60 ms of audio per character."""
+
+    def __init__(self, ttfb: float) -> None:
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+        )
+        self.ttfb = ttfb
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> tts.ChunkedStream:
+        return SlowStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class SlowStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        assert isinstance(self._tts, SlowTTS)
+        output_emitter.initialize(
+            request_id="bench", sample_rate=SAMPLE_RATE, num_channels=1, mime_type="audio/pcm"
+        )
+        await asyncio.sleep(self._tts.ttfb)
+        output_emitter.push(b"\x00\x00" * (SAMPLE_RATE * 60 // 1000) * len(self.input_text))
+        output_emitter.flush()
+
+
+def script(call: int, sentences: int) -> list[str]:
+    rng = random.Random(call)
+    return [
+        rng.choice(STOCK)
+        if rng.random() < 0.6
+        else f"Tu pedido {rng.randrange(10**6)} va en camino."
+        for _ in range(sentences)
+    ]
+
+
+async def first_audio(speaker: tts.TTS[Any], text: str) -> float:
+    started = time.perf_counter()
+    async with speaker.synthesize(text) as stream:
+        async for _ in stream:
+            elapsed = time.perf_counter() - started
+            async for _ in stream:
+                pass
+            return elapsed
+    raise RuntimeError("no audio")
+
+
+async def run(cached: bool, calls: int, sentences: int, ttfb: float) -> tuple[list[float], str]:
+    latencies: list[float] = []
+    hits = misses = saved = 0
+    with tempfile.TemporaryDirectory() as directory:
+        for call in range(calls):
+            speaker: tts.TTS[Any] = SlowTTS(ttfb)
+            if cached:
+                speaker = CachedTTS(
+                    speaker, AudioCache(Path(directory)), voice="bench", phrases=STOCK
+                )
+            for text in script(call, sentences):
+                latencies.append(await first_audio(speaker, text))
+            if isinstance(speaker, CachedTTS):
+                hits, misses = hits + speaker.hits, misses + speaker.misses
+                saved += speaker.bytes_saved
+    summary = ""
+    if cached:
+        summary = f"hit rate {hits / (hits + misses):.0%}, {saved / 1024 / 1024:.1f} MiB from cache"
+    return latencies, summary
+
+
+def report(name: str, latencies: list[float], summary: str) -> None:
+    ms = sorted(x * 1000 for x in latencies)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(
+        f"{name:<10} p50 {statistics.median(ms):7.1f} ms  p95 {p95:7.1f} ms  "
+        f"max {ms[-1]:7.1f} ms  {summary}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--sentences", type=int, default=10, help="Sentences spoken per call")
+    parser.add_argument("--ttfb", type=float, default=0.12, help="Provider time to first byte")
+    args = parser.parse_args()
+
+    for cached in (False, True):
+        latencies, summary = await run(cached, args.calls, args.sentences, args.ttfb)
+        report("cached" if cached else "provider", latencies, summary)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
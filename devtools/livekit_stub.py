@@ -0,0 +1,94 @@
+"""
+Minimal local stand-in for the LiveKit server's Twirp API, used by the dialer
+benchmarks. It implements just the dispatch and SIP calls the dialer makes, adds a
+configurable per-request latency, and counts requests and TCP connections so
+benchmarks can show how much connection setup each client strategy pays for.
+"""
+
+import asyncio
+import uuid
+from collections import Counter
+
+from aiohttp import web
+from livekit.protocol import agent_dispatch, room, sip
+
+
+class LiveKitStub:
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.requests: Counter[str] = Counter()
+        self._connections: set[int] = set()
+        self._dispatches: dict[str, list[agent_dispatch.AgentDispatch]] = {}
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+    @property
+    def connections(self) -> int:
+        return len(self._connections)
+
+    async def start(self, host: str = "127.0.0.1") -> str:
+        app = web.Application()
+        app.router.add_post("/twirp/livekit.{service}/{method}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # pyright: ignore
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def aclose(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.requests[method] += 1
+        if request.transport is not None:
+            self._connections.add(id(request.transport))
+        body = await request.read()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method == "CreateDispatch":
+            req = agent_dispatch.CreateAgentDispatchRequest.FromString(body)
+            dispatch = agent_dispatch.AgentDispatch(
+                id=f"AD_{uuid.uuid4().hex[:12]}",
+                agent_name=req.agent_name,
+                room=req.room,
+                metadata=req.metadata,
+            )
+            self._dispatches.setdefault(req.room, []).append(dispatch)
+            return _proto(dispatch)
+        if method == "ListDispatch":
+            req = agent_dispatch.ListAgentDispatchRequest.FromString(body)
+            return _proto(
+                agent_dispatch.ListAgentDispatchResponse(
+                    agent_dispatches=self._dispatches.get(req.room, [])
+                )
+            )
+        if method == "DeleteDispatch":
+            req = agent_dispatch.DeleteAgentDispatchRequest.FromString(body)
+            remaining = [d for d in self._dispatches.get(req.room, []) if d.id != req.dispatch_id]
+            self._dispatches[req.room] = remaining
+            return _proto(agent_dispatch.AgentDispatch(id=req.dispatch_id, room=req.room))
+        if method == "CreateSIPParticipant":
+            req = sip.CreateSIPParticipantRequest.FromString(body)
+            return _proto(
+                sip.SIPParticipantInfo(
+                    participant_id=f"PA_{uuid.uuid4().hex[:12]}",
+                    participant_identity=req.participant_identity,
+                    room_name=req.room_name,
+                    sip_call_id=f"SCL_{uuid.uuid4().hex[:12]}",
+                )
+            )
+        if method == "ListParticipants":
+            return _proto(room.ListParticipantsResponse())
+        return web.json_response({"code": "bad_route", "msg": method}, status=404)
+
+
+def _proto(message: object) -> web.Response:
+    return web.Response(
+        body=message.SerializeToString(),  # pyright: ignore
+        content_type="application/protobuf",
+    )
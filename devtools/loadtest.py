@@ -0,0 +1,589 @@
+"""
+Find out how many concurrent calls one machine can take.
+
+Runs the `agents.starter.run` entrypoint once per call, each call in its own process like
+LiveKit's job processes, against local stand-ins: a SIP caller in a fake room, speaking
+synthetic audio between the agent's replies, and LLM, STT, TTS and MCP providers with
+configurable latency. The agent's own code and the Silero VAD run for real. The turn
+detector, which a worker runs once in its shared inference process rather than per
+call, is a stand-in too.
+
+For each step of `--ramp` it starts that many calls at once and reports the machine's
+CPU, the CPU and memory of each call process, the event-loop lag in the call processes
+and the turn latency: from the end of the caller's utterance to the first audio of the
+reply, as the caller hears it. Memory is the unique set size, what a call adds to the
+machine without the libraries its process shares with the others.
+
+    uv run python devtools/loadtest.py --ramp 1,8,16,32 --turns 4
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from multiprocessing.synchronize import Event
+from types import SimpleNamespace
+from typing import Any, Never
+
+import numpy as np
+import psutil
+from livekit import rtc
+from livekit.agents import (
+    DEFAULT_API_CONNECT_OPTIONS,
+    Agent,
+    AgentSession,
+    APIConnectOptions,
+    NotGivenOr,
+    llm,
+    stt,
+    tts,
+)
+from livekit.agents.llm import mcp
+from livekit.agents.types import NOT_GIVEN
+from livekit.agents.utils import AudioBuffer
+from livekit.agents.voice import io
+
+SAMPLE_RATE = 24000
+FRAME_SECONDS = 0.02
+FRAME_SAMPLES = int(SAMPLE_RATE * FRAME_SECONDS)
+# mean absolute sample value above which the stand-in STT hears speech
+SPEECH_LEVEL = 500
+
+
+class StandInLLM(llm.LLM[Never]):
+    """Streams a reply of `words` words, the first after `ttft` seconds."""
+
+    def __init__(self, *, ttft: float, words: int, words_per_second: float) -> None:
+        super().__init__()
+        self.ttft = ttft
+        self.words = words
+        self.words_per_second = words_per_second
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools: list[llm.FunctionTool | llm.RawFunctionTool] | None = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        parallel_tool_calls: NotGivenOr[bool] = NOT_GIVEN,
+        tool_choice: NotGivenOr[llm.ToolChoice] = NOT_GIVEN,
+        extra_kwargs: NotGivenOr[dict[str, Any]] = NOT_GIVEN,
+    ) -> llm.LLMStream:
+        return StandInLLMStream(
+            self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options
+        )
+
+
+class StandInLLMStream(llm.LLMStream):
+    async def _run(self) -> None:
+        assert isinstance(self._llm, StandInLLM)
+        model = self._llm
+        await asyncio.sleep(model.ttft)
+        for i in range(model.words):
+            word = "claro," if i == 0 else ("ayudarte." if i % 12 == 11 else "palabra")
+            self._event_ch.send_nowait(
+                llm.ChatChunk(
+                    id="loadtest", delta=llm.ChoiceDelta(role="assistant", content=f"{word} ")
+                )
+            )
+            await asyncio.sleep(1 / model.words_per_second)
+        prompt_tokens = (
+            sum(
+                len(item.text_content or "")
+                for item in self._chat_ctx.items
+                if isinstance(item, llm.ChatMessage)
+            )
+            // 4
+        )
+        self._event_ch.send_nowait(
+            llm.ChatChunk(
+                id="loadtest",
+                usage=llm.CompletionUsage(
+                    completion_tokens=model.words,
+                    prompt_tokens=prompt_tokens,
+                    total_tokens=prompt_tokens + model.words,
+                ),
+            )
+        )
+
+
+class StandInSTT(stt.STT[Never]):
+    """
+    A streaming STT that hears the caller's synthetic speech by its level, and sends a
+    final transcript `delay` seconds after `endpointing` seconds of silence.
+    """
+
+    def __init__(self, *, delay: float, endpointing: float = 0.3) -> None:
+        super().__init__(capabilities=stt.STTCapabilities(streaming=True, interim_results=True))
+        self.delay = delay
+        self.endpointing = endpointing
+
+    async def _recognize_impl(
+        self,
+        buffer: AudioBuffer,
+        *,
+        language: NotGivenOr[str] = NOT_GIVEN,
+        conn_options: APIConnectOptions,
+    ) -> stt.SpeechEvent:
+        raise NotImplementedError
+
+    def stream(
+        self,
+        *,
+        language: NotGivenOr[str] = NOT_GIVEN,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> stt.RecognizeStream:
+        return StandInSTTStream(stt=self, conn_options=conn_options)
+
+
+class StandInSTTStream(stt.RecognizeStream):
+    async def _run(self) -> None:
+        assert isinstance(self._stt, StandInSTT)
+        model = self._stt
+        speech = silence = 0.0
+        utterances = 0
+        pending: set[asyncio.Task[None]] = set()
+        async for frame in self._input_ch:
+            if isinstance(frame, self._FlushSentinel):
+                continue
+            level = np.abs(np.frombuffer(frame.data, dtype=np.int16)).mean()
+            if level > SPEECH_LEVEL:
+                if not speech:
+                    self._send(stt.SpeechEventType.START_OF_SPEECH)
+                speech += frame.duration
+                silence = 0.0
+                # interim results every 300 ms, like a streaming provider
+                if int(speech / 0.3) != int((speech - frame.duration) / 0.3):
+                    self._send(stt.SpeechEventType.INTERIM_TRANSCRIPT, "quisiera saber")
+            elif speech:
+                silence += frame.duration
+                if silence >= model.endpointing:
+                    speech = 0.0
+                    utterances += 1
+                    task = asyncio.create_task(self._finalize(utterances, model.delay))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+
+    async def _finalize(self, utterance: int, delay: float) -> None:
+        await asyncio.sleep(delay)
+        text = f"Quisiera saber más sobre el curso de Python, pregunta {utterance}."
+        self._send(stt.SpeechEventType.FINAL_TRANSCRIPT, text)
+        self._send(stt.SpeechEventType.END_OF_SPEECH)
+
+    def _send(self, kind: stt.SpeechEventType, text: str = "") -> None:
+        alternatives = [stt.SpeechData(language="es", text=text)] if text else []
+        self._event_ch.send_nowait(stt.SpeechEvent(type=kind, alternatives=alternatives))
+
+
+class StandInTTS(tts.TTS[Never]):
+    """Answers after `ttfb` seconds with 60 ms of (silent) audio per character."""
+
+    def __init__(self, *, ttfb: float) -> None:
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+        )
+        self.ttfb = ttfb
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> tts.ChunkedStream:
+        return StandInTTSStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class StandInTTSStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        assert isinstance(self._tts, StandInTTS)
+        output_emitter.initialize(
+            request_id="loadtest", sample_rate=SAMPLE_RATE, num_channels=1, mime_type="audio/pcm"
+        )
+        await asyncio.sleep(self._tts.ttfb)
+        output_emitter.push(b"\x00\x00" * (SAMPLE_RATE * 60 // 1000) * len(self.input_text))
+        output_emitter.flush()
+
+
+class StandInMCPServer(mcp.MCPServer):
+    """An MCP server without tools."""
+
+    def __init__(self) -> None:
+        super().__init__(client_session_timeout_seconds=5)
+
+    @property
+    def initialized(self) -> bool:
+        return True
+
+    async def initialize(self) -> None:
+        pass
+
+    async def list_tools(self) -> list[mcp.MCPTool]:
+        return []
+
+    def client_streams(self) -> Any:
+        raise NotImplementedError
+
+
+class StandInTurnDetector:
+    """Decides every turn is over after `delay` seconds."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    async def unlikely_threshold(self, language: str | None) -> float | None:
+        return None
+
+    async def supports_language(self, language: str | None) -> bool:
+        return True
+
+    async def predict_end_of_turn(self, chat_ctx: llm.ChatContext) -> float:
+        await asyncio.sleep(self.delay)
+        return 1.0
+
+
+class Speaker(io.AudioOutput):
+    """The caller's earpiece: plays the agent's audio in real time, and notes when it starts."""
+
+    def __init__(self) -> None:
+        super().__init__(label="loadtest", next_in_chain=None, sample_rate=None)
+        self.reply_started = asyncio.Event()
+        self.reply_started_at = 0.0
+        self._playing_until = 0.0
+        self._pushed = 0.0
+        self._interrupted = asyncio.Event()
+        self._flush_task: asyncio.Task[None] | None = None
+
+    @property
+    def playing(self) -> bool:
+        return time.perf_counter() < self._playing_until or bool(self._pushed)
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        await super().capture_frame(frame)
+        now = time.perf_counter()
+        if not self.reply_started.is_set():
+            self.reply_started_at = now
+            self.reply_started.set()
+        self._playing_until = max(self._playing_until, now) + frame.duration
+        self._pushed += frame.duration
+
+    def flush(self) -> None:
+        super().flush()
+        if self._pushed:
+            self._flush_task = asyncio.create_task(self._wait_for_playout())
+
+    def clear_buffer(self) -> None:
+        if self._pushed:
+            self._interrupted.set()
+
+    async def _wait_for_playout(self) -> None:
+        try:
+            remaining = self._playing_until - time.perf_counter()
+            await asyncio.wait_for(self._interrupted.wait(), max(remaining, 0))
+            interrupted = True
+        except TimeoutError:
+            interrupted = False
+        position = self._pushed - max(self._playing_until - time.perf_counter(), 0)
+        if interrupted:
+            self._playing_until = time.perf_counter()
+        self._pushed = 0.0
+        self._interrupted.clear()
+        self.on_playback_finished(playback_position=max(position, 0), interrupted=interrupted)
+
+
+class Caller(io.AudioInput):
+    """
+    The SIP participant: sends 20 ms frames in real time, silence or synthetic speech,
+    and follows a script of `turns` utterances, each after the agent's previous reply.
+    """
+
+    def __init__(self, *, turns: int, utterance: float, pause: float, seed: int) -> None:
+        super().__init__(label="loadtest")
+        self.turns = turns
+        self.utterance = utterance
+        self.pause = pause
+        self.speaker = Speaker()
+        self.turn_latencies: list[float] = []
+        self.missed_turns = 0
+        self._speaking_until = 0.0
+        self._next_frame_at = 0.0
+        rng = np.random.default_rng(seed)
+        # a second of noise to slice speech frames from
+        self._speech = (rng.standard_normal(SAMPLE_RATE) * 3000).astype(np.int16)
+        self._offset = 0
+        self._silence = bytes(FRAME_SAMPLES * 2)
+
+    async def __anext__(self) -> rtc.AudioFrame:
+        now = time.perf_counter()
+        self._next_frame_at = max(self._next_frame_at, now - FRAME_SECONDS) + FRAME_SECONDS
+        await asyncio.sleep(max(self._next_frame_at - now, 0))
+        if time.perf_counter() < self._speaking_until:
+            self._offset = (self._offset + FRAME_SAMPLES) % (SAMPLE_RATE - FRAME_SAMPLES)
+            data = self._speech[self._offset : self._offset + FRAME_SAMPLES].tobytes()
+        else:
+            data = self._silence
+        return rtc.AudioFrame(data, SAMPLE_RATE, 1, FRAME_SAMPLES)
+
+    async def run(self, reply_timeout: float = 15.0) -> None:
+        await self._until_quiet(reply_timeout)
+        for _ in range(self.turns):
+            await asyncio.sleep(self.pause)
+            self.speaker.reply_started.clear()
+            self._speaking_until = ended = time.perf_counter() + self.utterance
+            await asyncio.sleep(self.utterance)
+            try:
+                await asyncio.wait_for(self.speaker.reply_started.wait(), reply_timeout)
+            except TimeoutError:
+                self.missed_turns += 1
+                continue
+            self.turn_latencies.append(self.speaker.reply_started_at - ended)
+            await self._until_quiet(reply_timeout)
+
+    async def _until_quiet(self, timeout: float) -> None:
+        """Until the agent has said something and stopped talking."""
+        deadline = time.perf_counter() + timeout
+        await asyncio.wait_for(self.speaker.reply_started.wait(), timeout)
+        while self.speaker.playing and time.perf_counter() < deadline:
+            await asyncio.sleep(0.1)
+
+
+class FakeRoom(rtc.EventEmitter[str]):
+    def __init__(self, name: str) -> None:
+        super().__init__()
+        self.name = name
+        self.remote_participants: dict[str, Any] = {}
+
+
+class FakeJobContext:
+    """The part of `JobContext` the entrypoint uses, for a room where the callee picks up."""
+
+    def __init__(self, index: int, caller: Caller, userdata: dict[str, Any], metadata: str):
+        self.room = FakeRoom(f"loadtest-{index}")
+        self.job = SimpleNamespace(
+            id=f"AJ_loadtest_{index}", agent_name="loadtest", metadata=metadata
+        )
+        self.proc = SimpleNamespace(userdata=userdata, pid=os.getpid())
+        self.log_context_fields: dict[str, Any] = {}
+        self.caller = caller
+        self.shutdown_errors = 0
+        self._shutdown_callbacks: list[Callable[[], Awaitable[None]]] = []
+
+    def add_shutdown_callback(self, callback: Callable[[], Awaitable[None]]) -> None:
+        self._shutdown_callbacks.append(callback)
+
+    async def connect(self) -> None:
+        participant = SimpleNamespace(
+            identity="sip_loadtest",
+            attributes={"sip.trunkID": "ST_loadtest", "sip.callStatus": "active"},
+        )
+        self.room.remote_participants[participant.identity] = participant
+        self.room.emit("participant_connected", participant)
+
+    async def shutdown(self) -> None:
+        results = await asyncio.gather(
+            *(callback() for callback in self._shutdown_callbacks), return_exceptions=True
+        )
+        self.shutdown_errors = sum(isinstance(r, Exception) for r in results)
+
+
+# the call of this process, which `LoadTestSession` wires the session to
+current_call: FakeJobContext | None = None
+
+
+class LoadTestSession(AgentSession[Any]):
+    """`AgentSession` with the call's caller as audio input and output, instead of a room."""
+
+    async def start(self, agent: Agent, **_: Any) -> None:  # pyright: ignore[reportIncompatibleMethodOverride]
+        assert current_call is not None
+        self.input.audio = current_call.caller
+        self.output.audio = current_call.caller.speaker
+        current_call.add_shutdown_callback(self.aclose)
+        await super().start(agent)
+
+
+async def run_call(
+    index: int, options: argparse.Namespace, ready: Any, go: Event
+) -> dict[str, Any]:
+    """One call in this process: prewarm, wait for the step to start, then talk."""
+    global current_call
+
+    from livekit.plugins import silero
+
+    from agents.starter import config, run
+    from shared.audio_cache import AudioCache
+    from shared.cached_tts import CachedTTS
+    from shared.loop_watchdog import LoopWatchdog
+    from shared.metadata import CallMetadata
+
+    def tts_factory() -> CachedTTS:
+        return CachedTTS(
+            StandInTTS(ttfb=options.tts_ttfb),
+            AudioCache(None),
+            voice="loadtest",
+            max_chars=config.config.tts_cache_max_chars,
+        )
+
+    def llm_factory() -> StandInLLM:
+        return StandInLLM(
+            ttft=options.llm_ttft,
+            words=options.reply_words,
+            words_per_second=options.words_per_second,
+        )
+
+    config.agent_llm.override(llm_factory)
+    config.agent_summary_llm.override(llm_factory)
+    config.agent_stt.override(lambda: StandInSTT(delay=options.stt_delay))
+    config.agent_tts.override(tts_factory)
+    config.agent_mcp_server.override(StandInMCPServer)
+    config.provider_endpoints.clear()
+    run.MultilingualModel = lambda: StandInTurnDetector(options.eou_delay)  # pyright: ignore[reportAttributeAccessIssue]
+    run.AgentSession = LoadTestSession  # pyright: ignore[reportAttributeAccessIssue]
+
+    # what the worker's prewarm loads before the process gets a call
+    userdata = {"vad": silero.VAD.load(), "noise_cancellation": None}
+    config.providers.warm()
+    process = psutil.Process()
+    uss_idle = process.memory_full_info().uss
+
+    ready.put(index)
+    await asyncio.to_thread(go.wait)
+
+    caller = Caller(
+        turns=options.turns, utterance=options.utterance, pause=options.pause, seed=index
+    )
+    metadata = CallMetadata.from_record({"user_name": f"Caller {index}", "age": 30}).encode()
+    current_call = ctx = FakeJobContext(index, caller, userdata, metadata)
+    watchdog = LoopWatchdog()
+    watchdog.start()
+    uss_peak = uss_idle
+
+    async def sample_memory() -> None:
+        nonlocal uss_peak
+        while True:
+            uss_peak = max(uss_peak, process.memory_full_info().uss)
+            await asyncio.sleep(0.5)
+
+    sampler = asyncio.create_task(sample_memory())
+    cpu_started, started = process.cpu_times(), time.perf_counter()
+    await run.entrypoint(ctx)  # pyright: ignore[reportArgumentType]
+    await caller.run()
+    await ctx.shutdown()
+    cpu_ended, ended = process.cpu_times(), time.perf_counter()
+    sampler.cancel()
+    await watchdog.aclose()
+
+    return {
+        "cpu": (cpu_ended.user + cpu_ended.system - cpu_started.user - cpu_started.system)
+        / (ended - started),
+        "uss_idle": uss_idle,
+        "uss_peak": uss_peak,
+        "lag_p50": watchdog.lag_percentile(0.5),
+        "lag_p99": watchdog.lag_percentile(0.99),
+        "stalls": watchdog.stall_count,
+        "turns": caller.turn_latencies,
+        "missed": caller.missed_turns,
+        "errors": ctx.shutdown_errors,
+    }
+
+
+def call_process(index: int, options: argparse.Namespace, ready: Any, go: Event, results: Any):
+    logging.basicConfig(level=logging.ERROR)
+    try:
+        result = asyncio.run(run_call(index, options, ready, go))
+    except Exception as e:
+        logging.exception(f"Call {index} failed")
+        result = {"failed": repr(e)}
+        ready.put(index)
+    results.put(result)
+
+
+def run_step(calls: int, options: argparse.Namespace) -> dict[str, Any]:
+    mp = multiprocessing.get_context("spawn")
+    ready, results, go = mp.Queue(), mp.Queue(), mp.Event()
+    processes = [
+        mp.Process(target=call_process, args=(i, options, ready, go, results), daemon=True)
+        for i in range(calls)
+    ]
+    for p in processes:
+        p.start()
+    for _ in processes:
+        ready.get(timeout=300)
+
+    psutil.cpu_percent()
+    go.set()
+    step = [results.get(timeout=options.turns * 60 + 120) for _ in processes]
+    machine_cpu = psutil.cpu_percent()
+    for p in processes:
+        p.join(timeout=30)
+
+    done = [r for r in step if "failed" not in r]
+    turns = [t for r in done for t in r["turns"]]
+    return {
+        "calls": calls,
+        "machine_cpu": machine_cpu,
+        "cpu": statistics.mean(r["cpu"] for r in done) if done else 0.0,
+        "uss_idle": statistics.mean(r["uss_idle"] for r in done) if done else 0.0,
+        "uss_peak": statistics.mean(r["uss_peak"] for r in done) if done else 0.0,
+        "lag_p50": statistics.mean(r["lag_p50"] for r in done) if done else 0.0,
+        "lag_p99": max((r["lag_p99"] for r in done), default=0.0),
+        "stalls": sum(r["stalls"] for r in done),
+        "turn_p50": statistics.median(turns) if turns else 0.0,
+        "turn_p95": statistics.quantiles(turns, n=20)[-1] if len(turns) > 1 else 0.0,
+        "missed": sum(r["missed"] for r in done),
+        "failed": len(step) - len(done) + sum(r["errors"] > 0 for r in done),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ramp", default="1,4,8,16", help="concurrent calls per step")
+    parser.add_argument("--turns", type=int, default=4, help="caller utterances per call")
+    parser.add_argument("--utterance", type=float, default=1.5, help="seconds per utterance")
+    parser.add_argument("--pause", type=float, default=1.0, help="seconds before each utterance")
+    parser.add_argument("--stt-delay", type=float, default=0.15, help="final transcript delay")
+    parser.add_argument("--eou-delay", type=float, default=0.05, help="turn detector latency")
+    parser.add_argument("--llm-ttft", type=float, default=0.35, help="LLM time to first token")
+    parser.add_argument("--words-per-second", type=float, default=60)
+    parser.add_argument("--reply-words", type=int, default=24)
+    parser.add_argument("--tts-ttfb", type=float, default=0.12, help="TTS time to first byte")
+    options = parser.parse_args()
+
+    # inherited by the call processes: no credentials, nothing kept after the run
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    os.environ.update(
+        {"METRICS_EXPORTER": "none", "GREETING_MODE": "generate", "TRANSCRIPT_DIR": workdir}
+    )
+    for name in ("LIVEKIT_URL", "LIVEKIT_API_KEY", "LIVEKIT_API_SECRET", "MCP_URL"):
+        os.environ.setdefault(name, "loadtest")
+
+    cores = psutil.cpu_count() or 1
+    print(f"{cores} cores, {psutil.virtual_memory().total / 2**30:.1f} GiB")
+    print(
+        f"{'calls':>5} {'cpu %':>6} {'cpu/call':>8} {'idle MB':>8} {'peak MB':>8} "
+        f"{'lag p50':>8} {'lag p99':>8} {'stalls':>6} {'turn p50':>9} {'turn p95':>9} "
+        f"{'missed':>6} {'failed':>6}"
+    )
+    step: dict[str, Any] = {}
+    for calls in (int(s) for s in options.ramp.split(",")):
+        step = run_step(calls, options)
+        print(
+            f"{calls:>5} {step['machine_cpu']:>6.1f} {step['cpu']:>8.1%} "
+            f"{step['uss_idle'] / 2**20:>8.0f} {step['uss_peak'] / 2**20:>8.0f} "
+            f"{step['lag_p50'] * 1000:>6.0f}ms {step['lag_p99'] * 1000:>6.0f}ms "
+            f"{step['stalls']:>6} {step['turn_p50'] * 1000:>7.0f}ms "
+            f"{step['turn_p95'] * 1000:>7.0f}ms {step['missed']:>6} {step['failed']:>6}",
+            flush=True,
+        )
+    if step.get("cpu"):
+        print(
+            f"At {step['calls']} calls, one call takes {step['cpu']:.1%} of a core and "
+            f"{step['uss_peak'] / 2**20:.0f} MB: about {0.75 / step['cpu']:.0f} calls per core "
+            f"at WORKER_LOAD_THRESHOLD=0.75, memory permitting."
+        )
+
+
+if __name__ == "__main__":
+    main()
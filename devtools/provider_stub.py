@@ -0,0 +1,59 @@
+"""
+Minimal local stand-in for a speech provider (Deepgram/Cartesia style), used by the
+first-utterance benchmark. It serves an authenticated REST endpoint and a TTS websocket
+that answers each text message with audio after `ttfb` seconds. The first request on
+every new TCP connection waits `handshake` seconds, standing in for the TCP and TLS
+round trips a real provider costs.
+"""
+
+import asyncio
+import weakref
+
+from aiohttp import WSMsgType, web
+
+
+class ProviderStub:
+    def __init__(self, handshake: float = 0.15, ttfb: float = 0.08) -> None:
+        self.handshake = handshake
+        self.ttfb = ttfb
+        self._seen: weakref.WeakSet[asyncio.BaseTransport] = weakref.WeakSet()
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+    async def start(self, host: str = "127.0.0.1") -> str:
+        app = web.Application(middlewares=[self._handshake_middleware])
+        app.router.add_get("/voices/{voice_id}", self._voice)
+        app.router.add_get("/tts/websocket", self._tts)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # pyright: ignore
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def aclose(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @web.middleware
+    async def _handshake_middleware(self, request: web.Request, handler):  # pyright: ignore
+        if request.transport is not None and request.transport not in self._seen:
+            self._seen.add(request.transport)
+            await asyncio.sleep(self.handshake)
+        return await handler(request)
+
+    async def _voice(self, request: web.Request) -> web.Response:
+        if request.headers.get("X-API-Key") != "bench":
+            return web.json_response({"error": "unauthorized"}, status=401)
+        return web.json_response({"id": request.match_info["voice_id"]})
+
+    async def _tts(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                break
+            await asyncio.sleep(self.ttfb)
+            await ws.send_bytes(b"\x00" * 960)
+        return ws
@@ -5,7 +5,6 @@ from livekit.agents import (
     Agent,
     AgentSession,
     JobContext,
-    JobProcess,
     RoomInputOptions,
     RoomOutputOptions,
     RunContext,
@@ -15,9 +14,12 @@ from livekit.agents import (
 )
 from livekit.agents.llm import function_tool
 from livekit.agents.voice import MetricsCollectedEvent
-from livekit.plugins import cartesia, deepgram, google, noise_cancellation, silero
+from livekit.plugins import cartesia, deepgram, google, silero
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
+from shared.loop_watchdog import loop_watchdog_from_config
+from shared.prewarm import prewarm
+from shared.worker_load import worker_load_from_config
 from utils.environment import get_config
 
 get_config().check_required_env_vars()
@@ -56,15 +58,14 @@ class BaseAgent(Agent):
         return "sunny with a temperature of 70 degrees."
 
 
-def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
-
-
 async def entrypoint(ctx: JobContext):
     # each log entry will include these fields
     ctx.log_context_fields = {
         "room": ctx.room.name,
     }
+    # report anything that blocks the loop carrying the call's audio
+    watchdog = loop_watchdog_from_config()
+    watchdog.start()
 
     # Set up a voice AI pipeline using OpenAI, Cartesia, Deepgram, and the LiveKit turn detector
     session: AgentSession[UserData] = AgentSession(
@@ -93,9 +94,11 @@ async def entrypoint(ctx: JobContext):
     async def log_usage():
         summary = usage_collector.get_summary()
         logger.info(f"Usage: {summary}")
+        watchdog.log_summary()
 
     # shutdown callbacks are triggered when the session is over
     ctx.add_shutdown_callback(log_usage)
+    ctx.add_shutdown_callback(watchdog.aclose)
 
     await session.start(
         agent=BaseAgent(),
@@ -104,7 +107,7 @@ async def entrypoint(ctx: JobContext):
             # LiveKit Cloud enhanced noise cancellation
             # - If self-hosting, omit this parameter
             # - For telephony applications, use `BVCTelephony` for best results
-            noise_cancellation=noise_cancellation.BVC(),
+            noise_cancellation=ctx.proc.userdata["noise_cancellation"],
         ),
         room_output_options=RoomOutputOptions(transcription_enabled=True),
     )
@@ -114,7 +117,17 @@ async def entrypoint(ctx: JobContext):
 
 
 def main():
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
+    # take calls only while there's CPU left for them, see `shared.worker_load`
+    worker_load = worker_load_from_config()
+    cli.run_app(
+        WorkerOptions(
+            entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            load_fnc=worker_load.load,
+            request_fnc=worker_load.request,
+            load_threshold=worker_load.threshold,
+        )
+    )
 
 
 if __name__ == "__main__":
@@ -12,19 +12,24 @@ session_config = AgentSession(
 agent_config = AgentConfig(
     instructions="""
     You are a helpful voice AI assistant.
-    You eagerly assist users with their questions by providing information from your extensive knowledge.
+    Before the user can get help, ask for their username and password and verify them.
+    If they don't match, say so and ask again; never tell the user what the right ones are.
     Your responses are concise, to the point, and without any complex formatting or punctuation.
-    You are curious, friendly, and have a sense of humor.
     You talk in spanish.
-    You assist users with programming questions
-    """
+    """,
+    fillers=(
+        "Un momento, por favor.",
+        "Estoy verificando tus datos.",
+        "Sigo en ello, gracias por esperar.",
+    ),
 )
 
 agent_name = "base-agent"
 
-(output_dir := Path(__file__).parent.parent.parent / "output").mkdir(parents=True, exist_ok=True)
+output_dir = Path(__file__).parent.parent.parent / "output"
 
 
 def get_output_path(filename: str) -> Path:
-    """Get the output path for a given filename."""
+    """Get the output path for a given filename, creating the output directory on first use."""
+    output_dir.mkdir(parents=True, exist_ok=True)
     return output_dir / filename
@@ -5,8 +5,3 @@ from livekit.plugins import silero
 @define
 class UserData:
     vad: silero.VAD
-
-@define
-class ModelMetadata:
-    user_name: str
-    age: int
@@ -1,10 +1,11 @@
 import logging
 from datetime import datetime
-from json import JSONDecodeError, dump, loads
 
+from livekit import rtc
 from livekit.agents import (
     AgentSession,
     ChatContext,
+    ChatMessage,
     JobContext,
     RoomInputOptions,
     RoomOutputOptions,
@@ -12,32 +13,43 @@ from livekit.agents import (
     cli,
     metrics,
 )
-from livekit.agents.voice import MetricsCollectedEvent
-from livekit.plugins import cartesia, deepgram, google, noise_cancellation
+from livekit.agents.voice import (
+    ConversationItemAddedEvent,
+    FunctionToolsExecutedEvent,
+    MetricsCollectedEvent,
+)
+from livekit.plugins import cartesia, deepgram, google
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
+from agents.authenticator.config import session_config
 from agents.starter.agent import StarterAgent, prewarm
-from agents.starter.config import get_output_path, session_config
-from agents.starter.models import ModelMetadata, UserData
+from agents.starter.models import UserData
+from shared.loop_watchdog import loop_watchdog_from_config
+from shared.metadata import CallMetadata
+from shared.storage import start_uploads, storage_from_config
+from shared.transcripts import TranscriptStream
+from shared.voice_metrics import VoiceMetrics, metrics_backend, start_metrics_server
+from shared.worker_load import worker_load_from_config
 
 logger = logging.getLogger(__name__)
 
+transcript_storage = storage_from_config()
+
 
 async def entrypoint(ctx: JobContext):
     ctx.log_context_fields = {
         "room": ctx.room.name,
     }
-    metadata_json = ctx.job.metadata
-    print(ctx.job)
-    logger.info(f"Received metadata: {metadata_json}")
-
+    # report anything that blocks the loop carrying the call's audio
+    watchdog = loop_watchdog_from_config()
+    watchdog.start()
+    logger.debug(f"Job: {ctx.job}")
     try:
-        logger.debug("Parsing job metadata")
-        print(metadata_json)
-        metadata: ModelMetadata | None = loads(metadata_json)
-    except JSONDecodeError:
-        logger.warning("Failed to parse job metadata, using empty metadata")
-        metadata = None
+        metadata = CallMetadata.decode(ctx.job.metadata)
+    except ValueError as e:
+        logger.warning(f"Invalid job metadata, using empty metadata: {e}")
+        metadata = CallMetadata()
+    logger.info(f"Calling {metadata.user_name!r} with {len(ctx.job.metadata)} bytes of metadata")
 
     # Set up a voice AI pipeline using OpenAI, Cartesia, Deepgram, and the LiveKit turn detector
     session: AgentSession[UserData] = AgentSession(
@@ -50,33 +62,63 @@ async def entrypoint(ctx: JobContext):
         vad=ctx.proc.userdata["vad"],
     )
 
-    # log metrics as they are emitted, and total usage after session is over
+    # export latency metrics as they are emitted, and log total usage after session is over
     usage_collector = metrics.UsageCollector()
+    voice_metrics = VoiceMetrics(metrics_backend(), agent=ctx.job.agent_name or "default")
+
+    @ctx.room.on("participant_connected")  # pyright: ignore[reportUntypedFunctionDecorator, reportUnknownMemberType]
+    def _on_participant_connected(participant: rtc.RemoteParticipant):  # pyright: ignore[reportUnusedFunction]
+        voice_metrics.set_trunk(participant)
 
     @session.on("metrics_collected")  # pyright: ignore[reportUntypedFunctionDecorator, reportUnknownMemberType]
     def _on_metrics_collected(ev: MetricsCollectedEvent):  # pyright: ignore[reportUnusedFunction]
-        metrics.log_metrics(ev.metrics)
         usage_collector.collect(ev.metrics)
+        voice_metrics.collect(ev.metrics)
 
     async def log_usage():
         summary = usage_collector.get_summary()
         logger.info(f"Usage: {summary}")
+        if summary.llm_prompt_tokens:
+            cached = summary.llm_prompt_cached_tokens / summary.llm_prompt_tokens
+            logger.info(f"LLM prompt cache: {cached:.0%} of prompt tokens were cached")
+        watchdog.log_summary()
+        voice_metrics.collect_loop(watchdog)
+
+    # record the conversation as it happens, and compact it into the final transcript
+    # once the session is over
+    current_date = datetime.now().strftime("%Y%m%d_%H%M%S")
+    transcript = TranscriptStream(
+        transcript_storage.working_dir / f"transcript_{ctx.room.name}_{current_date}.jsonl"
+    )
+
+    @session.on("conversation_item_added")  # pyright: ignore[reportUntypedFunctionDecorator, reportUnknownMemberType]
+    def _on_conversation_item_added(ev: ConversationItemAddedEvent):  # pyright: ignore[reportUnusedFunction]
+        # the event's other type only exists to force this check
+        if isinstance(ev.item, ChatMessage):
+            transcript.append(ev.item)
+
+    @session.on("function_tools_executed")  # pyright: ignore[reportUntypedFunctionDecorator, reportUnknownMemberType]
+    def _on_function_tools_executed(ev: FunctionToolsExecutedEvent):  # pyright: ignore[reportUnusedFunction]
+        for call, output in ev.zipped():
+            transcript.append(call)
+            if output is not None:
+                transcript.append(output)
 
     async def write_transcript():
-        current_date = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"transcript_{ctx.room.name}_{current_date}.json"
-        filename = get_output_path(filename)
-        with open(filename, "w") as f:
-            dump(session.history.to_dict(), f, indent=2)
-        logger.info(f"Transcript saved to {filename}")
+        if path := await transcript.close():
+            await transcript_storage.save(path)
 
     ctx.add_shutdown_callback(write_transcript)
 
     # shutdown callbacks are triggered when the session is over
     ctx.add_shutdown_callback(log_usage)
+    ctx.add_shutdown_callback(voice_metrics.flush)
+    ctx.add_shutdown_callback(watchdog.aclose)
 
     initial_ctx = ChatContext()
-    initial_ctx.add_message(role="assistant", content=f"The user information is: {metadata}")
+    # per-call data goes after the instructions, which the provider caches across calls
+    # (see `shared.context_compaction`)
+    initial_ctx.add_message(role="assistant", content=metadata.describe())
 
     await session.start(
         agent=StarterAgent(chat_ctx=initial_ctx),
@@ -85,13 +127,16 @@ async def entrypoint(ctx: JobContext):
             # LiveKit Cloud enhanced noise cancellation
             # - If self-hosting, omit this parameter
             # - For telephony applications, use `BVCTelephony` for best results
-            noise_cancellation=noise_cancellation.BVC(),
+            noise_cancellation=ctx.proc.userdata["noise_cancellation"],
         ),
         room_output_options=RoomOutputOptions(transcription_enabled=True),
     )
 
     # join the room when agent is ready
     await ctx.connect()
+    # the SIP participant is dialed alongside the dispatch, so it may already be here
+    for participant in ctx.room.remote_participants.values():
+        voice_metrics.set_trunk(participant)
 
     await session.generate_reply(
         instructions="Greet the user by name and offer your assistance on programming paths."
@@ -99,9 +144,24 @@ async def entrypoint(ctx: JobContext):
 
 
 def main():
-    cli.run_app(
-        WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm, agent_name="base-agent")
-    )
+    start_metrics_server()
+    # take calls only while there's CPU left for them, see `shared.worker_load`
+    worker_load = worker_load_from_config()
+    # jobs only spool their transcripts, the worker uploads them in batches
+    stop_uploads = start_uploads(transcript_storage)
+    try:
+        cli.run_app(
+            WorkerOptions(
+                entrypoint_fnc=entrypoint,
+                prewarm_fnc=prewarm,
+                agent_name="base-agent",
+                load_fnc=worker_load.load,
+                request_fnc=worker_load.request,
+                load_threshold=worker_load.threshold,
+            )
+        )
+    finally:
+        stop_uploads()
 
 
 if __name__ == "__main__":
@@ -1,23 +1,40 @@
 import logging
 
-from livekit.agents import Agent, ChatContext
+from livekit.agents import ChatContext, RunContext
+from livekit.agents.llm import function_tool
 
-from agents.starter.config import (
-    agent_instructions,
-    agent_llm,
-    agent_stt,
-    agent_tts,
-)
+from agents.greeter.config import agent_fillers, agent_instructions
+from shared.config import SessionInfo
+from shared.context_compaction import ContextCompactor
+from shared.handoff import HandoffAgent, SharedSTTStream
 
 logger = logging.getLogger(__name__)
 
 
-class GreeterAgent(Agent):
-    def __init__(self, chat_ctx: ChatContext) -> None:
-        super().__init__(  # pyright: ignore[reportUnknownMemberType]
-            llm=agent_llm,
-            stt=agent_stt,
-            tts=agent_tts,
+class GreeterAgent(HandoffAgent):
+    """Opens the call, then hands it to the authenticator. Uses the session's models."""
+
+    def __init__(
+        self,
+        chat_ctx: ChatContext,
+        *,
+        compactor: ContextCompactor,
+        stt_stream: SharedSTTStream | None = None,
+    ) -> None:
+        super().__init__(
+            compactor=compactor,
+            stt_stream=stt_stream,
+            fillers=agent_fillers,
             instructions=agent_instructions,
             chat_ctx=chat_ctx,
         )
+
+    @function_tool
+    async def continue_to_authentication(self, context: RunContext[SessionInfo], name: str):
+        """Call this once the user has confirmed who they are and wants to go on.
+
+        Args:
+            name: The name the user gave
+        """
+        context.userdata.customer_name = name
+        return await self.handoff("authenticator")
@@ -1,5 +1,4 @@
-from livekit.plugins import cartesia, deepgram, openai
-
+from shared.providers import ProviderRegistry
 from utils.environment import get_config
 
 config = get_config()
@@ -7,9 +6,48 @@ config.check_required_env_vars()
 
 agent_name = "lyra"
 agent_instructions = """
-You are a helpful voice AI assistant.
+You are a helpful voice AI assistant, and the first voice the user hears on this call.
+Greet the user by name, confirm you are talking to the right person, and ask whether
+they have a minute. Keep it short. You talk in spanish.
 """
+# spoken while a tool is slow, see `shared.tool_runner`
+agent_fillers = (
+    "Un momento, por favor.",
+    "Déjame revisarlo.",
+    "Sigo en ello, gracias por esperar.",
+)
+
+# built on first use in each job process, see `agents.starter.config`
+providers = ProviderRegistry()
+
+
+def _llm():
+    from livekit.plugins import openai
+
+    return openai.LLM(model="gpt-4o")
+
+
+def _stt():
+    from livekit.plugins import deepgram
+
+    return deepgram.STT(model="nova-3", language="multi")
+
+
+def _tts():
+    from livekit.plugins import cartesia
+
+    from shared.audio_cache import audio_cache_from_config
+    from shared.cached_tts import CachedTTS
+
+    return CachedTTS(
+        cartesia.TTS(voice="12717d4c-6831-4b91-a0ab-e99d51755b10"),
+        audio_cache_from_config(config),
+        voice="12717d4c-6831-4b91-a0ab-e99d51755b10",
+        max_chars=config.tts_cache_max_chars,
+        phrases=agent_fillers,
+    )
+
 
-agent_llm = openai.LLM(model="gpt-4o")
-agent_stt = deepgram.STT(model="nova-3", language="multi")
-agent_tts = cartesia.TTS(voice="12717d4c-6831-4b91-a0ab-e99d51755b10")
+agent_llm = providers.register("llm", _llm)
+agent_stt = providers.register("stt", _stt)
+agent_tts = providers.register("tts", _tts)
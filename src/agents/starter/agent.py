@@ -1,6 +1,6 @@
 import logging
 
-from livekit.agents import Agent, ChatContext
+from livekit.agents import ChatContext, JobProcess
 
 from agents.starter.config import (
     agent_instructions,
@@ -8,18 +8,37 @@ from agents.starter.config import (
     agent_mcp_server,
     agent_stt,
     agent_tts,
+    context_compactor,
+    providers,
 )
+from shared.context_compaction import ContextCompactor
+from shared.handoff import HandoffAgent, SharedSTTStream
+from shared.prewarm import load_models
 
 logger = logging.getLogger(__name__)
 
 
-class StarterAgent(Agent):
-    def __init__(self, chat_ctx: ChatContext) -> None:
-        super().__init__(  # pyright: ignore[reportUnknownMemberType]
-            llm=agent_llm,
-            stt=agent_stt,
-            tts=agent_tts,
+class StarterAgent(HandoffAgent):
+    """The main agent: on its own (`agents.starter.run`), or after the authenticator in `run`."""
+
+    def __init__(
+        self,
+        chat_ctx: ChatContext,
+        *,
+        compactor: ContextCompactor | None = None,
+        stt_stream: SharedSTTStream | None = None,
+    ) -> None:
+        super().__init__(
+            compactor=compactor or context_compactor(),
+            stt_stream=stt_stream,
+            llm=agent_llm.get(),
+            stt=agent_stt.get(),
+            tts=agent_tts.get(),
             instructions=agent_instructions,
             chat_ctx=chat_ctx,
-            mcp_servers=[agent_mcp_server],
+            mcp_servers=[agent_mcp_server.get()],
         )
+
+
+def prewarm(proc: JobProcess):
+    load_models(proc, providers)
@@ -1,8 +1,13 @@
-from livekit.agents import mcp
-from livekit.plugins import cartesia, deepgram, google
+from typing import TYPE_CHECKING, Any
 
+from shared.providers import ProviderEndpoint, ProviderRegistry
 from utils.environment import get_config
 
+if TYPE_CHECKING:
+    from livekit.agents import llm, mcp, stt
+
+    from shared.cached_tts import CachedTTS
+
 config = get_config()
 config.check_required_env_vars()
 
@@ -10,16 +15,111 @@ agent_name = "lyra"
 agent_instructions = """
 You are a helpful voice AI assistant.
 """
+agent_voice = "12717d4c-6831-4b91-a0ab-e99d51755b10"
 
-agent_llm = google.LLM(model="gemini-2.5-flash-preview-05-20")
-agent_stt = deepgram.STT(model="nova-3", language="multi")
-agent_tts = cartesia.TTS(voice="12717d4c-6831-4b91-a0ab-e99d51755b10")
-
-agent_mcp_server = mcp.MCPServerHTTP(
-    url=config.mcp_server_url,
-    headers={
-        config.mcp_server_header: config.mcp_server_token,
-    },
-    timeout=10,
-    client_session_timeout_seconds=10,
+# spoken from cached audio when GREETING_MODE=template, instead of generating the greeting
+agent_greeting = (
+    "Hi {user_name}, this is Lyra. "
+    "I can help you find your way in programming. Where would you like to start?"
 )
+
+# plugins are built on first use in each job process (see `providers.warm` in prewarm),
+# so importing this module for `agent_name` doesn't pull in any provider SDK. Factories
+# are typed by what they provide, so a load test can override them with stand-ins.
+providers = ProviderRegistry()
+
+
+def _llm() -> "llm.LLM[Any]":
+    from livekit.plugins import google
+
+    return google.LLM(model="gemini-2.5-flash-preview-05-20")
+
+
+def _summary_llm() -> "llm.LLM[Any]":
+    from livekit.plugins import google
+
+    # a separate instance, so summary requests don't show up as turns in the LLM metrics
+    return google.LLM(model="gemini-2.5-flash-preview-05-20", temperature=0.2)
+
+
+def _stt() -> "stt.STT[Any]":
+    from livekit.plugins import deepgram
+
+    return deepgram.STT(model="nova-3", language="multi")
+
+
+def _tts() -> "CachedTTS":
+    from livekit.plugins import cartesia
+
+    from shared.audio_cache import audio_cache_from_config
+    from shared.cached_tts import CachedTTS
+    from shared.tool_runner import DEFAULT_FILLERS
+
+    return CachedTTS(
+        cartesia.TTS(voice=agent_voice),
+        audio_cache_from_config(config),
+        voice=agent_voice,
+        max_chars=config.tts_cache_max_chars,
+        phrases=DEFAULT_FILLERS,
+    )
+
+
+def _tool_runner():
+    from shared.tool_runner import ToolBudget, ToolRunner, parse_tool_budgets
+
+    return ToolRunner(
+        max_concurrency=config.tool_max_concurrency,
+        default_budget=ToolBudget(config.tool_soft_deadline, config.tool_hard_deadline),
+        budgets=parse_tool_budgets(config.tool_budgets),
+    )
+
+
+def _mcp_server() -> "mcp.MCPServer":
+    from shared.mcp_client import SharedMCPServer, parse_cached_tools
+
+    return SharedMCPServer(
+        url=config.mcp_server_url,
+        headers={
+            config.mcp_server_header: config.mcp_server_token,
+        },
+        timeout=10,
+        client_session_timeout_seconds=10,
+        tools_ttl=config.mcp_tools_ttl,
+        cached_tools=parse_cached_tools(config.mcp_cached_tools),
+        tool_runner=agent_tool_runner.get(),
+    )
+
+
+agent_llm = providers.register("llm", _llm)
+agent_summary_llm = providers.register("summary_llm", _summary_llm)
+agent_stt = providers.register("stt", _stt)
+agent_tts = providers.register("tts", _tts)
+agent_tool_runner = providers.register("tool_runner", _tool_runner)
+agent_mcp_server = providers.register("mcp_server", _mcp_server)
+
+
+def context_compactor():
+    """A compactor for one agent's conversation, see `shared.context_compaction`."""
+    from shared.context_compaction import ContextCompactor
+
+    return ContextCompactor(
+        agent_summary_llm.get() if config.context_summary else None,
+        window_turns=config.context_window_turns,
+        max_tokens=config.context_max_tokens,
+    )
+
+
+# authenticated requests that open the connections the STT and TTS websockets then reuse
+# (the Gemini client keeps its own connection pool, outside the job's HTTP session)
+provider_endpoints = [
+    ProviderEndpoint(
+        "stt",
+        "https://api.deepgram.com/v1/projects",
+        {"Authorization": f"Token {config.deepgram_api_key}"},
+    ),
+    ProviderEndpoint(
+        "tts",
+        f"https://api.cartesia.ai/voices/{agent_voice}",
+        {"X-API-Key": config.cartesia_api_key, "Cartesia-Version": "2024-06-10"},
+    ),
+]
@@ -0,0 +1,132 @@
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import timedelta
+from types import TracebackType
+
+import aiohttp
+from livekit import api
+from livekit.api.access_token import DEFAULT_TTL
+
+logger = logging.getLogger(__name__)
+
+AuthHeaderFn = Callable[..., dict[str, str]]
+
+
+class TokenCache:
+    """
+    Reuses signed API tokens across calls instead of signing a new JWT per request.
+
+    Tokens are keyed on their grants, so grants that don't name a room (such as the
+    SIP `call` grant used to dial) are shared by every call, while room-scoped grants
+    are reused for follow-up requests on the same room. Entries are refreshed well
+    before the token's own expiry.
+    """
+
+    def __init__(
+        self,
+        ttl: timedelta = DEFAULT_TTL,
+        refresh_margin: timedelta = timedelta(minutes=10),
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._lifetime = (ttl - refresh_margin).total_seconds()
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, dict[str, str]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def wrap(self, auth_header: AuthHeaderFn) -> AuthHeaderFn:
+        def cached_auth_header(*args: object, **kwargs: object) -> dict[str, str]:
+            key = repr((args, kwargs))
+            now = self._clock()
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+                entry = (now + self._lifetime, auth_header(*args, **kwargs))
+                self._entries[key] = entry
+                if len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+            # The twirp client adds headers to the dict it is given, so never hand out
+            # the cached instance.
+            return dict(entry[1])
+
+        return cached_auth_header
+
+
+class LiveKitClientManager:
+    """
+    Long-lived `LiveKitAPI` client for the dialer.
+
+    All calls share one aiohttp session with a keep-alive connection pool, so each
+    dial reuses warm connections instead of paying for a new session, TCP/TLS
+    handshake and token signature. Use as an async context manager, or call `start`
+    and `aclose` explicitly; the session has to be created inside the running loop.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        api_key: str | None = None,
+        api_secret: str | None = None,
+        *,
+        pool_size: int = 100,
+        keepalive_timeout: float = 60.0,
+        timeout: aiohttp.ClientTimeout | None = None,
+        token_cache: TokenCache | None = None,
+    ) -> None:
+        self._url = url
+        self._api_key = api_key
+        self._api_secret = api_secret
+        self._pool_size = pool_size
+        self._keepalive_timeout = keepalive_timeout
+        self._timeout = timeout or aiohttp.ClientTimeout(total=30)
+        self.token_cache = token_cache or TokenCache()
+        self._session: aiohttp.ClientSession | None = None
+        self._api: api.LiveKitAPI | None = None
+
+    @property
+    def client(self) -> api.LiveKitAPI:
+        if self._api is None:
+            raise RuntimeError("LiveKitClientManager is not started")
+        return self._api
+
+    async def start(self) -> api.LiveKitAPI:
+        if self._api is not None:
+            return self._api
+
+        connector = aiohttp.TCPConnector(
+            limit=self._pool_size,
+            keepalive_timeout=self._keepalive_timeout,
+            ttl_dns_cache=300,
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+        lkapi = api.LiveKitAPI(self._url, self._api_key, self._api_secret, session=self._session)
+        for service in (lkapi.agent_dispatch, lkapi.sip, lkapi.room, lkapi.egress, lkapi.ingress):
+            service._auth_header = self.token_cache.wrap(service._auth_header)  # pyright: ignore[reportPrivateUsage, reportAttributeAccessIssue]
+        self._api = lkapi
+        logger.debug(f"Started pooled LiveKit API client (pool size {self._pool_size})")
+        return lkapi
+
+    async def aclose(self) -> None:
+        # LiveKitAPI doesn't close sessions it was given, so the session is ours to close.
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self._api = None
+
+    async def __aenter__(self) -> api.LiveKitAPI:
+        return await self.start()
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
@@ -0,0 +1,312 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import math
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable, Iterable
+from enum import StrEnum
+from pathlib import Path
+
+import aiohttp
+from attrs import define, field
+from livekit import api
+
+from calls.campaign import Dialer, run_campaign
+from calls.models import CallResult, CampaignRow, DialResult
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RETRYABLE_CODES = {
+    api.TwirpErrorCode.RESOURCE_EXHAUSTED,
+    api.TwirpErrorCode.UNAVAILABLE,
+    api.TwirpErrorCode.DEADLINE_EXCEEDED,
+    api.TwirpErrorCode.ABORTED,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaign (
+    campaign_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS calls (
+    idempotency_key TEXT PRIMARY KEY,
+    row_index INTEGER NOT NULL,
+    phone_number TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    room_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    dispatch_id TEXT,
+    sip_participant_id TEXT,
+    last_error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calls_due ON calls (status, next_attempt_at, row_index);
+"""
+
+
+class CallStatus(StrEnum):
+    pending = "pending"
+    dialing = "dialing"
+    done = "done"
+    failed = "failed"
+    # was mid-dial when the process died, so it may or may not have been placed
+    uncertain = "uncertain"
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Transient failures worth retrying: rate limits, busy or unavailable trunks, timeouts."""
+    if isinstance(error, api.TwirpError):
+        return error.status in RETRYABLE_STATUSES or error.code in RETRYABLE_CODES
+    return isinstance(error, aiohttp.ClientError | TimeoutError)
+
+
+@define
+class Backoff:
+    """
+    Jittered exponential backoff ("full jitter"): attempt `n` waits a random delay in
+    `[0, min(max_delay, base_delay * 2 ** (n - 1))]`, which spreads retries from many
+    workers instead of having them hit a throttled trunk in lockstep.
+    """
+
+    base_delay: float = 2.0
+    max_delay: float = 60.0
+    max_attempts: int = 5
+    rng: random.Random = field(factory=random.Random)
+
+    def delay(self, attempt: int) -> float:
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CallQueue:
+    """
+    SQLite-backed queue of campaign calls that survives process restarts.
+
+    Each row is keyed by an idempotency key and always dials into the same room:
+    enqueueing is `INSERT OR IGNORE`, and completed rows are never claimed again. Rows
+    that were mid-dial when the process died are marked `uncertain` on `recover` and
+    left for manual review: the call may have been placed, answered and ended already,
+    which the room no longer shows, so no row is ever dialed twice.
+
+    Statements are tiny and run in WAL mode, so they are called directly from the
+    event loop; a lock serializes access to the shared connection.
+    """
+
+    def __init__(
+        self, path: Path, *, room_name_prefix: str, clock: Callable[[], float] = time.time
+    ) -> None:
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._settled = asyncio.Event()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        row = self._db.execute("SELECT campaign_id FROM campaign").fetchone()
+        if row is None:
+            self.campaign_id = uuid.uuid4().hex[:8]
+            self._db.execute("INSERT INTO campaign VALUES (?)", (self.campaign_id,))
+        else:
+            self.campaign_id = row["campaign_id"]
+        self._room_name_prefix = f"{room_name_prefix}{self.campaign_id}-"
+
+    def close(self) -> None:
+        self._db.close()
+
+    def room_name_for(self, idempotency_key: str) -> str:
+        return self._room_name_prefix + hashlib.sha256(idempotency_key.encode()).hexdigest()[:16]
+
+    def enqueue(self, rows: Iterable[CampaignRow]) -> int:
+        """
+        Add rows that aren't queued yet and return how many were new. Rows without an
+        `idempotency_key` are keyed on their position and phone number, so re-running
+        the same campaign file resumes it instead of starting over.
+        """
+        now = self._clock()
+
+        def records() -> Iterable[tuple[object, ...]]:
+            for row in rows:
+                key = row.idempotency_key or f"{row.row_index}:{row.phone_number}"
+                yield (
+                    key,
+                    row.row_index,
+                    row.phone_number,
+                    json.dumps(row.metadata),
+                    self.room_name_for(key),
+                    CallStatus.pending,
+                    now,
+                )
+
+        with self._lock:
+            before = self._db.total_changes
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO calls (idempotency_key, row_index, phone_number,"
+                    " metadata, room_name, status, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    records(),
+                )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return self._db.total_changes - before
+
+    def recover(self) -> int:
+        """Mark rows left mid-dial by a crashed run as `uncertain`, instead of redialing them."""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE calls SET status = ?, last_error = ?, updated_at = ? WHERE status = ?",
+                (
+                    CallStatus.uncertain,
+                    "interrupted mid-dial, the call may have been placed",
+                    self._clock(),
+                    CallStatus.dialing,
+                ),
+            )
+        if cursor.rowcount:
+            logger.warning(
+                f"{cursor.rowcount} calls were interrupted mid-dial and may have been placed, "
+                "marked uncertain for manual review instead of dialing them again"
+            )
+        return cursor.rowcount
+
+    def claim(self) -> CampaignRow | None:
+        """Atomically take the next due row and mark it as dialing."""
+        now = self._clock()
+        with self._lock:
+            row = self._db.execute(
+                "UPDATE calls SET status = ?, attempts = attempts + 1, updated_at = ?"
+                " WHERE idempotency_key = (SELECT idempotency_key FROM calls"
+                " WHERE status = ? AND next_attempt_at <= ?"
+                " ORDER BY next_attempt_at, row_index LIMIT 1) RETURNING *",
+                (CallStatus.dialing, now, CallStatus.pending, now),
+            ).fetchone()
+        if row is None:
+            return None
+        return CampaignRow(
+            phone_number=row["phone_number"],
+            metadata=json.loads(row["metadata"]),
+            row_index=row["row_index"],
+            idempotency_key=row["idempotency_key"],
+            attempt=row["attempts"],
+            room_name=row["room_name"],
+        )
+
+    def next_due(self) -> float | None:
+        """
+        When the next pending row becomes due, or `None` once every row is done or
+        failed. Returns `math.inf` while the only unfinished rows are in flight, since
+        those may still be rescheduled.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(CASE WHEN status = ? THEN next_attempt_at END) AS due,"
+                " COUNT(*) AS unfinished FROM calls WHERE status IN (?, ?)",
+                (CallStatus.pending, CallStatus.pending, CallStatus.dialing),
+            ).fetchone()
+        if not row["unfinished"]:
+            return None
+        return row["due"] if row["due"] is not None else math.inf
+
+    def mark_done(self, idempotency_key: str, result: DialResult) -> None:
+        self._update(
+            idempotency_key,
+            status=CallStatus.done,
+            dispatch_id=result.dispatch_id,
+            sip_participant_id=result.sip_participant_id,
+            last_error=None,
+        )
+
+    def mark_retry(self, idempotency_key: str, error: str, delay: float) -> None:
+        self._update(
+            idempotency_key,
+            status=CallStatus.pending,
+            next_attempt_at=self._clock() + delay,
+            last_error=error,
+        )
+
+    def mark_failed(self, idempotency_key: str, error: str) -> None:
+        self._update(idempotency_key, status=CallStatus.failed, last_error=error)
+
+    def counts(self) -> dict[CallStatus, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM calls GROUP BY status")
+            return {CallStatus(status): count for status, count in rows}
+
+    def _update(self, idempotency_key: str, **values: object) -> None:
+        values["updated_at"] = self._clock()
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        with self._lock:
+            self._db.execute(
+                f"UPDATE calls SET {assignments} WHERE idempotency_key = ?",
+                (*values.values(), idempotency_key),
+            )
+        self._settled.set()
+
+    async def claims(self, poll_interval: float = 1.0) -> AsyncIterator[CampaignRow]:
+        """Yield rows as they become due until every row is done or has failed."""
+        while True:
+            row = self.claim()
+            if row is not None:
+                yield row
+                continue
+            due = self.next_due()
+            if due is None:
+                return
+            # Wake up early when an in-flight call settles, since it may have been
+            # rescheduled or may have been the last one.
+            self._settled.clear()
+            timeout = min(poll_interval, max(due - self._clock(), 0.0))
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._settled.wait(), timeout)
+
+
+async def run_durable_campaign(
+    queue: CallQueue,
+    dial: Dialer,
+    *,
+    concurrency: int,
+    calls_per_second: float | None = None,
+    backoff: Backoff | None = None,
+) -> AsyncIterator[CallResult]:
+    """
+    Like `run_campaign`, but pulls rows from `queue` and records every outcome there.
+
+    Retryable failures are rescheduled with jittered backoff until `max_attempts`;
+    each attempt still yields its own `CallResult`.
+    """
+    backoff = backoff or Backoff()
+    queue.recover()
+
+    async def dial_and_record(row: CampaignRow) -> DialResult:
+        try:
+            result = await dial(row)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if is_retryable(e) and row.attempt < backoff.max_attempts:
+                delay = backoff.delay(row.attempt)
+                logger.warning(f"Retrying {row.idempotency_key} in {delay:.1f}s: {error}")
+                queue.mark_retry(row.idempotency_key, error, delay)
+            else:
+                queue.mark_failed(row.idempotency_key, error)
+            raise
+        queue.mark_done(row.idempotency_key, result)
+        return result
+
+    async for result in run_campaign(
+        queue.claims(),
+        dial_and_record,
+        concurrency=concurrency,
+        calls_per_second=calls_per_second,
+    ):
+        yield result
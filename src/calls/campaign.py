@@ -0,0 +1,178 @@
+import asyncio
+import csv
+import json
+import logging
+import time
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+)
+from pathlib import Path
+
+from calls.models import CallResult, CampaignRow, DialResult
+
+logger = logging.getLogger(__name__)
+
+PHONE_NUMBER_FIELD = "phone_number"
+
+Dialer = Callable[[CampaignRow], Awaitable[DialResult]]
+
+
+def read_campaign(path: Path) -> Iterator[CampaignRow]:
+    """
+    Stream campaign rows from a CSV or JSONL file without loading it into memory.
+
+    Every row needs a `phone_number` column/key; all other columns are passed through
+    as per-call metadata. Rows without a phone number are skipped with a warning so a
+    single bad line doesn't abort a large campaign.
+    """
+    if path.suffix == ".jsonl":
+        yield from _read_jsonl(path)
+    elif path.suffix == ".csv":
+        yield from _read_csv(path)
+    else:
+        raise ValueError(f"Unsupported campaign file type: {path.suffix} (use .csv or .jsonl)")
+
+
+def _read_csv(path: Path) -> Iterator[CampaignRow]:
+    with path.open(newline="") as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames is None or PHONE_NUMBER_FIELD not in reader.fieldnames:
+            raise ValueError(f"Campaign file {path} has no `{PHONE_NUMBER_FIELD}` column")
+        for index, record in enumerate(reader):
+            row = _to_row(dict(record), index)
+            if row is not None:
+                yield row
+
+
+def _read_jsonl(path: Path) -> Iterator[CampaignRow]:
+    with path.open() as f:
+        index = 0
+        for line in f:
+            if not line.strip():
+                continue
+            row = _to_row(json.loads(line), index)
+            index += 1
+            if row is not None:
+                yield row
+
+
+def _to_row(record: dict[str, object], index: int) -> CampaignRow | None:
+    phone_number = str(record.pop(PHONE_NUMBER_FIELD, None) or "").strip()
+    if not phone_number:
+        logger.warning(f"Skipping campaign row {index}: missing {PHONE_NUMBER_FIELD}")
+        return None
+    return CampaignRow(phone_number=phone_number, metadata=record, row_index=index)
+
+
+class CallPacer:
+    """
+    Spaces call starts at least `1 / calls_per_second` apart across all workers.
+    """
+
+    def __init__(self, calls_per_second: float | None) -> None:
+        self._interval = 1 / calls_per_second if calls_per_second else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self._interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def run_campaign(
+    rows: Iterable[CampaignRow] | AsyncIterable[CampaignRow],
+    dial: Dialer,
+    *,
+    concurrency: int,
+    calls_per_second: float | None = None,
+) -> AsyncIterator[CallResult]:
+    """
+    Dial every row through a pool of `concurrency` workers and yield a `CallResult`
+    per row as each call completes (not in input order).
+
+    Rows are pulled lazily through a small bounded queue, so memory stays flat no
+    matter how large the campaign file is. `rows` may also be an async iterable, such
+    as the claims of a durable `CallQueue`. A failed dial is reported in the result's
+    `error` field and never stops the other workers.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    pending: asyncio.Queue[CampaignRow | None] = asyncio.Queue(maxsize=concurrency * 2)
+    results: asyncio.Queue[CallResult | None] = asyncio.Queue()
+    pacer = CallPacer(calls_per_second)
+
+    async def release_workers() -> None:
+        for _ in range(concurrency):
+            await pending.put(None)
+
+    async def produce() -> None:
+        try:
+            if isinstance(rows, AsyncIterable):
+                async for row in rows:
+                    await pending.put(row)
+            else:
+                for row in rows:
+                    await pending.put(row)
+        except Exception:
+            # Let the workers drain; the error is re-raised to the caller afterwards.
+            await release_workers()
+            raise
+        await release_workers()
+
+    async def work() -> None:
+        while (row := await pending.get()) is not None:
+            await pacer.wait()
+            await results.put(await _dial_row(row, dial))
+        await results.put(None)
+
+    tasks = [asyncio.create_task(produce())]
+    tasks += [asyncio.create_task(work()) for _ in range(concurrency)]
+    try:
+        finished_workers = 0
+        while finished_workers < concurrency:
+            result = await results.get()
+            if result is None:
+                finished_workers += 1
+            else:
+                yield result
+        # Surface producer errors such as a malformed campaign file.
+        await tasks[0]
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _dial_row(row: CampaignRow, dial: Dialer) -> CallResult:
+    started = time.monotonic()
+    result = CallResult(
+        phone_number=row.phone_number,
+        row_index=row.row_index,
+        idempotency_key=row.idempotency_key,
+        attempt=row.attempt,
+        room_name=row.room_name,
+    )
+    try:
+        dialed = await dial(row)
+    except Exception as e:
+        logger.exception(f"Call to row {row.row_index} failed")
+        result.error = f"{type(e).__name__}: {e}"
+    else:
+        result.room_name = dialed.room_name
+        result.dispatch_id = dialed.dispatch_id
+        result.sip_participant_id = dialed.sip_participant_id
+        result.timings = dialed.timings
+    result.latency = time.monotonic() - started
+    return result
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import random
+import time
+import uuid
+from collections.abc import Awaitable
+from typing import Any
+
+import aiohttp
+from livekit import api
+
+from calls.models import DialResult, DialTimings
+
+logger = logging.getLogger(__name__)
+
+SIP_PARTICIPANT_IDENTITY = "phone_user"
+
+# Strong references to fire-and-forget debug lookups so they aren't garbage collected.
+_background_tasks: set[asyncio.Task[Any]] = set()
+
+
+async def place_call(
+    lkapi: api.LiveKitAPI,
+    phone_number: str,
+    metadata_json: str,
+    *,
+    agent_name: str,
+    trunk_id: str,
+    room_name_prefix: str,
+    room_name: str | None = None,
+    overlap: bool = True,
+    debug_sample_rate: float = 0.0,
+) -> DialResult:
+    """
+    Dispatch `agent_name` to a fresh room (or `room_name`, if given) and dial
+    `phone_number` into it.
+
+    With `overlap` the dispatch and SIP participant requests are sent concurrently,
+    so time-to-ring is one API round trip instead of two; the agent still joins long
+    before the callee can answer. If only one of the two requests succeeds, the other
+    half is undone (dispatch deleted or SIP participant removed) so a failed dial
+    leaves neither an orphan dispatch nor a call without an agent. The dispatch is
+    kept when the SIP request failed without a definite answer (e.g. a timeout), since
+    the phone may be ringing; a retry's `find_placed_call` settles it.
+
+    `debug_sample_rate` is the fraction of calls for which the room's dispatches are
+    listed and logged at debug level after the dial, off the hot path.
+
+    Kept free of environment config so it can be driven by the CLI, the campaign
+    runner and benchmarks alike; `lkapi` is expected to be a shared client.
+    """
+    if room_name is None:
+        # Create a unique room name for each call using the prefix and row index
+        room_id = str(uuid.uuid4())
+        logger.info(f"Generated unique room ID: {room_id}")
+        room_name = f"{room_name_prefix}{room_id}"
+    timings = DialTimings()
+    started = time.perf_counter()
+
+    async def create_dispatch() -> api.AgentDispatch:
+        stage_started = time.perf_counter()
+        logger.info(f"Creating dispatch for agent {agent_name} in room {room_name}")
+        try:
+            return await lkapi.agent_dispatch.create_dispatch(
+                api.CreateAgentDispatchRequest(
+                    agent_name=agent_name, room=room_name, metadata=metadata_json
+                )
+            )
+        finally:
+            timings.dispatch = time.perf_counter() - stage_started
+
+    async def create_sip_participant() -> api.SIPParticipantInfo:
+        stage_started = time.perf_counter()
+        logger.info(f"Dialing phone to room {room_name}")
+        try:
+            return await lkapi.sip.create_sip_participant(
+                api.CreateSIPParticipantRequest(
+                    room_name=room_name,
+                    sip_trunk_id=trunk_id,
+                    sip_call_to=phone_number,
+                    participant_identity=SIP_PARTICIPANT_IDENTITY,
+                )
+            )
+        finally:
+            timings.sip_participant = time.perf_counter() - stage_started
+
+    dispatch: api.AgentDispatch | BaseException
+    sip_participant: api.SIPParticipantInfo | BaseException | None = None
+    if overlap:
+        dispatch, sip_participant = await asyncio.gather(
+            create_dispatch(), create_sip_participant(), return_exceptions=True
+        )
+    else:
+        dispatch = await _capture(create_dispatch())
+        if not isinstance(dispatch, BaseException):
+            sip_participant = await _capture(create_sip_participant())
+
+    if isinstance(dispatch, BaseException) or not isinstance(
+        sip_participant, api.SIPParticipantInfo
+    ):
+        if not isinstance(dispatch, BaseException) and _may_have_dialed(sip_participant):
+            logger.warning(
+                f"Dialing into {room_name} failed without a definite answer, keeping "
+                f"dispatch {dispatch.id} in case the phone is ringing: {sip_participant!r}"
+            )
+        else:
+            await _undo_partial_dial(lkapi, room_name, dispatch, sip_participant)
+        raise dispatch if isinstance(dispatch, BaseException) else sip_participant  # pyright: ignore[reportGeneralTypeIssues]
+    logger.info(f"Created dispatch: {dispatch}")
+    logger.info(f"Created SIP participant: {sip_participant}")
+
+    timings.total = time.perf_counter() - started
+    logger.info(
+        f"Dial timings for {room_name}: dispatch {timings.dispatch * 1000:.1f} ms, "
+        f"sip participant {timings.sip_participant * 1000:.1f} ms, "
+        f"total {timings.total * 1000:.1f} ms"
+    )
+
+    if debug_sample_rate and random.random() < debug_sample_rate:
+        task = asyncio.create_task(_log_dispatches(lkapi, room_name))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    return DialResult(
+        room_name=room_name,
+        dispatch_id=dispatch.id,
+        sip_participant_id=sip_participant.participant_id,
+        timings=timings,
+    )
+
+
+async def find_placed_call(
+    lkapi: api.LiveKitAPI, room_name: str, *, agent_name: str, metadata_json: str
+) -> DialResult | None:
+    """
+    Make a retried dial safe to repeat.
+
+    Returns the earlier attempt's call if its SIP participant is already in the room,
+    so the caller can record it instead of dialing twice, dispatching `agent_name` to
+    it first if the earlier attempt's dispatch is gone. Otherwise deletes any dispatch
+    left behind by the earlier attempt (for example after a crash between the two API
+    calls) and returns `None`.
+    """
+    try:
+        participants = await lkapi.room.list_participants(
+            api.ListParticipantsRequest(room=room_name)
+        )
+    except api.TwirpError as e:
+        if e.code != api.TwirpErrorCode.NOT_FOUND:
+            raise
+        participants = api.ListParticipantsResponse()
+    dispatches = await lkapi.agent_dispatch.list_dispatch(room_name)
+
+    for participant in participants.participants:
+        if participant.identity == SIP_PARTICIPANT_IDENTITY:
+            logger.info(f"Call in {room_name} was already placed, not dialing again")
+            if not dispatches:
+                logger.warning(f"Call in {room_name} has no agent, dispatching {agent_name}")
+                dispatches = [
+                    await lkapi.agent_dispatch.create_dispatch(
+                        api.CreateAgentDispatchRequest(
+                            agent_name=agent_name, room=room_name, metadata=metadata_json
+                        )
+                    )
+                ]
+            return DialResult(
+                room_name=room_name,
+                dispatch_id=dispatches[0].id,
+                sip_participant_id=participant.sid,
+            )
+
+    for dispatch in dispatches:
+        logger.info(f"Deleting orphan dispatch {dispatch.id} in {room_name}")
+        await lkapi.agent_dispatch.delete_dispatch(dispatch.id, room_name)
+    return None
+
+
+def _may_have_dialed(error: object) -> bool:
+    """Whether a failed SIP participant request may still have reached the trunk."""
+    if isinstance(error, api.TwirpError):
+        return error.code == api.TwirpErrorCode.DEADLINE_EXCEEDED or error.status == 504
+    # a connection that was never made sent nothing
+    return isinstance(error, TimeoutError | aiohttp.ClientError) and not isinstance(
+        error, aiohttp.ClientConnectorError
+    )
+
+
+async def _capture[T](request: Awaitable[T]) -> T | BaseException:
+    try:
+        return await request
+    except Exception as e:
+        return e
+
+
+async def _undo_partial_dial(
+    lkapi: api.LiveKitAPI,
+    room_name: str,
+    dispatch: object,
+    sip_participant: object,
+) -> None:
+    try:
+        if isinstance(dispatch, api.AgentDispatch):
+            logger.warning(f"Dial failed, deleting dispatch {dispatch.id} in {room_name}")
+            await lkapi.agent_dispatch.delete_dispatch(dispatch.id, room_name)
+        if isinstance(sip_participant, api.SIPParticipantInfo):
+            logger.warning(f"Dispatch failed, hanging up SIP participant in {room_name}")
+            await lkapi.room.remove_participant(
+                api.RoomParticipantIdentity(room=room_name, identity=SIP_PARTICIPANT_IDENTITY)
+            )
+    except Exception:
+        logger.exception(f"Failed to clean up partial dial in {room_name}")
+
+
+async def _log_dispatches(lkapi: api.LiveKitAPI, room_name: str) -> None:
+    try:
+        logger.debug(f"Dispatches: {await lkapi.agent_dispatch.list_dispatch(room_name)}")
+    except Exception:
+        logger.debug(f"Failed to list dispatches for {room_name}", exc_info=True)
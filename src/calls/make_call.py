@@ -1,19 +1,28 @@
+import argparse
 import asyncio
 import logging
-import uuid
+from contextlib import closing
 from json import dumps
+from pathlib import Path
+from typing import cast
 
 from attrs import asdict
 from livekit import api
 
 from agents.starter.config import agent_name
-from agents.starter.models import ModelMetadata
+from calls.api_client import LiveKitClientManager
+from calls.call_queue import Backoff, CallQueue, run_durable_campaign
+from calls.campaign import read_campaign
+from calls.dialer import find_placed_call, place_call
+from calls.models import CampaignRow, DialResult
+from calls.trunks import TrunkGovernor, TrunkStrategy, parse_trunks
+from shared.metadata import CallMetadata
 from utils.environment import get_config
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
     level=logging.DEBUG,
-    #format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+    # format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
 )
 
 config = get_config()
@@ -24,50 +33,126 @@ room_name_prefix = "survey-call-"
 outbound_trunk_id = config.sip_outbound_trunk_id
 
 
-async def make_survey_call(phone_number: str):
+async def make_survey_call(
+    lkapi: api.LiveKitAPI,
+    phone_number: str,
+    metadata: CallMetadata,
+    room_name: str | None = None,
+    trunk_id: str = outbound_trunk_id,
+) -> DialResult:
     """Create a dispatch and add a SIP participant to call the phone number with survey question"""
-    # Create a unique room name for each call using the prefix and row index
-    room_id = str(uuid.uuid4())
-    logger.info(f"Generated unique room ID: {room_id}")
-    room_name = f"{room_name_prefix}{room_id}"
-
-    metadata = ModelMetadata(
-        user_name="Jhosaim",
-        age=30
+    metadata_dump = metadata.encode()
+    logger.debug(f"Metadata for dispatch: {len(metadata_dump)} bytes")
+
+    return await place_call(
+        lkapi,
+        phone_number,
+        metadata_dump,
+        agent_name=agent_name,
+        trunk_id=trunk_id,
+        room_name_prefix=room_name_prefix,
+        room_name=room_name,
+        overlap=config.dial_overlap,
+        debug_sample_rate=config.dial_debug_sample_rate,
     )
 
-    # Create metadata as JSON containing all relevant data
-    metadata_dump = dumps(asdict(metadata))
-    logger.info(f"Metadata for dispatch: {metadata_dump}")
 
-    lkapi = api.LiveKitAPI()
+async def run_survey_campaign(
+    campaign_path: Path,
+    output_path: Path,
+    queue_path: Path,
+    concurrency: int,
+    calls_per_second: float,
+) -> None:
+    """
+    Dial every number in a campaign file and append one JSON result per attempt to
+    `output_path`.
+
+    Progress is kept in the SQLite queue at `queue_path`, so running the same command
+    again after a crash or Ctrl-C resumes the campaign without redialing completed
+    calls. A call that was mid-dial is marked uncertain in the queue and not redialed.
+    """
+    with closing(CallQueue(queue_path, room_name_prefix=room_name_prefix)) as queue:
+        added = queue.enqueue(read_campaign(campaign_path))
+        logger.info(f"Queued {added} new calls from {campaign_path}: {dict(queue.counts())}")
+        governor = TrunkGovernor(
+            parse_trunks(
+                config.sip_outbound_trunks,
+                outbound_trunk_id,
+                default_cps=calls_per_second,
+                default_concurrent=concurrency,
+            ),
+            strategy=cast(TrunkStrategy, config.sip_trunk_strategy),
+        )
+        backoff = Backoff(
+            base_delay=config.dial_retry_base_delay,
+            max_delay=config.dial_retry_max_delay,
+            max_attempts=config.dial_max_attempts,
+        )
+
+        failed = 0
+        total = 0
+        async with LiveKitClientManager(pool_size=concurrency * 2) as lkapi:
+
+            async def dial(row: CampaignRow) -> DialResult:
+                assert row.room_name is not None
+                metadata = CallMetadata.from_record(row.metadata)
+                if row.attempt > 1 and (
+                    placed := await find_placed_call(
+                        lkapi,
+                        row.room_name,
+                        agent_name=agent_name,
+                        metadata_json=metadata.encode(),
+                    )
+                ):
+                    return placed
+                async with governor.acquire() as trunk_id:
+                    return await make_survey_call(
+                        lkapi, row.phone_number, metadata, row.room_name, trunk_id
+                    )
+
+            with output_path.open("a") as out:
+                async for result in run_durable_campaign(
+                    queue,
+                    dial,
+                    concurrency=concurrency,
+                    backoff=backoff,
+                ):
+                    out.write(dumps(asdict(result)) + "\n")
+                    total += 1
+                    failed += result.error is not None
+        logger.info(
+            f"Campaign finished: {total} attempts, {failed} failed, results in {output_path}, "
+            f"queue: {dict(queue.counts())}, trunks: {governor.stats()}"
+        )
 
-    logger.info(f"Creating dispatch for agent {agent_name} in room {room_name}")
 
-    dispatch = await lkapi.agent_dispatch.create_dispatch(
-        api.CreateAgentDispatchRequest(agent_name=agent_name, room=room_name, metadata=metadata_dump)
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Place outbound survey calls")
+    parser.add_argument("--campaign", type=Path, help="CSV or JSONL file of numbers to dial")
+    parser.add_argument(
+        "--output", type=Path, default=Path("campaign_results.jsonl"), help="Per-call results"
     )
-    logger.info(f"Created dispatch: {dispatch}")
-    logger.info(f"Dialing phone to room {room_name}")
-    logger.info(f"Dispatches: {await lkapi.agent_dispatch.list_dispatch(room_name)}")
-
-    sip_participant = await lkapi.sip.create_sip_participant(
-        api.CreateSIPParticipantRequest(
-            room_name=room_name,
-            sip_trunk_id=outbound_trunk_id,
-            sip_call_to=phone_number,
-            participant_identity="phone_user",
-        )
+    parser.add_argument(
+        "--queue", type=Path, help="Durable call queue (default: next to the campaign file)"
     )
-    logger.info(f"Created SIP participant: {sip_participant}")
-
-    await lkapi.aclose()
-    return True
+    parser.add_argument("--concurrency", type=int, default=config.campaign_concurrency)
+    parser.add_argument("--cps", type=float, default=config.campaign_calls_per_second)
+    return parser.parse_args()
 
 
 async def main():
+    args = parse_args()
     logger.info("Starting survey calls process")
-    await make_survey_call(config.phone_number)
+    if args.campaign:
+        queue_path = args.queue or args.campaign.with_suffix(".queue.sqlite")
+        await run_survey_campaign(
+            args.campaign, args.output, queue_path, args.concurrency, args.cps
+        )
+    else:
+        metadata = CallMetadata(user_name="Jhosaim", age=30)
+        async with LiveKitClientManager() as lkapi:
+            await make_survey_call(lkapi, config.phone_number, metadata)
     logger.info("Survey calls process completed")
 
 
@@ -0,0 +1,58 @@
+from typing import Any
+
+from attrs import define, field
+
+
+@define
+class CampaignRow:
+    """
+    One number to dial. `idempotency_key`, `attempt` and `room_name` are filled in
+    when the row comes from the durable call queue, so retries dial into the same room.
+    """
+
+    phone_number: str
+    metadata: dict[str, Any] = field(factory=dict)
+    row_index: int = 0
+    idempotency_key: str = ""
+    attempt: int = 1
+    room_name: str | None = None
+
+
+@define
+class DialTimings:
+    """
+    Seconds spent in each stage of a dial. The dispatch and SIP participant stages
+    overlap when they are sent concurrently, so they can add up to more than `total`.
+    """
+
+    dispatch: float = 0.0
+    sip_participant: float = 0.0
+    total: float = 0.0
+
+
+@define
+class DialResult:
+    room_name: str
+    dispatch_id: str
+    sip_participant_id: str
+    timings: DialTimings = field(factory=DialTimings)
+
+
+@define
+class CallResult:
+    """
+    Outcome of one campaign call. `latency` is the wall time of the dial in seconds,
+    measured from the worker picking up the row until the SIP participant is created
+    (or the dial fails, in which case `error` is set).
+    """
+
+    phone_number: str
+    row_index: int
+    idempotency_key: str = ""
+    attempt: int = 1
+    room_name: str | None = None
+    dispatch_id: str | None = None
+    sip_participant_id: str | None = None
+    latency: float = 0.0
+    timings: DialTimings | None = None
+    error: str | None = None
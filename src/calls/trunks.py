@@ -0,0 +1,246 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any, Literal, Protocol, get_args
+
+from attrs import define
+from livekit import api
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUSES = {429, 503}
+
+TrunkStrategy = Literal["least_loaded", "weighted"]
+
+
+class Clock(Protocol):
+    def now(self) -> float: ...
+
+    async def sleep(self, seconds: float) -> None: ...
+
+
+class MonotonicClock:
+    def now(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, holding at most `burst` tokens.
+    `rate` can be changed on the fly, which is how the governor backs off a trunk.
+    """
+
+    def __init__(self, rate: float, burst: float, clock: Clock) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = burst
+        self._updated = clock.now()
+
+    def _refill(self) -> None:
+        now = self._clock.now()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill()
+        # Allow for float error so a token that is due isn't reported as microseconds away.
+        return 0.0 if self._tokens >= 1 - 1e-9 else (1 - self._tokens) / self.rate
+
+    def take(self) -> None:
+        self._refill()
+        self._tokens -= 1
+
+
+def is_throttled(error: BaseException) -> bool:
+    """The provider (or LiveKit in front of it) is telling us to slow down."""
+    return isinstance(error, api.TwirpError) and (
+        error.status in THROTTLE_STATUSES
+        or error.code in (api.TwirpErrorCode.RESOURCE_EXHAUSTED, api.TwirpErrorCode.UNAVAILABLE)
+    )
+
+
+@define
+class Trunk:
+    """
+    An outbound SIP trunk and the provider limits it is governed by. `max_concurrent`
+    bounds in-flight dial requests; the governor can't see when an answered call
+    hangs up, so leave headroom below the provider's channel limit.
+    """
+
+    trunk_id: str
+    calls_per_second: float
+    max_concurrent: int
+    weight: float = 1.0
+
+
+@define
+class _TrunkState:
+    trunk: Trunk
+    bucket: TokenBucket
+    active: int = 0
+    throttled: int = 0
+    paused_until: float = 0.0
+    current_weight: float = 0.0
+
+
+def parse_trunks(
+    spec: str, default_trunk_id: str, default_cps: float, default_concurrent: int
+) -> list[Trunk]:
+    """
+    Parse `SIP_OUTBOUND_TRUNKS`, a comma-separated list of
+    `trunk_id[:calls_per_second[:max_concurrent[:weight]]]`. Falls back to a single
+    `default_trunk_id` trunk when `spec` is empty.
+    """
+    if not spec.strip():
+        return [Trunk(default_trunk_id, default_cps, default_concurrent)]
+    trunks: list[Trunk] = []
+    for entry in spec.split(","):
+        trunk_id, *limits = entry.strip().split(":")
+        trunks.append(
+            Trunk(
+                trunk_id,
+                float(limits[0]) if len(limits) > 0 else default_cps,
+                int(limits[1]) if len(limits) > 1 else default_concurrent,
+                float(limits[2]) if len(limits) > 2 else 1.0,
+            )
+        )
+    return trunks
+
+
+class TrunkGovernor:
+    """
+    Hands out outbound trunks so that every trunk stays at, but not over, its
+    provider's calls-per-second and concurrent-channel limits.
+
+    Each trunk has its own token bucket. Among trunks that have both a token and a
+    free channel, `least_loaded` picks the one with the lowest channel utilization and
+    `weighted` does smooth weighted round-robin by `Trunk.weight`. A throttling error
+    (429/503) halves that trunk's rate and pauses it for `cooldown` seconds; each
+    success then adds back a fraction of the configured rate (AIMD), so the governor
+    converges on what the provider actually accepts instead of retrying into a storm.
+    """
+
+    def __init__(
+        self,
+        trunks: list[Trunk],
+        *,
+        strategy: TrunkStrategy = "least_loaded",
+        cooldown: float = 5.0,
+        recovery_step: float = 0.1,
+        clock: Clock | None = None,
+    ) -> None:
+        if not trunks:
+            raise ValueError("At least one trunk is required")
+        if strategy not in get_args(TrunkStrategy):
+            raise ValueError(
+                f"Unknown trunk strategy {strategy!r}, "
+                f"expected one of {', '.join(get_args(TrunkStrategy))}"
+            )
+        self._clock = clock or MonotonicClock()
+        self._strategy = strategy
+        self._cooldown = cooldown
+        self._recovery_step = recovery_step
+        self._released = asyncio.Event()
+        # A burst of one keeps starts evenly spaced rather than front-loaded.
+        self._states = [
+            _TrunkState(trunk, TokenBucket(trunk.calls_per_second, 1.0, self._clock))
+            for trunk in trunks
+        ]
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[str]:
+        """
+        Wait for a trunk with capacity and yield its id while the dial is in flight.
+        Throttling errors raised inside the block are fed back into that trunk's limit.
+        """
+        state = await self._reserve()
+        try:
+            yield state.trunk.trunk_id
+        except BaseException as e:
+            if is_throttled(e):
+                self._on_throttled(state)
+            raise
+        else:
+            self._on_success(state)
+        finally:
+            state.active -= 1
+            self._released.set()
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            state.trunk.trunk_id: {
+                "active": state.active,
+                "rate": state.bucket.rate,
+                "throttled": state.throttled,
+            }
+            for state in self._states
+        }
+
+    async def _reserve(self) -> _TrunkState:
+        while True:
+            now = self._clock.now()
+            self._released.clear()
+            open_states = [
+                s
+                for s in self._states
+                if s.active < s.trunk.max_concurrent and s.paused_until <= now
+            ]
+            ready = [s for s in open_states if s.bucket.wait_time() == 0]
+            if ready:
+                state = self._select(ready)
+                state.bucket.take()
+                state.active += 1
+                return state
+
+            if open_states:
+                await self._clock.sleep(min(s.bucket.wait_time() for s in open_states))
+                continue
+            # Every trunk is paused or at its channel limit: wait for a dial to finish
+            # or for the first pause to run out, whichever comes first.
+            paused = [s.paused_until - now for s in self._states if s.paused_until > now]
+            waiters: list[asyncio.Future[Any]] = [asyncio.ensure_future(self._released.wait())]
+            if paused:
+                waiters.append(asyncio.ensure_future(self._clock.sleep(min(paused))))
+            try:
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+
+    def _select(self, ready: list[_TrunkState]) -> _TrunkState:
+        if self._strategy == "least_loaded":
+            return min(ready, key=lambda s: s.active / s.trunk.max_concurrent)
+        total = sum(s.trunk.weight for s in ready)
+        for s in ready:
+            s.current_weight += s.trunk.weight
+        chosen = max(ready, key=lambda s: s.current_weight)
+        chosen.current_weight -= total
+        return chosen
+
+    def _on_throttled(self, state: _TrunkState) -> None:
+        state.throttled += 1
+        now = self._clock.now()
+        # Dials already in flight when the trunk started throttling fail together;
+        # count them but back off only once per cooldown.
+        if state.paused_until > now:
+            return
+        state.bucket.rate = max(state.trunk.calls_per_second * 0.05, state.bucket.rate / 2)
+        state.paused_until = now + self._cooldown
+        logger.warning(
+            f"Trunk {state.trunk.trunk_id} throttled, pausing {self._cooldown}s and "
+            f"lowering rate to {state.bucket.rate:.2f} calls/s"
+        )
+
+    def _on_success(self, state: _TrunkState) -> None:
+        configured = state.trunk.calls_per_second
+        if state.bucket.rate < configured:
+            state.bucket.rate = min(
+                configured, state.bucket.rate + configured * self._recovery_step
+            )
@@ -1,30 +1,157 @@
-from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
-from livekit.agents.voice import AgentSession
-from livekit.plugins import silero
+import logging
+import statistics
 
+from livekit import rtc
+from livekit.agents import (
+    AgentSession,
+    ChatContext,
+    JobContext,
+    RoomInputOptions,
+    RoomOutputOptions,
+    WorkerOptions,
+    cli,
+    metrics,
+)
+from livekit.agents.voice import MetricsCollectedEvent
+
+# plugins must be registered on the main thread, the agents only build them on first use
+from livekit.plugins import cartesia, deepgram, google  # noqa: F401
+from livekit.plugins.turn_detector.multilingual import MultilingualModel
+
+from agents.authenticator.agent import AuthenticatorAgent
+from agents.greeter.agent import GreeterAgent
+from agents.starter.agent import StarterAgent, prewarm
+from agents.starter.config import (
+    agent_llm,
+    agent_stt,
+    agent_tool_runner,
+    agent_tts,
+    context_compactor,
+)
 from shared.config import SessionInfo
+from shared.handoff import HandoffAgent, SharedSTTStream
+from shared.loop_watchdog import loop_watchdog_from_config
+from shared.metadata import CallMetadata
+from shared.voice_metrics import VoiceMetrics, metrics_backend, start_metrics_server
+from shared.worker_load import worker_load_from_config
+
+logger = logging.getLogger(__name__)
 
+agent_name = "multi-agent"
 
-def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
 
 async def entrypoint(ctx: JobContext):
+    ctx.log_context_fields = {
+        "room": ctx.room.name,
+    }
+    # report anything that blocks the loop carrying the call's audio
+    watchdog = loop_watchdog_from_config()
+    watchdog.start()
+
+    try:
+        metadata = CallMetadata.decode(ctx.job.metadata)
+    except ValueError as e:
+        logger.warning(f"Invalid job metadata, using empty metadata: {e}")
+        metadata = CallMetadata()
+
+    initial_ctx = ChatContext()
+    initial_ctx.add_message(role="assistant", content=metadata.describe())
+
+    # greeter -> authenticator -> main, in one session: the agents share its models, one
+    # STT stream and one context compactor, and each starts from the previous one's
+    # conversation (see `shared.handoff`)
+    stt_stream = SharedSTTStream(agent_stt.get())
+    compactor = context_compactor()
     session_info = SessionInfo(
         {
-            "greeter":
-        }
+            "greeter": GreeterAgent(initial_ctx, compactor=compactor, stt_stream=stt_stream),
+            "authenticator": AuthenticatorAgent(
+                ChatContext(), compactor=compactor, stt_stream=stt_stream
+            ),
+            "main": StarterAgent(ChatContext(), compactor=compactor, stt_stream=stt_stream),
+        },
+        customer_name=metadata.user_name,
     )
     session = AgentSession[SessionInfo](
         userdata=session_info,
+        llm=agent_llm.get(),
+        stt=agent_stt.get(),
+        tts=agent_tts.get(),
+        # use LiveKit's turn detection model
+        turn_detection=MultilingualModel(),
+        vad=ctx.proc.userdata["vad"],
     )
 
+    # have each agent's filler phrases for slow tools in the TTS cache before the first
+    # tool call, in the agent's language
+    tool_runner = agent_tool_runner.get()
+    for agent in session_info.agents.values():
+        if isinstance(agent, HandoffAgent):
+            tool_runner.prefetch_fillers(agent_tts.get(), agent.fillers)
+
+    # export latency metrics as they are emitted, and log total usage after session is over
+    usage_collector = metrics.UsageCollector()
+    voice_metrics = VoiceMetrics(metrics_backend(), agent=agent_name)
+
+    @ctx.room.on("participant_connected")  # pyright: ignore[reportUntypedFunctionDecorator, reportUnknownMemberType]
+    def _on_participant_connected(participant: rtc.RemoteParticipant):  # pyright: ignore[reportUnusedFunction]
+        voice_metrics.set_trunk(participant)
+
+    @session.on("metrics_collected")  # pyright: ignore[reportUntypedFunctionDecorator, reportUnknownMemberType]
+    def _on_metrics_collected(ev: MetricsCollectedEvent):  # pyright: ignore[reportUnusedFunction]
+        usage_collector.collect(ev.metrics)
+        voice_metrics.collect(ev.metrics)
+
+    async def log_usage():
+        logger.info(f"Usage: {usage_collector.get_summary()}")
+        if latencies := session_info.handoff_latencies:
+            logger.info(
+                f"Handoffs: {len(latencies)}, median {statistics.median(latencies) * 1000:.1f} ms, "
+                f"{stt_stream.opened} STT stream(s) opened"
+            )
+        logger.info(f"LLM context: {compactor.stats()}")
+        watchdog.log_summary()
+        voice_metrics.collect_loop(watchdog)
+
+    # shutdown callbacks are triggered when the session is over
+    ctx.add_shutdown_callback(log_usage)
+    ctx.add_shutdown_callback(voice_metrics.flush)
+    ctx.add_shutdown_callback(stt_stream.aclose)
+    ctx.add_shutdown_callback(watchdog.aclose)
+
     await session.start(
-        agent=session_info.agents.get("main"),
+        agent=session_info.agents["greeter"],
+        room=ctx.room,
+        room_input_options=RoomInputOptions(
+            noise_cancellation=ctx.proc.userdata["noise_cancellation"],
+        ),
+        room_output_options=RoomOutputOptions(transcription_enabled=True),
     )
 
-if __name__ == "__main__":
-    cli.run_app(WorkerOptions(
+    # join the room when agent is ready
+    await ctx.connect()
+    # the SIP participant is dialed alongside the dispatch, so it may already be here
+    for participant in ctx.room.remote_participants.values():
+        voice_metrics.set_trunk(participant)
+
+    await session.generate_reply(instructions="Greet the user by name.")
+
+
+def main():
+    start_metrics_server()
+    # take calls only while there's CPU left for them, see `shared.worker_load`
+    worker_load = worker_load_from_config()
+    cli.run_app(
+        WorkerOptions(
             entrypoint_fnc=entrypoint,
             prewarm_fnc=prewarm,
+            agent_name=agent_name,
+            load_fnc=worker_load.load,
+            request_fnc=worker_load.request,
+            load_threshold=worker_load.threshold,
         )
     )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from utils.constants import output_dir
+from utils.environment import Config, get_config
+
+logger = logging.getLogger(__name__)
+
+
+def audio_key(voice: str, text: str, sample_rate: int) -> str:
+    """Content hash of a synthesized utterance; whitespace differences don't matter."""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{voice}\0{sample_rate}\0{normalized}".encode()).hexdigest()
+
+
+class AudioCache:
+    """
+    Synthesized PCM keyed by `audio_key`: least recently used entries are evicted from a
+    bounded memory tier, and entries `put` with `persist` (the default) are also written
+    to `directory` so job processes, which start empty, share the audio synthesized by
+    earlier calls. Callers only persist scripted phrases: what the LLM says about a
+    callee must not outlive the call on disk.
+
+    Entries found on disk are memory-mapped rather than read, so every job process on the
+    host serves them from the same page cache pages, and both tiers hand out memoryviews
+    that callers can stream without copying.
+
+    Methods block on disk I/O, call them from a thread.
+    """
+
+    def __init__(
+        self,
+        directory: Path | None,
+        *,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        max_mapped_files: int = 256,
+    ) -> None:
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_mapped_files = max_mapped_files
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._mapped: OrderedDict[str, mmap.mmap] = OrderedDict()
+        # what this process knows of the directory's size, counted once and then added to
+        self._disk_bytes: int | None = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path | None:
+        return self.directory / f"{key}.pcm" if self.directory is not None else None
+
+    def get(self, key: str) -> memoryview | None:
+        with self._lock:
+            if (pcm := self._memory.get(key)) is not None:
+                self._memory.move_to_end(key)
+                return memoryview(pcm)
+            if (mapped := self._mapped.get(key)) is not None:
+                self._mapped.move_to_end(key)
+                return memoryview(mapped)
+
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            with path.open("rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None  # not cached, or an empty file
+        # mark it recently used for the disk pruning too
+        os.utime(path)
+        with self._lock:
+            self._mapped[key] = mapped
+            while len(self._mapped) > self.max_mapped_files:
+                # not closed: views handed out may still be streaming from it, the
+                # mapping goes away once they are released
+                self._mapped.popitem(last=False)
+        return memoryview(mapped)
+
+    def put(self, key: str, pcm: bytes, *, persist: bool = True) -> None:
+        self._remember(key, pcm)
+        path = self._path(key)
+        if path is None or not persist:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(pcm)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._count_disk_bytes(len(pcm))
+
+    def _remember(self, key: str, pcm: bytes) -> None:
+        if len(pcm) > self.max_memory_bytes:
+            return
+        with self._lock:
+            self._mapped.pop(key, None)
+            if key in self._memory:
+                self._memory_bytes -= len(self._memory.pop(key))
+            self._memory[key] = pcm
+            self._memory_bytes += len(pcm)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _count_disk_bytes(self, size: int) -> None:
+        if not self.max_disk_bytes:
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += size
+                if self._disk_bytes <= self.max_disk_bytes:
+                    return
+        # the first write, or the cap is reached: other processes write here too, so
+        # only a scan tells how much is really there
+        self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Delete the least recently used files over the cap, down to 90% of it."""
+        if self.directory is None:
+            return
+        entries: list[tuple[float, int, Path]] = []
+        for path in self.directory.glob("*.pcm"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # pruned by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_disk_bytes:
+            # leave room for the next writes, so they don't all scan again
+            target = self.max_disk_bytes * 0.9
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+
+def audio_cache_from_config(config: Config | None = None) -> AudioCache:
+    config = config or get_config()
+    directory = Path(config.audio_cache_dir) if config.audio_cache_dir else output_dir / "audio"
+    return AudioCache(
+        directory,
+        max_memory_bytes=config.audio_cache_memory_mb * 1024 * 1024,
+        max_disk_bytes=config.audio_cache_disk_mb * 1024 * 1024,
+    )
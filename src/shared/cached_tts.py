@@ -0,0 +1,224 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Iterable
+from typing import Any, Literal
+
+from attrs import define
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions, tokenize, tts, utils
+
+from shared.audio_cache import AudioCache, audio_key
+
+logger = logging.getLogger(__name__)
+
+
+@define
+class TTSCacheLookup:
+    """Emitted as `cache_lookup` for every utterance a `CachedTTS` is asked to speak."""
+
+    hit: bool
+    characters: int
+    audio_bytes: int
+
+
+class CachedTTS(tts.TTS[Literal["cache_lookup"]]):
+    """
+    Serves utterances the agent has said before from an `AudioCache` instead of the
+    provider, keyed by voice, normalized text and sample rate.
+
+    Its stream splits the agent's reply into sentences and decides per sentence: the
+    stock sentences of a script ("Un momento, por favor.") hit even when the rest of the
+    reply is new. Only sentences of up to `max_chars` characters go through the cache,
+    long ones rarely repeat and are streamed from the wrapped TTS as they are, over its
+    streaming connection when it has one.
+
+    Sentences from the LLM may be about the callee, so they are only kept in memory,
+    unless they are one of the scripted `phrases`. What `audio` renders (greetings,
+    fillers) is scripted and shared with other processes through the disk cache.
+    """
+
+    def __init__(
+        self,
+        wrapped: tts.TTS[Any],
+        cache: AudioCache,
+        *,
+        voice: str,
+        max_chars: int = 120,
+        phrases: Iterable[str] = (),
+    ) -> None:
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=True),
+            sample_rate=wrapped.sample_rate,
+            num_channels=wrapped.num_channels,
+        )
+        self.wrapped = wrapped
+        self.cache = cache
+        self.voice = voice
+        self.max_chars = max_chars
+        self.phrases = {" ".join(phrase.split()) for phrase in phrases}
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def key(self, text: str) -> str:
+        return audio_key(self.voice, text, self.sample_rate)
+
+    async def lookup(self, text: str) -> memoryview | None:
+        pcm = await asyncio.to_thread(self.cache.get, self.key(text))
+        self.record(text, pcm)
+        return pcm
+
+    def record(self, text: str, pcm: memoryview | None) -> None:
+        """Count a lookup of `text` and emit `cache_lookup`."""
+        if pcm is not None:
+            self.hits += 1
+            self.bytes_saved += pcm.nbytes
+        else:
+            self.misses += 1
+        self.emit(
+            "cache_lookup",
+            TTSCacheLookup(pcm is not None, len(text), pcm.nbytes if pcm is not None else 0),
+        )
+
+    async def store(self, text: str, pcm: bytes, *, persist: bool | None = None) -> None:
+        """Cache `text`'s audio, on disk too if it's one of the `phrases` (or `persist`)."""
+        if persist is None:
+            persist = " ".join(text.split()) in self.phrases
+        await asyncio.to_thread(self.cache.put, self.key(text), pcm, persist=persist)
+
+    async def audio(self, text: str, *, persist: bool = True) -> memoryview:
+        """
+        The PCM of scripted `text`, synthesized and cached whatever its length if it's
+        missing. Pass `persist=False` for text about the callee.
+        """
+        if (pcm := await self.lookup(text)) is not None:
+            return pcm
+        async with self.wrapped.synthesize(text) as stream:
+            pcm = b"".join([ev.frame.data.tobytes() async for ev in stream])
+        await self.store(text, pcm, persist=persist)
+        return memoryview(pcm)
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> "CachedChunkedStream":
+        return CachedChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+    def stream(
+        self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> "CachedSynthesizeStream":
+        return CachedSynthesizeStream(tts=self, conn_options=conn_options)
+
+    async def provider_audio(
+        self, text: str, conn_options: APIConnectOptions
+    ) -> AsyncIterator[bytes]:
+        """`text` from the wrapped TTS, streamed when it supports it."""
+        if not self.wrapped.capabilities.streaming:
+            async with self.wrapped.synthesize(text, conn_options=conn_options) as chunked:
+                async for ev in chunked:
+                    yield ev.frame.data.tobytes()
+            return
+        async with self.wrapped.stream(conn_options=conn_options) as stream:
+            stream.push_text(text)
+            stream.end_input()
+            async for ev in stream:
+                yield ev.frame.data.tobytes()
+
+    def prewarm(self) -> None:
+        self.wrapped.prewarm()
+
+    async def aclose(self) -> None:
+        await self.wrapped.aclose()
+
+
+class CachedChunkedStream(tts.ChunkedStream):
+    def __init__(self, *, tts: CachedTTS, input_text: str, conn_options: APIConnectOptions):
+        super().__init__(tts=tts, input_text=input_text, conn_options=conn_options)
+        self._cached_tts = tts
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        cached_tts = self._cached_tts
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=cached_tts.sample_rate,
+            num_channels=cached_tts.num_channels,
+            mime_type="audio/pcm",
+        )
+        if (pcm := await cached_tts.lookup(self.input_text)) is not None:
+            # the emitter only takes bytes: this is the one copy out of the cache's memory or
+            # mmap, which everything after it (framing, playout) copies again anyway
+            output_emitter.push(pcm.tobytes())
+            output_emitter.flush()
+            return
+
+        chunks: list[bytes] = []
+        # this stream already retries with `conn_options`, don't let the provider's retry too
+        inner_options = APIConnectOptions(max_retry=0, timeout=self._conn_options.timeout)
+        async with cached_tts.wrapped.synthesize(
+            self.input_text, conn_options=inner_options
+        ) as stream:
+            async for ev in stream:
+                chunk = ev.frame.data.tobytes()
+                output_emitter.push(chunk)
+                chunks.append(chunk)
+        output_emitter.flush()
+        if len(self.input_text) <= cached_tts.max_chars:
+            await cached_tts.store(self.input_text, b"".join(chunks))
+
+
+class CachedSynthesizeStream(tts.SynthesizeStream):
+    def __init__(self, *, tts: CachedTTS, conn_options: APIConnectOptions):
+        super().__init__(tts=tts, conn_options=conn_options)
+        self._cached_tts = tts
+        # the sentence tokenizer livekit's own `StreamAdapter` uses
+        self._sentences = tokenize.blingfire.SentenceTokenizer(retain_format=True).stream()
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        cached_tts = self._cached_tts
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=cached_tts.sample_rate,
+            num_channels=cached_tts.num_channels,
+            mime_type="audio/pcm",
+            stream=True,
+        )
+        output_emitter.start_segment(segment_id=utils.shortuuid())
+        # this stream already retries with `conn_options`, don't let the provider's retry too
+        inner_options = APIConnectOptions(max_retry=0, timeout=self._conn_options.timeout)
+
+        async def _forward_input() -> None:
+            async for data in self._input_ch:
+                if isinstance(data, self._FlushSentinel):
+                    self._sentences.flush()
+                    continue
+                self._sentences.push_text(data)
+            self._sentences.end_input()
+
+        async def _synthesize() -> None:
+            async for ev in self._sentences:
+                if not (text := ev.token.strip()):
+                    continue
+                cacheable = len(text) <= cached_tts.max_chars
+                if cacheable and (pcm := await cached_tts.lookup(text)) is not None:
+                    output_emitter.push(pcm.tobytes())
+                    output_emitter.flush()
+                    continue
+                if not cacheable:
+                    # not worth a cache read, but the provider is still asked for it
+                    cached_tts.record(text, None)
+
+                chunks: list[bytes] = []
+                async for chunk in cached_tts.provider_audio(text, inner_options):
+                    output_emitter.push(chunk)
+                    if cacheable:
+                        chunks.append(chunk)
+                output_emitter.flush()
+                if cacheable:
+                    await cached_tts.store(text, b"".join(chunks))
+
+        tasks = [
+            asyncio.create_task(_forward_input()),
+            asyncio.create_task(_synthesize()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await utils.aio.cancel_and_wait(*tasks)
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Literal
 
 from attrs import define
@@ -13,12 +13,24 @@ class AgentSession:
     stt_language: Literal["multi", "es", "en"] = "multi"
 
 
-AgentList = Literal["greeter", "main"]
+@define
+class AgentConfig:
+    instructions: str
+    # spoken while a tool is slow, in the agent's language, see `shared.tool_runner`
+    fillers: tuple[str, ...] | None = None
+
+
+AgentList = Literal["greeter", "authenticator", "main"]
 
 
 @dataclass
 class SessionInfo:
+    """Userdata of a multi-agent session, see `shared.handoff`."""
+
     agents: dict[AgentList, Agent]
     prev_agent: Agent | None = None
     customer_name: str | None = None
     customer_phone: str | None = None
+    authenticated: bool = False
+    # seconds from each handoff to the next agent taking the call
+    handoff_latencies: list[float] = field(default_factory=list)
@@ -0,0 +1,251 @@
+import asyncio
+import logging
+from collections.abc import AsyncGenerator
+from typing import Any
+
+from livekit.agents import Agent, ModelSettings, llm
+from livekit.agents.llm.tool_context import (
+    get_function_info,
+    get_raw_function_info,
+    is_function_tool,
+    is_raw_function_tool,
+)
+from livekit.agents.voice import AgentStateChangedEvent
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_INSTRUCTIONS = """
+You summarize a phone call between a voice assistant and a user, for the assistant to
+continue the call from the summary. Update the summary so far with the new turns. Keep
+names, numbers, what the user asked for, the choices they made and anything still open.
+Write at most {max_words} words of plain text, in the language of the call.
+"""
+
+
+def estimate_tokens(item: llm.ChatItem) -> int:
+    """About four characters per token, plus a few for the message framing."""
+    match item:
+        case llm.ChatMessage():
+            text = item.text_content or ""
+        case llm.FunctionCall():
+            text = item.name + item.arguments
+        case llm.FunctionCallOutput():
+            text = item.output
+        case _:
+            text = ""
+    return len(text) // 4 + 4
+
+
+def _is_user_message(item: llm.ChatItem) -> bool:
+    return item.type == "message" and item.role == "user"
+
+
+def _is_system_message(item: llm.ChatItem) -> bool:
+    return item.type == "message" and item.role in ("system", "developer")
+
+
+def _tool_name(tool: llm.FunctionTool | llm.RawFunctionTool) -> str:
+    if is_raw_function_tool(tool):
+        return get_raw_function_info(tool).name
+    if is_function_tool(tool):
+        return get_function_info(tool).name
+    raise TypeError(f"{tool!r} is not a function tool")
+
+
+class ContextCompactor:
+    """
+    Keeps the context sent to the LLM bounded over a long call, instead of resending the
+    whole conversation every turn.
+
+    The LLM gets the preamble (instructions and anything before the user's first
+    message), a rolling summary of the older turns, and the last `window_turns` turns.
+    Turns that leave the window are folded into the summary by `summarizer` between
+    turns, while the user speaks, and are sent as they are until the summary covers them.
+    On top of that, the oldest turns are dropped until the context fits `max_tokens`;
+    the current turn is always sent. Without a summarizer it's a plain sliding window.
+
+    The context is also laid out for provider prompt caching, which only reuses an
+    identical prefix. System messages (the agent's instructions, the same on every call)
+    come first, then the per-call preamble, like the user information, then the summary,
+    as an assistant note: Gemini moves every system message into its system instruction,
+    where a summary would change the prefix of every request. The window moves
+    `window_step` turns at a time, so the conversation part of the prefix also stays the
+    same for a few turns.
+
+    Only what's sent changes: the agent's own `chat_ctx` still has the whole call.
+    """
+
+    def __init__(
+        self,
+        summarizer: llm.LLM[Any] | None = None,
+        *,
+        window_turns: int = 6,
+        window_step: int = 3,
+        max_tokens: int = 3000,
+        summary_words: int = 120,
+    ) -> None:
+        self.summarizer = summarizer
+        self.window_turns = max(1, window_turns)
+        self.window_step = max(1, window_step)
+        self.max_tokens = max_tokens
+        self.summary_words = summary_words
+        self.summary = ""
+        self.summaries = 0
+        self.turns = 0
+        self.tokens_sent = 0
+        self.tokens_saved = 0
+        self.max_tokens_sent = 0
+        # id of the last item the summary covers
+        self._summary_until: str | None = None
+        self._summary_task: asyncio.Task[None] | None = None
+
+    def compact(self, chat_ctx: llm.ChatContext) -> llm.ChatContext:
+        items = chat_ctx.items
+        turns = [i for i, item in enumerate(items) if _is_user_message(item)]
+        if not turns:
+            return chat_ctx
+
+        preamble = items[: turns[0]]
+        head = [item for item in preamble if _is_system_message(item)]
+        head += [item for item in preamble if not _is_system_message(item)]
+        if self.summary:
+            head.append(
+                llm.ChatMessage(
+                    role="assistant", content=[f"Summary of the call so far: {self.summary}"]
+                )
+            )
+
+        start = self._window_start(turns)
+        if self.summarizer is not None:
+            # turns the summary doesn't cover yet are still sent in full
+            start = min(start, self._covered(items, turns))
+
+        costs = [estimate_tokens(item) for item in items]
+        head_tokens = sum(estimate_tokens(item) for item in head)
+        while start < turns[-1] and head_tokens + sum(costs[start:]) > self.max_tokens:
+            start = next(t for t in turns if t > start)
+
+        sent = head_tokens + sum(costs[start:])
+        self.turns += 1
+        self.tokens_sent += sent
+        self.tokens_saved += max(0, sum(costs) - sent)
+        self.max_tokens_sent = max(self.max_tokens_sent, sent)
+        return llm.ChatContext([*head, *items[start:]])
+
+    def summarize_later(self, chat_ctx: llm.ChatContext) -> None:
+        """Fold the turns that left the window into the summary, in the background."""
+        if self.summarizer is None or (
+            self._summary_task is not None and not self._summary_task.done()
+        ):
+            return
+        items = chat_ctx.items
+        turns = [i for i, item in enumerate(items) if _is_user_message(item)]
+        if not turns:
+            return
+        covered, start = self._covered(items, turns), self._window_start(turns)
+        if covered >= start:
+            return
+        self._summary_task = asyncio.create_task(
+            self._summarize(self.summarizer, items[covered:start]), name="context_summary"
+        )
+
+    def _window_start(self, turns: list[int]) -> int:
+        left = max(0, len(turns) - self.window_turns)
+        return turns[left - left % self.window_step]
+
+    def _covered(self, items: list[llm.ChatItem], turns: list[int]) -> int:
+        """Index of the first item the summary doesn't cover."""
+        if self._summary_until is None:
+            return turns[0]
+        for i, item in enumerate(items):
+            if item.id == self._summary_until:
+                return i + 1
+        return turns[0]
+
+    async def _summarize(self, summarizer: llm.LLM[Any], items: list[llm.ChatItem]) -> None:
+        lines: list[str] = []
+        for item in items:
+            match item:
+                case llm.ChatMessage() if item.text_content:
+                    lines.append(f"{item.role}: {item.text_content}")
+                case llm.FunctionCall():
+                    lines.append(f"tool call: {item.name}({item.arguments})")
+                case llm.FunctionCallOutput():
+                    lines.append(f"tool result: {item.output}")
+                case _:
+                    pass
+
+        ctx = llm.ChatContext()
+        ctx.add_message(
+            role="system", content=SUMMARY_INSTRUCTIONS.format(max_words=self.summary_words)
+        )
+        ctx.add_message(
+            role="user",
+            content=f"Summary so far: {self.summary or '(none)'}\n\nNew turns:\n"
+            + "\n".join(lines),
+        )
+        try:
+            parts: list[str] = []
+            async with summarizer.chat(chat_ctx=ctx) as stream:
+                async for chunk in stream:
+                    if chunk.delta is not None and chunk.delta.content:
+                        parts.append(chunk.delta.content)
+        except Exception as e:
+            # the turns stay in the context, within the token cap, until the next attempt
+            logger.warning(f"Could not summarize the conversation: {e!r}")
+            return
+        if summary := "".join(parts).strip():
+            self.summary = summary
+            self._summary_until = items[-1].id
+            self.summaries += 1
+
+    async def summarized(self) -> None:
+        """Wait for the summary in progress, if any."""
+        if self._summary_task is not None:
+            await asyncio.shield(self._summary_task)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "turns": self.turns,
+            "summaries": self.summaries,
+            "avg_tokens": round(self.tokens_sent / self.turns) if self.turns else 0,
+            "max_tokens": self.max_tokens_sent,
+            "tokens_saved": self.tokens_saved,
+        }
+
+    async def aclose(self) -> None:
+        if self._summary_task is not None:
+            self._summary_task.cancel()
+            self._summary_task = None
+
+
+class CompactingAgent(Agent):
+    """
+    An agent whose LLM requests go through a `ContextCompactor`, which summarizes the
+    turns leaving its window each time the agent is done speaking.
+    """
+
+    def __init__(self, *, compactor: ContextCompactor, **kwargs: Any) -> None:
+        super().__init__(**kwargs)  # pyright: ignore[reportUnknownMemberType]
+        self.compactor = compactor
+
+    async def on_enter(self) -> None:
+        self.session.on("agent_state_changed", self._on_agent_state_changed)
+
+    async def on_exit(self) -> None:
+        self.session.off("agent_state_changed", self._on_agent_state_changed)
+        await self.compactor.aclose()
+
+    def _on_agent_state_changed(self, ev: AgentStateChangedEvent) -> None:
+        if ev.old_state == "speaking" and ev.new_state == "listening":
+            self.compactor.summarize_later(self.chat_ctx)
+
+    def llm_node(
+        self,
+        chat_ctx: llm.ChatContext,
+        tools: list[llm.FunctionTool | llm.RawFunctionTool],
+        model_settings: ModelSettings,
+    ) -> AsyncGenerator[llm.ChatChunk | str]:
+        # in a fixed order, as the function declarations are part of the cached prefix
+        tools = sorted(tools, key=_tool_name)
+        return Agent.default.llm_node(self, self.compactor.compact(chat_ctx), tools, model_settings)
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import re
+from collections.abc import AsyncIterator
+
+from attrs import define
+from livekit import rtc
+from livekit.agents import JobContext, utils
+
+from shared.cached_tts import CachedTTS
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text: str) -> list[str]:
+    return [sentence for sentence in _SENTENCE_END.split(text.strip()) if sentence]
+
+
+@define
+class Greeting:
+    """A rendered greeting whose sentences are synthesized (or loaded) in the background."""
+
+    text: str
+    segments: list[asyncio.Task[memoryview]]
+    sample_rate: int
+    num_channels: int
+
+    async def frames(self) -> AsyncIterator[rtc.AudioFrame]:
+        """100 ms frames of the whole greeting, for `AgentSession.say(audio=...)`."""
+        stream = utils.audio.AudioByteStream(
+            self.sample_rate, self.num_channels, samples_per_channel=self.sample_rate // 10
+        )
+        for segment in self.segments:
+            for frame in stream.write(await segment):
+                yield frame
+        for frame in stream.flush():
+            yield frame
+
+    async def ready(self) -> bool:
+        """Wait for every sentence; False if any of them failed to synthesize."""
+        results = await asyncio.gather(*self.segments, return_exceptions=True)
+        return not any(isinstance(result, BaseException) for result in results)
+
+    def cancel(self) -> None:
+        for segment in self.segments:
+            segment.cancel()
+
+
+class GreetingCache:
+    """
+    Renders templated greetings from cached audio instead of an LLM + TTS round trip.
+
+    Greetings are cached one sentence at a time, so the sentences that don't mention the
+    callee are the same on every call and always hit. The ones with the template's
+    values (the callee's name) are personal data: they stay in the process's memory
+    and are synthesized on every call.
+    """
+
+    def __init__(self, tts: CachedTTS) -> None:
+        self._tts = tts
+
+    def prepare(self, template: str, **values: str) -> Greeting:
+        """
+        Start rendering `template` right away, typically when the job is dispatched, so
+        the audio is ready by the time the callee answers.
+        """
+        text = template.format(**values)
+
+        def render(sentence: str) -> asyncio.Task[memoryview]:
+            personal = any(value and value in sentence for value in values.values())
+            return asyncio.create_task(self._tts.audio(sentence, persist=not personal))
+
+        return Greeting(
+            text,
+            [render(sentence) for sentence in split_sentences(text)],
+            self._tts.sample_rate,
+            self._tts.num_channels,
+        )
+
+
+async def wait_until_answered(ctx: JobContext) -> rtc.RemoteParticipant:
+    """Wait for the callee to join and, for SIP participants, to pick up the phone."""
+    participant = await ctx.wait_for_participant()
+    if participant.attributes.get("sip.callStatus", "active") == "active":
+        return participant
+
+    answered = asyncio.Event()
+
+    def _on_attributes_changed(changed: dict[str, str], p: rtc.Participant) -> None:
+        if p.identity == participant.identity and changed.get("sip.callStatus") == "active":
+            answered.set()
+
+    ctx.room.on("participant_attributes_changed", _on_attributes_changed)
+    try:
+        if participant.attributes.get("sip.callStatus") != "active":
+            await answered.wait()
+    finally:
+        ctx.room.off("participant_attributes_changed", _on_attributes_changed)
+    return participant
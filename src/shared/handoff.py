@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncGenerator, AsyncIterable, Sequence
+from typing import Any
+
+from livekit import rtc
+from livekit.agents import Agent, ModelSettings, stt, utils
+from livekit.agents.utils import is_given
+
+from shared.config import AgentList, SessionInfo
+from shared.context_compaction import CompactingAgent
+
+logger = logging.getLogger(__name__)
+
+
+class SharedSTTStream:
+    """
+    One STT stream for all the agents of a call.
+
+    LiveKit closes an agent's STT stream when it hands the call off, and the next agent
+    opens a new one: a new provider websocket, whose connect time the caller spends
+    talking to nobody. Agents reading this stream instead (see `HandoffAgent.stt_node`)
+    keep it, and what the caller said during the handoff, across agents.
+    """
+
+    def __init__(self, model: stt.STT[Any]) -> None:
+        self.model = model
+        self.opened = 0
+        self._stream: stt.RecognizeStream | None = None
+        self._events: asyncio.Queue[stt.SpeechEvent | None] = asyncio.Queue()
+        self._read_task: asyncio.Task[None] | None = None
+
+    async def node(
+        self, agent: Agent, audio: AsyncIterable[rtc.AudioFrame]
+    ) -> AsyncGenerator[stt.SpeechEvent]:
+        """The active agent's `stt_node`: feeds it the agent's audio and reads its events."""
+        stream = self._open(agent)
+
+        async def _forward_input() -> None:
+            async for frame in audio:
+                stream.push_frame(frame)
+
+        forward_task = asyncio.create_task(_forward_input(), name="shared_stt_forward")
+        try:
+            while (event := await self._events.get()) is not None:
+                yield event
+        finally:
+            await utils.aio.cancel_and_wait(forward_task)
+
+    def _open(self, agent: Agent) -> stt.RecognizeStream:
+        if self._stream is None:
+            self._stream = self.model.stream(
+                conn_options=agent.session.conn_options.stt_conn_options
+            )
+            self._read_task = asyncio.create_task(self._read(self._stream), name="shared_stt")
+            self.opened += 1
+        return self._stream
+
+    async def _read(self, stream: stt.RecognizeStream) -> None:
+        try:
+            async for event in stream:
+                self._events.put_nowait(event)
+        finally:
+            # the stream failed for good: the current agent stops listening, like with its
+            # own stream, and the next one opens a new stream
+            self._stream = None
+            self._events.put_nowait(None)
+
+    async def aclose(self) -> None:
+        stream, self._stream = self._stream, None
+        if self._read_task is not None:
+            await utils.aio.cancel_and_wait(self._read_task)
+            self._read_task = None
+        if stream is not None:
+            await stream.aclose()
+
+
+class HandoffAgent(CompactingAgent):
+    """
+    An agent of a multi-agent call (see `shared.config.SessionInfo`), which hands the
+    call to another agent of the same `AgentSession` from a tool: `return await
+    self.handoff("main")`.
+
+    The agents share the session's models, and the next agent starts from this one's
+    conversation and context compactor, so a handoff costs no dispatch, reconnection or
+    model load. With a `SharedSTTStream`, it doesn't reopen the STT stream either.
+    `fillers` are the phrases spoken while one of its tools is slow (see
+    `shared.tool_runner`), in the agent's language; the tool runner's own when `None`.
+    """
+
+    def __init__(
+        self,
+        *,
+        stt_stream: SharedSTTStream | None = None,
+        fillers: Sequence[str] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.stt_stream = stt_stream
+        self.fillers = fillers
+        self._handoff_at: float | None = None
+        self._handed_off = False
+
+    def stt_node(
+        self, audio: AsyncIterable[rtc.AudioFrame], model_settings: ModelSettings
+    ) -> AsyncGenerator[stt.SpeechEvent]:
+        stt_model = self.stt if is_given(self.stt) else self.session.stt
+        if self.stt_stream is None or stt_model is None or not stt_model.capabilities.streaming:
+            return Agent.default.stt_node(self, audio, model_settings)
+        return self.stt_stream.node(self, audio)
+
+    async def handoff(self, name: AgentList) -> Agent:
+        """The session's `name` agent, ready to take the call when a tool returns it."""
+        info: SessionInfo = self.session.userdata
+        agent = info.agents[name]
+        info.prev_agent = self
+        self._handed_off = True
+        await agent.update_chat_ctx(self.chat_ctx)
+        if isinstance(agent, HandoffAgent):
+            agent._handoff_at = time.perf_counter()
+        logger.info(f"Handing off from {type(self).__name__} to {name}")
+        return agent
+
+    async def on_enter(self) -> None:
+        await super().on_enter()
+        if self._handoff_at is None:
+            return
+        latency, self._handoff_at = time.perf_counter() - self._handoff_at, None
+        info: SessionInfo = self.session.userdata
+        info.handoff_latencies.append(latency)
+        logger.info(f"{type(self).__name__} took the call in {latency * 1000:.1f} ms")
+        self.session.generate_reply()
+
+    async def on_exit(self) -> None:
+        if not self._handed_off:
+            await super().on_exit()
+            return
+        # the compactor goes on with the next agent, summary in progress included
+        self._handed_off = False
+        self.session.off("agent_state_changed", self._on_agent_state_changed)
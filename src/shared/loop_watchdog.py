@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, defaultdict
+
+from attrs import define
+
+from utils.environment import Config, get_config
+
+logger = logging.getLogger(__name__)
+
+# lag histogram: one bucket per millisecond, the last one for anything longer
+_BUCKETS = 1001
+
+
+@define
+class Stall:
+    """The event loop ran one piece of sync code for `duration` seconds."""
+
+    duration: float
+    stack: str = ""
+
+
+class LoopWatchdog:
+    """
+    Watches a job's event loop, which also carries the call's audio: a callback running
+    longer than `stall_threshold` (a sync dump, a `print`, a slow log handler) shows up
+    on the line as choppy audio.
+
+    A heartbeat task wakes every `interval` and records how late it is (the loop lag).
+    A thread checks the heartbeat and, when it's `stall_threshold` late, captures the
+    stack of the loop's thread while the culprit is still running, so each stall comes
+    with the code that caused it. `summary()` is meant for the per-call usage log.
+    """
+
+    def __init__(
+        self, *, stall_threshold: float = 0.1, interval: float = 0.02, max_stalls: int = 100
+    ) -> None:
+        self.stall_threshold = stall_threshold
+        self.interval = interval
+        self.max_stalls = max_stalls
+        self.stalls: list[Stall] = []
+        self.stall_count = 0
+        self.stalled = 0.0
+        self._lags = [0] * _BUCKETS
+        self.max_lag = 0.0
+        self._beat_at = 0.0
+        # (heartbeat it was late for, stack), set by the watching thread
+        self._pending_stack: tuple[float, str] | None = None
+        self._thread_id: int | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Start watching the running loop."""
+        if self._task is not None:
+            return
+        self._thread_id = threading.get_ident()
+        self._beat_at = time.perf_counter()
+        self._task = asyncio.create_task(self._beat(), name="loop_watchdog")
+        threading.Thread(target=self._watch, name="loop_watchdog", daemon=True).start()
+
+    async def _beat(self) -> None:
+        while True:
+            started = self._beat_at
+            await asyncio.sleep(self.interval)
+            self._beat_at = now = time.perf_counter()
+            lag = max(0.0, now - started - self.interval)
+            self._lags[min(int(lag * 1000), _BUCKETS - 1)] += 1
+            self.max_lag = max(self.max_lag, lag)
+            pending, self._pending_stack = self._pending_stack, None
+            if lag >= self.stall_threshold:
+                self.stall_count += 1
+                self.stalled += lag
+                stack = pending[1] if pending is not None and pending[0] == started else ""
+                if len(self.stalls) < self.max_stalls:
+                    self.stalls.append(Stall(lag, stack))
+
+    def _watch(self) -> None:
+        beat_seen = 0.0
+        while not self._stop.wait(self.stall_threshold / 4):
+            beat_at = self._beat_at
+            late = time.perf_counter() - beat_at - self.interval
+            if late < self.stall_threshold or beat_at == beat_seen:
+                continue
+            # one stack per stall, taken while it's still going on
+            beat_seen = beat_at
+            frame = sys._current_frames().get(self._thread_id or 0)  # pyright: ignore[reportPrivateUsage]
+            if frame is not None:
+                stack = "".join(traceback.format_stack(frame, limit=12))
+                self._pending_stack = (beat_at, stack)
+
+    def lag_percentile(self, q: float) -> float:
+        """Seconds of loop lag at quantile `q` (0-1), to the millisecond."""
+        total = sum(self._lags)
+        if not total:
+            return 0.0
+        seen = 0
+        for ms, count in enumerate(self._lags):
+            seen += count
+            if seen >= q * total:
+                return ms / 1000
+        return self.max_lag
+
+    def top_stacks(self, n: int = 3) -> list[tuple[str, int, float]]:
+        """The stacks behind the most stall time: (stack, stalls, seconds)."""
+        counts: Counter[str] = Counter()
+        seconds: defaultdict[str, float] = defaultdict(float)
+        for stall in self.stalls:
+            counts[stall.stack] += 1
+            seconds[stall.stack] += stall.duration
+        top = sorted(seconds.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [(stack, counts[stack], total) for stack, total in top]
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "lag_p50_ms": self.lag_percentile(0.5) * 1000,
+            "lag_p99_ms": self.lag_percentile(0.99) * 1000,
+            "lag_max_ms": round(self.max_lag * 1000, 1),
+            "stalls": self.stall_count,
+            "stalled_ms": round(self.stalled * 1000, 1),
+        }
+
+    def log_summary(self) -> None:
+        logger.info(f"Event loop: {self.summary()}")
+        for stack, count, seconds in self.top_stacks():
+            logger.warning(
+                f"Event loop blocked {count} times for {seconds * 1000:.0f} ms in total at:\n"
+                f"{stack or '(stack not captured)'}"
+            )
+
+    async def aclose(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+def loop_watchdog_from_config(config: Config | None = None) -> LoopWatchdog:
+    config = config or get_config()
+    return LoopWatchdog(stall_threshold=config.loop_stall_threshold)
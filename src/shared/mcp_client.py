@@ -0,0 +1,196 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any
+
+from livekit.agents import RunContext, mcp
+from livekit.agents.llm import function_tool
+
+from shared.tool_runner import ToolRunner
+
+logger = logging.getLogger(__name__)
+
+
+def parse_cached_tools(spec: str, default_ttl: float = 300.0) -> dict[str, float]:
+    """`"get_courses:600,get_paths"` -> `{"get_courses": 600.0, "get_paths": default_ttl}`."""
+    tools: dict[str, float] = {}
+    for item in spec.split(","):
+        name, _, ttl = item.strip().partition(":")
+        if name:
+            tools[name] = float(ttl) if ttl else default_ttl
+    return tools
+
+
+class SharedMCPServer(mcp.MCPServerHTTP):
+    """
+    An MCP server meant to be built once per job process (see `agents.starter.config`)
+    and shared by every agent of the call, instead of one server, session and tool listing
+    per agent instance.
+
+    - The session is opened once, even when several agents start at the same time, and
+      `prewarm()` opens it and lists the tools while the phone is still ringing.
+    - The tool list is re-fetched at most every `tools_ttl` seconds.
+    - Results of the tools in `cached_tools` (name -> seconds), which must be read-only,
+      are reused for identical arguments, and identical calls in flight share one request.
+
+    The session multiplexes requests, so the tool calls of one LLM response, which the
+    agent session runs concurrently, also reach the server concurrently. With a
+    `tool_runner`, every call runs within its latency budget.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        headers: dict[str, Any] | None = None,
+        *,
+        timeout: float = 5,
+        client_session_timeout_seconds: float = 5,
+        tools_ttl: float = 300.0,
+        cached_tools: Mapping[str, float] | None = None,
+        max_cached_results: int = 256,
+        tool_runner: ToolRunner | None = None,
+    ) -> None:
+        super().__init__(
+            url=url,
+            headers=headers,
+            timeout=timeout,
+            client_session_timeout_seconds=client_session_timeout_seconds,
+        )
+        self.tools_ttl = tools_ttl
+        self.cached_tools = dict(cached_tools or {})
+        self.max_cached_results = max_cached_results
+        self.tool_runner = tool_runner
+        self.tool_listings = 0
+        self.result_hits = 0
+        self.result_misses = 0
+        self._lock = asyncio.Lock()
+        self._tools_expire_at = 0.0
+        self._results: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[tuple[str, str], asyncio.Future[Any]] = {}
+        self._warm_task: asyncio.Task[None] | None = None
+        self._session_task: asyncio.Task[None] | None = None
+        self._closing = asyncio.Event()
+
+    async def initialize(self) -> None:
+        async with self._lock:
+            await self._ensure_session()
+
+    async def _ensure_session(self) -> None:
+        if self.initialized:
+            return
+        ready: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._closing = asyncio.Event()
+        self._session_task = asyncio.create_task(self._hold_session(ready), name="mcp_session")
+        await ready
+
+    async def _hold_session(self, ready: asyncio.Future[None]) -> None:
+        # The transport's anyio cancel scopes must be exited by the task that entered
+        # them, while whoever uses the session first (the prewarm, an agent activity) and
+        # whoever closes it are different tasks, so one task owns it for its lifetime.
+        try:
+            await super().initialize()
+        except Exception as e:
+            ready.set_exception(e)
+            return
+        ready.set_result(None)
+        try:
+            await self._closing.wait()
+        finally:
+            await super().aclose()
+
+    async def list_tools(self) -> list[mcp.MCPTool]:
+        async with self._lock:
+            await self._ensure_session()
+            if time.monotonic() >= self._tools_expire_at:
+                self.invalidate_cache()
+                self._tools_expire_at = time.monotonic() + self.tools_ttl
+                self.tool_listings += 1
+            return await super().list_tools()
+
+    def prewarm(self) -> None:
+        """Open the session and list the tools in the background, once per process."""
+        if self._warm_task is None:
+            self._warm_task = asyncio.create_task(self._warm(), name="mcp_prewarm")
+
+    async def _warm(self) -> None:
+        started = time.perf_counter()
+        try:
+            tools = await self.list_tools()
+        except Exception as e:
+            # the agent session will try again, and log it, when it starts
+            logger.warning(f"Could not prewarm MCP server {self.url}: {e!r}")
+            return
+        logger.debug(
+            f"MCP server ready with {len(tools)} tools in "
+            f"{(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+
+    def _make_function_tool(
+        self, name: str, description: str | None, input_schema: dict[str, Any]
+    ) -> mcp.MCPTool:
+        tool = super()._make_function_tool(name, description, input_schema)
+        ttl = self.cached_tools.get(name)
+        runner = self.tool_runner
+        if ttl is None and runner is None:
+            return tool
+
+        schema = {"name": name, "description": description, "parameters": input_schema}
+
+        async def _call(raw_arguments: dict[str, Any]) -> Any:
+            if ttl is None:
+                return await tool(raw_arguments=raw_arguments)
+            return await self._call_cached(name, raw_arguments, ttl, tool)
+
+        if runner is None:
+            return function_tool(_call, raw_schema=schema)
+
+        async def _budgeted_call(raw_arguments: dict[str, Any], context: RunContext[Any]) -> Any:
+            return await runner.run(name, lambda: _call(raw_arguments), session=context.session)
+
+        return function_tool(_budgeted_call, raw_schema=schema)
+
+    async def _call_cached(
+        self, name: str, arguments: dict[str, Any], ttl: float, tool: mcp.MCPTool
+    ) -> Any:
+        key = (name, json.dumps(arguments, sort_keys=True, separators=(",", ":")))
+        if (entry := self._results.get(key)) is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                self._results.move_to_end(key)
+                self.result_hits += 1
+                return result
+            del self._results[key]
+
+        if (pending := self._inflight.get(key)) is not None:
+            self.result_hits += 1
+            return await asyncio.shield(pending)
+
+        self.result_misses += 1
+        request = asyncio.ensure_future(tool(raw_arguments=arguments))
+        self._inflight[key] = request
+        try:
+            # errors propagate to every waiter and aren't cached
+            result = await asyncio.shield(request)
+        finally:
+            self._inflight.pop(key, None)
+
+        self._results[key] = (time.monotonic() + ttl, result)
+        while len(self._results) > self.max_cached_results:
+            self._results.popitem(last=False)
+        return result
+
+    async def aclose(self) -> None:
+        if asyncio.current_task() is self._session_task:
+            # the session failed to initialize and is being cleaned up
+            await super().aclose()
+            return
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+            self._warm_task = None
+        if self._session_task is not None:
+            self._closing.set()
+            await self._session_task
+            self._session_task = None
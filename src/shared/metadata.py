@@ -0,0 +1,117 @@
+import json
+from collections.abc import Mapping
+from typing import Any, Self
+
+from attrs import define
+
+METADATA_VERSION = 1
+MAX_METADATA_BYTES = 64 * 1024
+MAX_NAME_CHARS = 200
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, sort_keys=True)
+
+
+def _loads_object(text: str, what: str) -> dict[str, Any]:
+    try:
+        value = json.loads(text)
+    except (ValueError, RecursionError):
+        raise ValueError(f"{what} is not valid JSON") from None
+    if not isinstance(value, dict):
+        raise ValueError(f"{what} must be a JSON object, got {type(value).__name__}")
+    return value
+
+
+@define(frozen=True)
+class CallMetadata:
+    """
+    What the dialer tells the agent about the person being called, sent as the job
+    metadata of the dispatch.
+
+    `user_name` and `age` are the fields the agents read; every other campaign column
+    (e.g. a CRM record) goes in `extra`, which the agent only hands on to the LLM, so it
+    travels and stays as JSON text.
+
+    The wire format is the version, the validated header and `extra`, one per line
+    (JSON never contains a raw newline). Records are validated once, by `from_record` on
+    the dispatch side; `decode` only checks the version, the size, the header and that
+    `extra` is a JSON object, and raises `ValueError` for anything else.
+    """
+
+    user_name: str | None = None
+    age: int | None = None
+    extra_json: str = "{}"
+
+    @property
+    def extra(self) -> dict[str, Any]:
+        return json.loads(self.extra_json)
+
+    @classmethod
+    def from_record(cls, record: Mapping[str, Any]) -> Self:
+        """Validate a campaign record: CSV columns are strings, so `age` may be one too."""
+        fields = dict(record)
+        user_name = fields.pop("user_name", None)
+        if user_name is not None:
+            if not isinstance(user_name, str):
+                raise ValueError(f"user_name must be a string, got {type(user_name).__name__}")
+            user_name = user_name.strip()[:MAX_NAME_CHARS] or None
+
+        age = fields.pop("age", None)
+        if age is not None and age != "":
+            try:
+                age = int(age)
+            except (TypeError, ValueError):
+                raise ValueError(f"age must be a whole number, got {age!r}") from None
+            if not 0 <= age < 150:
+                raise ValueError(f"age {age} is out of range")
+        else:
+            age = None
+
+        try:
+            extra_json = _dumps(fields)
+        except TypeError as e:
+            raise ValueError(f"metadata is not JSON serializable: {e}") from None
+        return cls(user_name, age, extra_json)
+
+    def encode(self, max_bytes: int = MAX_METADATA_BYTES) -> str:
+        wire = f"{METADATA_VERSION}\n{self._header()}\n{self.extra_json}"
+        if (size := len(wire.encode())) > max_bytes:
+            raise ValueError(f"metadata is {size} bytes, over the {max_bytes} byte limit")
+        return wire
+
+    @classmethod
+    def decode(cls, wire: str, max_bytes: int = MAX_METADATA_BYTES) -> Self:
+        if not wire:
+            return cls()
+        # a character is at least one byte, so this never rejects what `encode` sent
+        if len(wire) > max_bytes:
+            raise ValueError(f"metadata is over the {max_bytes} byte limit")
+        if wire.startswith("{"):
+            # plain JSON, as dispatched before the versioned format
+            return cls.from_record(_loads_object(wire, "metadata"))
+
+        version, _, rest = wire.partition("\n")
+        if version != str(METADATA_VERSION):
+            raise ValueError(f"unsupported metadata version {version!r}")
+        header, _, extra_json = rest.partition("\n")
+        fields = _loads_object(header, "metadata header")
+        user_name, age = fields.get("user_name"), fields.get("age")
+        if (
+            not isinstance(user_name, str | None)
+            or not isinstance(age, int | None)
+            or isinstance(age, bool)
+        ):
+            raise ValueError(f"invalid metadata header {header!r}")
+        _loads_object(extra_json, "metadata extra fields")
+        return cls(user_name, age, extra_json)
+
+    def describe(self) -> str:
+        """The user information message for the LLM, the same text for the same data."""
+        text = f"The user information is: {self._header()}"
+        if self.extra_json != "{}":
+            text += f"\nMore about the user: {self.extra_json}"
+        return text
+
+    def _header(self) -> str:
+        return _dumps({"age": self.age, "user_name": self.user_name})
@@ -0,0 +1,82 @@
+import logging
+import time
+
+from livekit.agents import JobProcess, llm, stt, tts
+from livekit.plugins import noise_cancellation, silero
+from livekit.plugins.turn_detector.base import _download_from_hf_hub
+from livekit.plugins.turn_detector.models import HG_MODEL, MODEL_REVISIONS, ONNX_FILENAME
+
+from shared.mcp_client import SharedMCPServer
+from shared.providers import ProviderRegistry
+
+logger = logging.getLogger(__name__)
+
+
+def _resolve_turn_detector_files() -> None:
+    # The ONNX session itself lives in the worker's shared inference process and is
+    # loaded once when the worker starts. What `MultilingualModel()` still does per job
+    # is resolve its files in the Hugging Face cache, so pay that here instead.
+    for filename, subfolder in ((ONNX_FILENAME, "onnx"), ("languages.json", None)):
+        _download_from_hf_hub(
+            HG_MODEL,
+            filename,
+            subfolder=subfolder,
+            revision=MODEL_REVISIONS["multilingual"],
+            local_files_only=True,
+        )
+
+
+def load_models(proc: JobProcess, *registries: ProviderRegistry) -> dict[str, float]:
+    """
+    Load everything a call needs while the job process is idle, so accepting a call adds
+    no model loading: the Silero VAD (`proc.userdata["vad"]`), the noise cancellation
+    filter (`proc.userdata["noise_cancellation"]`), the turn-detector files and the
+    providers of each registry. Returns seconds per step, also kept in
+    `proc.userdata["prewarm_timings"]`.
+    """
+    timings: dict[str, float] = {}
+
+    started = time.perf_counter()
+    proc.userdata["vad"] = silero.VAD.load()
+    timings["vad"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    proc.userdata["noise_cancellation"] = noise_cancellation.BVC()
+    timings["noise_cancellation"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    try:
+        _resolve_turn_detector_files()
+    except Exception as e:
+        logger.error(f"Turn detector files not found, run the `download-files` command: {e}")
+    timings["turn_detector"] = time.perf_counter() - started
+
+    for registry in registries:
+        for name, seconds in registry.warm().items():
+            timings[f"provider.{name}"] = seconds
+
+    proc.userdata["prewarm_timings"] = timings
+    logger.info(
+        f"Prewarmed job process {proc.pid} in {sum(timings.values()) * 1000:.0f} ms: "
+        + ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in timings.items())
+    )
+    return timings
+
+
+def open_connections(*registries: ProviderRegistry) -> None:
+    """
+    Start the providers' own connection warm-up (e.g. Cartesia's websocket pool, the MCP
+    session and tool list) as soon as the job starts. Connections belong to the job's
+    event loop and HTTP session, which don't exist yet in prewarm; opened here, they're
+    ready by the time the room is joined.
+    """
+    for registry in registries:
+        for provider in registry:
+            instance = provider.get()
+            if isinstance(instance, llm.LLM | stt.STT | tts.TTS | SharedMCPServer):
+                instance.prewarm()
+
+
+def prewarm(proc: JobProcess) -> None:
+    """`prewarm_fnc` for workers whose agents have no provider registry."""
+    load_models(proc)
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from collections.abc import Sequence
+
+import aiohttp
+from livekit.agents import utils
+
+from shared.providers import ProviderEndpoint
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderPool:
+    """
+    Keeps authenticated keep-alive connections to each provider host open in the job's
+    HTTP session, from the moment the job is dispatched until the call goes quiet.
+
+    Plugins such as Deepgram and Cartesia open their websockets through that same session
+    (`utils.http_context.http_session()`), and aiohttp upgrades an idle pooled connection
+    instead of paying for TCP and TLS setup again. Warming them while the phone rings
+    takes that setup off the first utterance, and off any reconnect during the call.
+
+    Connections are re-checked every `health_check_interval` seconds, which also keeps
+    them inside the server's keep-alive window. After `idle_timeout` seconds without
+    `touch()`, checks stop and the connections are left to expire.
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[ProviderEndpoint],
+        *,
+        session: aiohttp.ClientSession | None = None,
+        connections_per_host: int = 1,
+        health_check_interval: float = 20.0,
+        idle_timeout: float = 300.0,
+        timeout: float = 5.0,
+    ) -> None:
+        self._endpoints = list(endpoints)
+        self._session = session
+        self._connections_per_host = connections_per_host
+        self._health_check_interval = health_check_interval
+        self._idle_timeout = idle_timeout
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._last_active = time.monotonic()
+        self._task: asyncio.Task[None] | None = None
+        self.healthy: dict[str, bool] = {}
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = utils.http_context.http_session()
+        return self._session
+
+    def touch(self) -> None:
+        """Mark the call as active, so connections keep being checked (again, if it went idle)."""
+        self._last_active = time.monotonic()
+        if self._task is not None and self._task.done():
+            self._task = asyncio.create_task(self._run(), name="provider_pool")
+
+    @property
+    def idle(self) -> bool:
+        return time.monotonic() - self._last_active >= self._idle_timeout
+
+    async def _check(self, endpoint: ProviderEndpoint) -> bool:
+        session = self._ensure_session()
+        try:
+            async with session.get(
+                endpoint.url, headers=endpoint.headers, timeout=self._timeout
+            ) as resp:
+                await resp.read()
+                healthy = resp.status < 400
+                reason = f"HTTP {resp.status}"
+        except (aiohttp.ClientError, TimeoutError) as e:
+            healthy, reason = False, repr(e)
+
+        if not healthy and self.healthy.get(endpoint.name, True):
+            logger.warning(f"Provider {endpoint.name} failed its health check: {reason}")
+        elif healthy and self.healthy.get(endpoint.name) is False:
+            logger.info(f"Provider {endpoint.name} is healthy again")
+        self.healthy[endpoint.name] = healthy
+        return healthy
+
+    async def warm(self) -> dict[str, float]:
+        """
+        Open `connections_per_host` connections to every endpoint concurrently. Returns
+        seconds per endpoint; failures are logged and recorded in `healthy`.
+        """
+
+        async def warm_endpoint(endpoint: ProviderEndpoint) -> float:
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(self._check(endpoint) for _ in range(self._connections_per_host))
+            )
+            return time.perf_counter() - started
+
+        timings = await asyncio.gather(*(warm_endpoint(e) for e in self._endpoints))
+        return {e.name: t for e, t in zip(self._endpoints, timings, strict=True)}
+
+    async def _run(self) -> None:
+        timings = await self.warm()
+        logger.debug(
+            "Warmed provider connections: "
+            + ", ".join(f"{name} {t * 1000:.0f} ms" for name, t in timings.items())
+        )
+        while not self.idle:
+            await asyncio.sleep(self._health_check_interval)
+            if not self.idle:
+                await self.warm()
+        logger.debug("Call is idle, letting provider connections expire")
+
+    def start(self) -> None:
+        """Warm the connections in the background and keep checking them."""
+        if self._task is None:
+            self._last_active = time.monotonic()
+            self._task = asyncio.create_task(self._run(), name="provider_pool")
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            await utils.aio.cancel_and_wait(self._task)
+            self._task = None
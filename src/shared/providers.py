@@ -0,0 +1,89 @@
+import logging
+import os
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from attrs import define, field
+
+logger = logging.getLogger(__name__)
+
+
+class Provider[T]:
+    """
+    A plugin instance (LLM, STT, TTS, MCP server...) built on first use in each process.
+
+    Building it at import time made every importer pay for the provider SDKs, including
+    entry points that never talk to them, like the dialer. Instances are also never
+    shared across processes: a job process forked or spawned from the worker builds its
+    own the first time it asks for one.
+
+    Factories should import their plugin module lazily. LiveKit plugins must be imported
+    on the main thread, so worker entry points import them at startup and the factory
+    import then just returns the loaded module.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]) -> None:
+        self.name = name
+        self._factory = factory
+        self._instance: T | None = None
+        self._pid: int | None = None
+
+    @property
+    def built(self) -> bool:
+        return self._instance is not None and self._pid == os.getpid()
+
+    def get(self) -> T:
+        if not self.built:
+            started = time.perf_counter()
+            self._instance = self._factory()
+            self._pid = os.getpid()
+            logger.debug(
+                f"Built provider {self.name} in {(time.perf_counter() - started) * 1000:.1f} ms"
+            )
+        return self._instance  # pyright: ignore[reportReturnType]
+
+    def override(self, factory: Callable[[], T]) -> None:
+        """Build from `factory` from now on, e.g. a local stand-in for a load test."""
+        self._factory = factory
+        self._instance = None
+
+
+@define
+class ProviderEndpoint:
+    """A cheap authenticated request to a provider's host, used to open and check connections."""
+
+    name: str
+    url: str
+    headers: dict[str, str] = field(factory=dict)
+
+
+class ProviderRegistry:
+    """The providers of one agent, so its worker can build them all before the first call."""
+
+    def __init__(self) -> None:
+        self._providers: dict[str, Provider[Any]] = {}
+
+    def register[T](self, name: str, factory: Callable[[], T]) -> Provider[T]:
+        if name in self._providers:
+            raise ValueError(f"Provider {name!r} is already registered")
+        provider = Provider(name, factory)
+        self._providers[name] = provider
+        return provider
+
+    def __getitem__(self, name: str) -> Provider[Any]:
+        return self._providers[name]
+
+    def __iter__(self) -> Iterator[Provider[Any]]:
+        return iter(self._providers.values())
+
+    def warm(self) -> dict[str, float]:
+        """Build every provider not built yet in this process; returns seconds per provider."""
+        timings: dict[str, float] = {}
+        for name, provider in self._providers.items():
+            if provider.built:
+                continue
+            started = time.perf_counter()
+            provider.get()
+            timings[name] = time.perf_counter() - started
+        return timings
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from typing import Any
+
+from attrs import define
+from livekit.agents import AgentSession, metrics
+from livekit.agents.voice import (
+    MetricsCollectedEvent,
+    SpeechCreatedEvent,
+    SpeechHandle,
+    UserInputTranscribedEvent,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@define
+class Speculation:
+    """One reply the session started generating before the end of the user's turn."""
+
+    speech_id: str
+    created_at: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    ttft: float | None = None
+    # set when the turn detector committed the turn this reply was generated for
+    lead_time: float | None = None
+    wasted: bool = False
+
+    @property
+    def tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def saved(self) -> float:
+        """
+        Seconds taken off the reply: the LLM was already `lead_time` into the request
+        when the turn was committed, but it can't save more than the whole time to first
+        token.
+        """
+        if self.lead_time is None or self.ttft is None:
+            return 0.0
+        return max(0.0, min(self.lead_time, self.ttft))
+
+
+class SpeculationTracker:
+    """
+    Accounts for `AgentSession(preemptive_generation=True)`, which starts the LLM on
+    each final (stable) STT transcript instead of waiting for the turn detector, and
+    keeps the reply only if the committed turn has the same transcript.
+
+    The session starts that reply in the same callback that emits the final transcript,
+    which is how speculative replies are told apart. Each is then followed by its
+    `SpeechHandle`: it was used when the turn's EOU metrics carry its speech id, and
+    wasted when it's done without that, cancelled before playout for a newer transcript
+    or a turn that changed. After `max_wasted` wasted replies in a call, speculation is
+    turned off for the rest of it.
+    """
+
+    def __init__(self, *, max_wasted: int | None = None) -> None:
+        self.max_wasted = max_wasted
+        self.speculations: dict[str, Speculation] = {}
+        self._transcript_final = False
+        self._session: AgentSession[Any] | None = None
+
+    def attach(self, session: AgentSession[Any]) -> None:
+        self._session = session
+        session.on("user_input_transcribed", self.on_user_input_transcribed)
+        session.on("speech_created", self.on_speech_created)
+        session.on("metrics_collected", self.on_metrics_collected)
+
+    def on_user_input_transcribed(self, ev: UserInputTranscribedEvent) -> None:
+        if not ev.is_final:
+            return
+        self._transcript_final = True
+        asyncio.get_running_loop().call_soon(self._end_transcript_callback)
+
+    def _end_transcript_callback(self) -> None:
+        self._transcript_final = False
+
+    def on_speech_created(self, ev: SpeechCreatedEvent) -> None:
+        if not self._transcript_final or ev.source != "generate_reply":
+            return
+        self.speculations[ev.speech_handle.id] = Speculation(ev.speech_handle.id, ev.created_at)
+        ev.speech_handle.add_done_callback(self._on_speech_done)
+
+    def on_metrics_collected(self, ev: MetricsCollectedEvent) -> None:
+        m = ev.metrics
+        match m:
+            case metrics.LLMMetrics() if m.speech_id in self.speculations:
+                speculation = self.speculations[m.speech_id]
+                speculation.prompt_tokens += m.prompt_tokens
+                speculation.completion_tokens += m.completion_tokens
+                if speculation.ttft is None and m.ttft >= 0:
+                    speculation.ttft = m.ttft
+            case metrics.EOUMetrics() if m.speech_id in self.speculations:
+                speculation = self.speculations[m.speech_id]
+                speculation.lead_time = m.timestamp - speculation.created_at
+            case _:
+                pass
+
+    def _on_speech_done(self, handle: SpeechHandle) -> None:
+        speculation = self.speculations[handle.id]
+        if speculation.lead_time is not None:
+            return
+        # no committed turn took it
+        speculation.wasted = True
+        wasted = sum(s.wasted for s in self.speculations.values())
+        if (
+            self.max_wasted is not None
+            and wasted >= self.max_wasted
+            and self._session is not None
+            and self._session.options.preemptive_generation
+        ):
+            logger.info(f"{wasted} speculative replies wasted, disabling preemptive generation")
+            self._session.options.preemptive_generation = False
+
+    def summary(self) -> dict[str, float]:
+        used = [s for s in self.speculations.values() if s.lead_time is not None]
+        wasted = [s for s in self.speculations.values() if s.wasted]
+        return {
+            "used": len(used),
+            "wasted": len(wasted),
+            "wasted_tokens": sum(s.tokens for s in wasted),
+            "saved_ms": round(sum(s.saved for s in used) * 1000, 1),
+        }
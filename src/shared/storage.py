@@ -0,0 +1,357 @@
+import asyncio
+import hashlib
+import hmac
+import io
+import logging
+import os
+import shutil
+import socket
+import tarfile
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Protocol
+from urllib.parse import parse_qsl, quote, urlsplit
+
+import aiohttp
+
+from utils.constants import output_dir
+from utils.environment import Config, get_config
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage")
+
+# A batch claimed by a worker that died mid-upload goes back to pending after this long.
+STALE_UPLOAD = timedelta(minutes=15)
+# How often the uploader checks whether a batch is due, at most.
+UPLOAD_CHECK_INTERVAL = 5.0
+
+
+class TranscriptStorage(Protocol):
+    """Where finished transcripts go. Transcripts are streamed into `working_dir` first."""
+
+    working_dir: Path
+
+    async def save(self, path: Path) -> None: ...
+
+    async def drain(self) -> None: ...
+
+
+class LocalStorage:
+    """Keeps transcripts in a single local directory."""
+
+    def __init__(self, directory: Path) -> None:
+        self.working_dir = directory
+
+    def _target_dir(self) -> Path:
+        return self.working_dir
+
+    async def save(self, path: Path) -> None:
+        target_dir = self._target_dir()
+        if path.parent == target_dir:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(_executor, self._move, path, target_dir)
+
+    def _move(self, path: Path, target_dir: Path) -> None:
+        target_dir.mkdir(parents=True, exist_ok=True)
+        os.replace(path, target_dir / path.name)
+
+    async def drain(self) -> None:
+        pass
+
+
+class RotatedStorage(LocalStorage):
+    """
+    Files transcripts into one subdirectory per UTC day and, with `keep_days`, deletes
+    days older than that so a long-running worker doesn't fill its disk.
+    """
+
+    def __init__(self, directory: Path, *, keep_days: int = 0) -> None:
+        super().__init__(directory)
+        self.keep_days = keep_days
+
+    def _target_dir(self) -> Path:
+        return self.working_dir / f"{datetime.now(UTC):%Y-%m-%d}"
+
+    def _move(self, path: Path, target_dir: Path) -> None:
+        is_new_day = not target_dir.exists()
+        super()._move(path, target_dir)
+        if is_new_day and self.keep_days > 0:
+            self._prune()
+
+    def _prune(self) -> None:
+        cutoff = f"{datetime.now(UTC) - timedelta(days=self.keep_days):%Y-%m-%d}"
+        for day_dir in self.working_dir.iterdir():
+            if day_dir.is_dir() and len(day_dir.name) == 10 and day_dir.name < cutoff:
+                logger.info(f"Removing transcripts older than {self.keep_days} days: {day_dir}")
+                shutil.rmtree(day_dir, ignore_errors=True)
+
+
+def sign_v4(
+    method: str,
+    url: str,
+    headers: dict[str, str],
+    payload_hash: str,
+    *,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    now: datetime,
+    service: str = "s3",
+) -> dict[str, str]:
+    """
+    Sign a request with AWS Signature Version 4 and return the headers to send with it
+    (the `Host` header is left to the HTTP client). `url` must already be URI-encoded.
+    """
+    parts = urlsplit(url)
+    amz_date = f"{now:%Y%m%dT%H%M%SZ}"
+    scope = f"{now:%Y%m%d}/{region}/{service}/aws4_request"
+    headers = {
+        **{name.lower(): value.strip() for name, value in headers.items()},
+        "x-amz-content-sha256": payload_hash,
+        "x-amz-date": amz_date,
+    }
+    signed = {**headers, "host": parts.netloc}
+    signed_headers = ";".join(sorted(signed))
+    canonical_query = "&".join(
+        sorted(
+            f"{quote(key, safe='-_.~')}={quote(value, safe='-_.~')}"
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        )
+    )
+    canonical_request = "\n".join(
+        [
+            method,
+            parts.path or "/",
+            canonical_query,
+            "".join(f"{name}:{signed[name]}\n" for name in sorted(signed)),
+            signed_headers,
+            payload_hash,
+        ]
+    )
+    string_to_sign = "\n".join(
+        [
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ]
+    )
+    key = f"AWS4{secret_key}".encode()
+    for part in (f"{now:%Y%m%d}", region, service, "aws4_request"):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+    headers["authorization"] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope},"
+        f"SignedHeaders={signed_headers},Signature={signature}"
+    )
+    return headers
+
+
+class S3Storage:
+    """
+    Uploads transcripts to an S3-compatible bucket in compressed batches.
+
+    `save` only moves a transcript into `<spool_dir>/pending`: LiveKit runs each job in
+    its own process, which ends with its call, too soon for a batch to fill. The
+    worker's main process runs `upload_periodically` instead (see `start_uploads`):
+    once `batch_size` transcripts are waiting, or the oldest has waited `max_age`
+    seconds, the pending files are claimed, tarred and gzipped into one object, and
+    uploaded. `drain` uploads whatever is still pending when the worker stops. The
+    spool lives on disk, so every job process on the host adds to the same batches,
+    and a failed or interrupted upload is retried with the next one.
+    """
+
+    def __init__(
+        self,
+        spool_dir: Path,
+        *,
+        bucket: str,
+        endpoint: str,
+        region: str,
+        access_key: str,
+        secret_key: str,
+        prefix: str = "transcripts/",
+        batch_size: int = 20,
+        max_age: float = 300.0,
+        timeout: float = 60.0,
+    ) -> None:
+        self.working_dir = spool_dir
+        self.bucket = bucket
+        self.endpoint = endpoint.rstrip("/")
+        self.region = region
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._pending_dir = spool_dir / "pending"
+        self._uploading_dir = spool_dir / "uploading"
+        self._flush_task: asyncio.Task[int] | None = None
+
+    async def save(self, path: Path) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(_executor, self._spool, path)
+
+    async def upload_periodically(self) -> None:
+        """Upload a batch whenever one is due, until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(min(self.max_age, UPLOAD_CHECK_INTERVAL))
+            if await loop.run_in_executor(_executor, self._is_due):
+                self._start_flush()
+
+    async def drain(self) -> None:
+        """Upload every pending transcript and wait for it. Call when the worker shuts down."""
+        if self._flush_task is not None:
+            await asyncio.shield(self._flush_task)
+        await self.flush()
+
+    def _start_flush(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self) -> int:
+        """Upload every pending transcript as one batch and return how many were sent."""
+        loop = asyncio.get_running_loop()
+        batch_dir, count, body = await loop.run_in_executor(_executor, self._bundle)
+        if not count:
+            return 0
+        key = f"{self.prefix}{datetime.now(UTC):%Y/%m/%d}/{batch_dir.name}.tar.gz"
+        try:
+            await self._put(key, body)
+        except Exception:
+            logger.exception(f"Failed to upload {count} transcripts, keeping them for retry")
+            await loop.run_in_executor(_executor, self._release, batch_dir)
+            return 0
+        await loop.run_in_executor(_executor, shutil.rmtree, batch_dir)
+        logger.info(f"Uploaded {count} transcripts ({len(body)} bytes) to s3://{self.bucket}/{key}")
+        return count
+
+    async def _put(self, key: str, body: bytes) -> None:
+        url = f"{self.endpoint}/{self.bucket}/{quote(key, safe='/-_.~')}"
+        headers = sign_v4(
+            "PUT",
+            url,
+            {"content-type": "application/gzip"},
+            hashlib.sha256(body).hexdigest(),
+            access_key=self._access_key,
+            secret_key=self._secret_key,
+            region=self.region,
+            now=datetime.now(UTC),
+        )
+        async with (
+            aiohttp.ClientSession(timeout=self._timeout) as session,
+            session.put(url, data=body, headers=headers) as response,
+        ):
+            response.raise_for_status()
+
+    def _spool(self, path: Path) -> None:
+        self._pending_dir.mkdir(parents=True, exist_ok=True)
+        os.replace(path, self._pending_dir / path.name)
+
+    def _is_due(self) -> bool:
+        if not self._pending_dir.exists():
+            return False
+        pending: list[float] = []
+        for entry in self._pending_dir.glob("*"):
+            try:
+                pending.append(entry.stat().st_mtime)
+            except FileNotFoundError:
+                # claimed by another process since it was listed
+                continue
+        if not pending:
+            return False
+        return len(pending) >= self.batch_size or time.time() - min(pending) >= self.max_age
+
+    def _bundle(self) -> tuple[Path, int, bytes]:
+        self._recover_stale()
+        batch_dir = self._uploading_dir / f"{socket.gethostname()}-{uuid.uuid4().hex[:12]}"
+        claimed: list[Path] = []
+        for path in sorted(self._pending_dir.glob("*")):
+            # created with the first claim, so an empty flush leaves nothing behind
+            batch_dir.mkdir(parents=True, exist_ok=True)
+            try:
+                # Renames are atomic, so concurrent workers never claim the same file.
+                path.rename(batch_dir / path.name)
+            except FileNotFoundError:
+                continue
+            claimed.append(batch_dir / path.name)
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+            for path in claimed:
+                tar.add(path, arcname=path.name)
+        return batch_dir, len(claimed), buffer.getvalue()
+
+    def _release(self, batch_dir: Path) -> None:
+        for path in batch_dir.iterdir():
+            os.replace(path, self._pending_dir / path.name)
+        batch_dir.rmdir()
+
+    def _recover_stale(self) -> None:
+        if not self._uploading_dir.exists():
+            return
+        cutoff = time.time() - STALE_UPLOAD.total_seconds()
+        for batch_dir in self._uploading_dir.iterdir():
+            if batch_dir.stat().st_mtime < cutoff:
+                logger.warning(f"Re-queueing transcripts from abandoned upload {batch_dir.name}")
+                self._release(batch_dir)
+
+
+def start_uploads(storage: TranscriptStorage, *, timeout: float = 60.0) -> Callable[[], None]:
+    """
+    Upload what job processes spool into `storage` from a thread of the worker's main
+    process, and return the function that stops it, once it has drained what's left
+    (waiting up to `timeout` seconds). Storages that don't batch need no uploads.
+    """
+    if not isinstance(storage, S3Storage):
+        return lambda: None
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="transcript_uploads", daemon=True)
+    thread.start()
+    uploads = asyncio.run_coroutine_threadsafe(storage.upload_periodically(), loop)
+
+    def stop() -> None:
+        uploads.cancel()
+        try:
+            asyncio.run_coroutine_threadsafe(storage.drain(), loop).result(timeout)
+        except Exception:
+            logger.exception("Failed to upload the last transcripts, keeping them for retry")
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    return stop
+
+
+def storage_from_config(config: Config | None = None) -> TranscriptStorage:
+    """Build the transcript storage selected by `TRANSCRIPT_STORAGE`."""
+    config = config or get_config()
+    directory = Path(config.transcript_dir) if config.transcript_dir else output_dir
+    match config.transcript_storage:
+        case "local":
+            return LocalStorage(directory)
+        case "rotated":
+            return RotatedStorage(directory, keep_days=config.transcript_keep_days)
+        case "s3":
+            return S3Storage(
+                directory,
+                bucket=config.transcript_s3_bucket,
+                endpoint=config.transcript_s3_endpoint,
+                region=config.transcript_s3_region,
+                access_key=config.transcript_s3_access_key,
+                secret_key=config.transcript_s3_secret_key,
+                prefix=config.transcript_s3_prefix,
+                batch_size=config.transcript_upload_batch,
+                max_age=config.transcript_upload_max_age,
+            )
+        case other:
+            raise ValueError(f"Unknown TRANSCRIPT_STORAGE {other!r}, expected local, rotated or s3")
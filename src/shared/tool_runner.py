@@ -0,0 +1,173 @@
+import asyncio
+import functools
+import logging
+import time
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from typing import Any, Literal
+
+from attrs import define
+from livekit import rtc
+from livekit.agents import AgentSession, RunContext
+from livekit.agents.llm import ToolError
+
+from shared.cached_tts import CachedTTS
+from shared.handoff import HandoffAgent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FILLERS = (
+    "One moment, please.",
+    "Let me check that for you.",
+    "Still working on it, thanks for waiting.",
+)
+
+
+@define
+class ToolBudget:
+    """Seconds after which a filler phrase is spoken (`soft`) and the call is abandoned (`hard`)."""
+
+    soft: float = 1.5
+    hard: float = 10.0
+
+
+@define
+class ToolExecution:
+    """Emitted as `tool_executed` after every tool call the runner handles."""
+
+    name: str
+    duration: float
+    timed_out: bool = False
+    filler: bool = False
+
+
+def parse_tool_budgets(spec: str) -> dict[str, ToolBudget]:
+    """`"get_course:1:5,lookup_weather:0.5:3"` -> a `ToolBudget(soft, hard)` per tool."""
+    budgets: dict[str, ToolBudget] = {}
+    for item in spec.split(","):
+        if not (item := item.strip()):
+            continue
+        name, soft, hard = item.split(":")
+        budgets[name] = ToolBudget(float(soft), float(hard))
+    return budgets
+
+
+class ToolRunner(rtc.EventEmitter[Literal["tool_executed"]]):
+    """
+    Runs function tools within a latency budget, so a slow backend doesn't leave the
+    line silent for as long as it takes.
+
+    At most `max_concurrency` tools run at once, the rest wait their turn within their
+    own budget. A tool still running after its soft deadline gets a filler phrase spoken
+    over the silence, from the TTS cache once `prefetch_fillers` has rendered them, and
+    one past its hard deadline is cancelled and reported to the LLM as a `ToolError`.
+    The fillers are the session's current agent's (`HandoffAgent.fillers`), so they are
+    in its language, or `fillers` for an agent that sets none.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 4,
+        default_budget: ToolBudget | None = None,
+        budgets: Mapping[str, ToolBudget] | None = None,
+        fillers: Sequence[str] = DEFAULT_FILLERS,
+    ) -> None:
+        super().__init__()
+        self.default_budget = default_budget or ToolBudget()
+        self.budgets = dict(budgets or {})
+        self.fillers = list(fillers)
+        self._fillers_spoken = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._prefetched: set[str] = set()
+        self._prefetch_tasks: set[asyncio.Task[None]] = set()
+
+    def budget(self, name: str) -> ToolBudget:
+        return self.budgets.get(name, self.default_budget)
+
+    async def run[T](
+        self,
+        name: str,
+        call: Callable[[], Awaitable[T]],
+        *,
+        session: AgentSession[Any] | None = None,
+    ) -> T:
+        budget = self.budget(name)
+        started = time.perf_counter()
+        execution = ToolExecution(name, 0.0)
+
+        async def _execute() -> T:
+            async with self._semaphore:
+                return await call()
+
+        task = asyncio.ensure_future(_execute())
+        try:
+            async with asyncio.timeout(budget.hard):
+                done, _ = await asyncio.wait({task}, timeout=budget.soft)
+                if not done and session is not None and (fillers := self._fillers(session)):
+                    session.say(fillers[self._fillers_spoken % len(fillers)], add_to_chat_ctx=False)
+                    self._fillers_spoken += 1
+                    execution.filler = True
+                return await task
+        except TimeoutError:
+            execution.timed_out = True
+            logger.warning(f"Tool {name} exceeded its {budget.hard}s budget")
+            raise ToolError(
+                f"{name} is taking too long to answer. Tell the user it's unavailable right now."
+            ) from None
+        finally:
+            if not task.done():
+                task.cancel()
+            execution.duration = time.perf_counter() - started
+            self.emit("tool_executed", execution)
+
+    def _fillers(self, session: AgentSession[Any]) -> Sequence[str]:
+        agent = session.current_agent
+        if isinstance(agent, HandoffAgent) and agent.fillers is not None:
+            return agent.fillers
+        return self.fillers
+
+    def prefetch_fillers(self, tts: CachedTTS, fillers: Sequence[str] | None = None) -> None:
+        """
+        Render filler phrases, the runner's unless given an agent's, into the TTS cache in
+        the background, each once per process.
+        """
+        phrases = [f for f in dict.fromkeys(fillers or self.fillers) if f not in self._prefetched]
+        if not phrases:
+            return
+        self._prefetched.update(phrases)
+        task = asyncio.create_task(self._render_fillers(tts, phrases), name="prefetch_fillers")
+        self._prefetch_tasks.add(task)
+        task.add_done_callback(self._prefetch_tasks.discard)
+
+    async def _render_fillers(self, tts: CachedTTS, fillers: list[str]) -> None:
+        results = await asyncio.gather(
+            *(tts.audio(filler) for filler in fillers), return_exceptions=True
+        )
+        for filler, result in zip(fillers, results, strict=True):
+            if isinstance(result, Exception):
+                logger.warning(f"Could not render filler {filler!r}: {result!r}")
+
+
+def budgeted[**P, T](
+    runner: Callable[[], ToolRunner],
+) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """
+    Run a `@function_tool` through `runner()`, under its budget for the function's name.
+    Apply it below `@function_tool`; the tool must take a `RunContext` for fillers to play.
+    """
+
+    def decorator(fnc: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        @functools.wraps(fnc)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            context = next(
+                (a for a in (*args, *kwargs.values()) if isinstance(a, RunContext)), None
+            )
+            return await runner().run(
+                fnc.__name__,
+                lambda: fnc(*args, **kwargs),
+                session=context.session if context is not None else None,
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,192 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import tempfile
+from collections.abc import Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, TextIO
+
+from livekit.agents import llm
+
+logger = logging.getLogger(__name__)
+
+# Shared by every session on the worker, so a burst of calls ending together queues up
+# behind a couple of threads instead of spawning one per session.
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="transcripts")
+
+_COMPACT = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def encode_chunks(payload: Any, indent: int | None = None) -> Iterator[str]:
+    """
+    Encode `payload` as JSON in small chunks.
+
+    The C encoder behind `json.dumps` holds the GIL for the whole document, so running
+    it in a thread still stalls the event loop on long transcripts. Compact output
+    encodes top-level lists (e.g. the history `items`) one element at a time, and
+    indented output goes through the pure-Python encoder, which yields as it goes.
+    """
+    if indent is not None:
+        yield from json.JSONEncoder(indent=indent, ensure_ascii=False).iterencode(payload)
+        return
+    if not isinstance(payload, dict):
+        yield _COMPACT.encode(payload)
+        return
+    yield "{"
+    for i, (key, value) in enumerate(payload.items()):
+        yield f"{',' if i else ''}{_COMPACT.encode(str(key))}:"
+        if isinstance(value, list):
+            yield "["
+            for j, item in enumerate(value):
+                yield f"{',' if j else ''}{_COMPACT.encode(item)}"
+            yield "]"
+        else:
+            yield _COMPACT.encode(value)
+    yield "}"
+
+
+def write_json_atomic(path: Path, payload: Any, indent: int | None = None) -> None:
+    """Write `payload` to a temp file next to `path`, fsync it, and rename it into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for chunk in encode_chunks(payload, indent):
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+class TranscriptWriter:
+    """
+    Saves session transcripts without blocking the event loop: encoding and disk I/O
+    run in a small thread pool, and files are replaced atomically so a crash mid-write
+    never leaves a truncated transcript behind.
+    """
+
+    def __init__(
+        self, output_dir: Path, *, indent: int | None = None, executor: Executor | None = None
+    ) -> None:
+        self.output_dir = output_dir
+        self.indent = indent
+        self._executor = executor or _executor
+
+    async def write(self, filename: str, payload: dict[str, Any]) -> Path:
+        path = self.output_dir / filename
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, write_json_atomic, path, payload, self.indent)
+        logger.info(f"Transcript saved to {path}")
+        return path
+
+
+def compact_transcript(stream_path: Path, final_path: Path) -> int:
+    """
+    Turn a JSONL transcript stream into the final `{"items": [...]}` file and delete
+    the stream. Items are ordered by `created_at` like `ChatContext`, a re-recorded
+    item id keeps its latest version, and a line truncated by a crash is skipped.
+    Returns the number of items written.
+    """
+    items: dict[str, dict[str, Any]] = {}
+    with open(stream_path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping unreadable line {line_no} in {stream_path}")
+                continue
+            items[item.get("id", f"line-{line_no}")] = item
+    ordered = sorted(items.values(), key=lambda item: item.get("created_at", 0.0))
+    write_json_atomic(final_path, {"items": ordered})
+    stream_path.unlink()
+    return len(ordered)
+
+
+class TranscriptStream:
+    """
+    Append-only JSONL transcript that records conversation items as they are
+    committed, so a worker crash loses at most the last unflushed batch.
+
+    `append` only serializes the item and buffers the line; a background task writes
+    and fsyncs buffered lines every `flush_interval` seconds, or sooner once
+    `max_batch` lines are waiting. `close` flushes what is left and compacts the
+    stream into the final JSON transcript.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        flush_interval: float = 1.0,
+        max_batch: int = 32,
+        executor: Executor | None = None,
+    ) -> None:
+        self.path = path
+        self._flush_interval = flush_interval
+        self._max_batch = max_batch
+        self._executor = executor or _executor
+        self._pending: list[str] = []
+        self._wakeup = asyncio.Event()
+        self._flusher: asyncio.Task[None] | None = None
+        self._file: TextIO | None = None
+        self._closed = False
+
+    def append(self, item: llm.ChatItem) -> None:
+        if self._closed:
+            logger.warning(f"Dropping item {item.id}, transcript {self.path} is closed")
+            return
+        record = item.model_dump(mode="json", exclude_none=True)
+        self._pending.append(_COMPACT.encode(record) + "\n")
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+        if len(self._pending) >= self._max_batch:
+            self._wakeup.set()
+
+    async def close(self, final_path: Path | None = None) -> Path | None:
+        """
+        Flush and close the stream, then compact it into `final_path` (defaults to
+        the stream path with a `.json` suffix). Returns `None` if nothing was recorded.
+        """
+        self._closed = True
+        self._wakeup.set()
+        if self._flusher is not None:
+            await self._flusher
+        await self._flush()
+        if self._file is None:
+            return None
+        final_path = final_path or self.path.with_suffix(".json")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._file.close)
+        count = await loop.run_in_executor(
+            self._executor, compact_transcript, self.path, final_path
+        )
+        logger.info(f"Transcript saved to {final_path} ({count} items)")
+        return final_path
+
+    async def _flush_periodically(self) -> None:
+        while not self._closed:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self._flush_interval)
+            self._wakeup.clear()
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        lines, self._pending = self._pending, []
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._write_lines, lines)
+
+    def _write_lines(self, lines: list[str]) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")  # noqa: SIM115
+        self._file.writelines(lines)
+        self._file.flush()
+        os.fsync(self._file.fileno())
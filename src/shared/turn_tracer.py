@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import statistics
+from pathlib import Path
+from typing import Any
+
+from attrs import define, field
+from livekit.agents import AgentSession, metrics
+from livekit.agents.voice import (
+    AgentStateChangedEvent,
+    MetricsCollectedEvent,
+    SpeechCreatedEvent,
+    SpeechHandle,
+)
+from opentelemetry import trace
+
+from shared.transcripts import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer(__name__)
+
+# Pipeline stages in the order they happen within a turn.
+MILESTONES = (
+    "end_of_speech",
+    "transcript_final",
+    "turn_decided",
+    "llm_started",
+    "llm_first_token",
+    "tts_first_byte",
+    "playout_started",
+)
+
+
+@define
+class TurnTrace:
+    """Wall-clock times (`time.time()`) of each pipeline stage of one agent reply."""
+
+    speech_id: str
+    source: str = "user_turn"
+    times: dict[str, float] = field(factory=dict)
+
+    def mark(self, milestone: str, at: float, *, earliest: bool = False) -> None:
+        if earliest and milestone in self.times:
+            at = min(at, self.times[milestone])
+        self.times[milestone] = at
+
+    @property
+    def origin(self) -> float | None:
+        """End of user speech, or the earliest stage for replies not caused by speech."""
+        return self.times.get("end_of_speech", min(self.times.values(), default=None))
+
+    @property
+    def latency(self) -> float | None:
+        """End of user speech to first agent audio, the number we tune for."""
+        if "end_of_speech" in self.times and "playout_started" in self.times:
+            return self.times["playout_started"] - self.times["end_of_speech"]
+        return None
+
+    def offsets(self) -> dict[str, float]:
+        """Milliseconds from `origin` to each recorded stage."""
+        origin = self.origin
+        if origin is None:
+            return {}
+        return {
+            name: round((self.times[name] - origin) * 1000, 1)
+            for name in MILESTONES
+            if name in self.times
+        }
+
+
+class TurnTracer:
+    """
+    Stitches the per-component metrics of an `AgentSession` into one trace per turn.
+
+    Turns are keyed by the speech id shared by `speech_created`, EOU, LLM and TTS
+    metrics. Playout has no speech id, so the agent entering the `speaking` state is
+    credited to the oldest reply that hasn't played yet and hasn't been interrupted.
+    """
+
+    def __init__(self) -> None:
+        self.turns: dict[str, TurnTrace] = {}
+        self._handles: dict[str, SpeechHandle] = {}
+
+    def attach(self, session: AgentSession[Any]) -> None:
+        session.on("speech_created", self.on_speech_created)
+        session.on("metrics_collected", self.on_metrics_collected)
+        session.on("agent_state_changed", self.on_agent_state_changed)
+
+    def _turn(self, speech_id: str) -> TurnTrace:
+        if speech_id not in self.turns:
+            self.turns[speech_id] = TurnTrace(speech_id)
+        return self.turns[speech_id]
+
+    def on_speech_created(self, ev: SpeechCreatedEvent) -> None:
+        turn = self._turn(ev.speech_handle.id)
+        if ev.user_initiated or ev.source != "generate_reply":
+            turn.source = ev.source
+        self._handles[turn.speech_id] = ev.speech_handle
+
+    def on_metrics_collected(self, ev: MetricsCollectedEvent) -> None:
+        m = ev.metrics
+        speech_id = getattr(m, "speech_id", None)
+        if speech_id is None:
+            return
+        turn = self._turn(speech_id)
+        match m:
+            case metrics.EOUMetrics() if m.last_speaking_time:
+                turn.mark("end_of_speech", m.last_speaking_time)
+                turn.mark("transcript_final", m.last_speaking_time + m.transcription_delay)
+                turn.mark("turn_decided", m.last_speaking_time + m.end_of_utterance_delay)
+            case metrics.LLMMetrics() | metrics.RealtimeModelMetrics():
+                # Metrics are emitted once the request completes, so rebuild its timeline.
+                started = m.timestamp - m.duration
+                turn.mark("llm_started", started, earliest=True)
+                if m.ttft >= 0:
+                    turn.mark("llm_first_token", started + m.ttft, earliest=True)
+            case metrics.TTSMetrics() if m.ttfb >= 0:
+                turn.mark("tts_first_byte", m.timestamp - m.duration + m.ttfb, earliest=True)
+            case _:
+                pass
+
+    def on_agent_state_changed(self, ev: AgentStateChangedEvent) -> None:
+        if ev.new_state != "speaking":
+            return
+        for turn in self.turns.values():
+            handle = self._handles.get(turn.speech_id)
+            if handle is not None and (handle.interrupted or handle.done()):
+                continue
+            if "playout_started" not in turn.times:
+                turn.mark("playout_started", ev.created_at)
+                return
+
+    def export_spans(self) -> None:
+        """Emit one `voice_turn` span per turn, with an event per pipeline stage."""
+        for turn in self.turns.values():
+            origin = turn.origin
+            if origin is None:
+                continue
+            end = max(turn.times.values())
+            span = tracer.start_span(
+                "voice_turn",
+                start_time=int(origin * 1e9),
+                attributes={"lk.speech_id": turn.speech_id, "voice.source": turn.source},
+            )
+            for name in MILESTONES:
+                if name in turn.times:
+                    span.add_event(name, timestamp=int(turn.times[name] * 1e9))
+            if (latency := turn.latency) is not None:
+                span.set_attribute("voice.turn_latency_ms", round(latency * 1000, 1))
+            span.end(end_time=int(end * 1e9))
+
+    def waterfall(self) -> dict[str, Any]:
+        turns = [turn for turn in self.turns.values() if turn.times]
+        turns.sort(key=lambda turn: turn.origin or 0.0)
+        latencies = [latency * 1000 for t in turns if (latency := t.latency) is not None]
+        summary: dict[str, float] = {}
+        if latencies:
+            summary = {
+                "turns": len(latencies),
+                "p50_ms": round(statistics.median(latencies), 1),
+                "max_ms": round(max(latencies), 1),
+            }
+            if len(latencies) >= 2:
+                summary["p95_ms"] = round(statistics.quantiles(latencies, n=20)[-1], 1)
+        return {
+            "summary": summary,
+            "turns": [
+                {
+                    "speech_id": turn.speech_id,
+                    "source": turn.source,
+                    "latency_ms": round(latency * 1000, 1)
+                    if (latency := turn.latency) is not None
+                    else None,
+                    "offsets_ms": turn.offsets(),
+                }
+                for turn in turns
+            ],
+        }
+
+    async def write(self, path: Path) -> Path | None:
+        """Export the spans and write the waterfall to `path`, off the event loop."""
+        if not self.turns:
+            return None
+        self.export_spans()
+        waterfall = self.waterfall()
+        await asyncio.to_thread(write_json_atomic, path, waterfall, 2)
+        logger.info(f"Turn latency {waterfall['summary']}, waterfall saved to {path}")
+        return path
@@ -0,0 +1,270 @@
+import asyncio
+import logging
+import os
+from functools import lru_cache
+from typing import Protocol
+
+import prometheus_client
+from livekit import rtc
+from livekit.agents import metrics
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import MetricReader, PeriodicExportingMetricReader
+from opentelemetry.sdk.metrics.view import ExplicitBucketHistogramAggregation, View
+from opentelemetry.sdk.resources import Resource
+from prometheus_client import multiprocess
+
+from shared.cached_tts import TTSCacheLookup
+from shared.loop_watchdog import LoopWatchdog
+from shared.speculation import Speculation
+from shared.tool_runner import ToolExecution
+from utils.environment import Config, get_config
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+LABELS = ("agent", "trunk")
+
+HISTOGRAMS = {
+    "llm_ttft_seconds": "Time from LLM request to first token",
+    "tts_ttfb_seconds": "Time from TTS request to first audio byte",
+    "stt_duration_seconds": "Duration of non-streaming STT requests",
+    "stt_transcription_delay_seconds": "Time from end of speech to final transcript",
+    "eou_delay_seconds": "Time from end of speech to end-of-turn decision",
+    "llm_speculation_saved_seconds": "Reply latency saved by a speculative LLM request",
+    "tool_duration_seconds": "Function tool execution time",
+    "event_loop_stall_seconds": "Time a job's event loop spent in one blocking callback",
+    "event_loop_lag_max_seconds": "Highest event-loop lag of a call",
+}
+COUNTERS = {
+    "llm_prompt_tokens": "LLM prompt tokens",
+    "llm_prompt_cached_tokens": "LLM prompt tokens served from the provider cache",
+    "llm_completion_tokens": "LLM completion tokens",
+    "tts_characters": "Characters sent to TTS",
+    "stt_audio_seconds": "Seconds of audio sent to STT",
+    "tts_cache_hits": "Utterances spoken from the TTS cache",
+    "tts_cache_misses": "Utterances sent to the TTS provider",
+    "tts_cache_bytes_saved": "Bytes of audio served from the TTS cache",
+    "llm_speculations_used": "Speculative LLM replies kept for the committed turn",
+    "llm_speculations_wasted": "Speculative LLM replies discarded",
+    "llm_speculation_wasted_tokens": "Prompt and completion tokens of discarded speculative replies",
+    "tool_timeouts": "Function tool calls abandoned at their hard deadline",
+    "tool_fillers": "Filler phrases spoken while a function tool ran past its soft deadline",
+    "event_loop_stalls": "Callbacks that blocked a job's event loop past the stall threshold",
+}
+# metrics broken down further than LABELS
+EXTRA_LABELS = {
+    "tool_duration_seconds": ("tool",),
+    "tool_timeouts": ("tool",),
+    "tool_fillers": ("tool",),
+}
+
+
+class MetricsBackend(Protocol):
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None: ...
+
+    def add(self, name: str, value: float, labels: dict[str, str]) -> None: ...
+
+    def flush(self) -> None: ...
+
+
+class PrometheusBackend:
+    """
+    Records into `prometheus_client` histograms and counters. Jobs run in their own
+    processes, so set `PROMETHEUS_MULTIPROC_DIR` for the worker's endpoint to see them.
+    """
+
+    def __init__(self, registry: prometheus_client.CollectorRegistry | None = None) -> None:
+        registry = registry or prometheus_client.REGISTRY
+        self._histograms = {
+            name: prometheus_client.Histogram(
+                f"voice_{name}",
+                doc,
+                LABELS + EXTRA_LABELS.get(name, ()),
+                buckets=LATENCY_BUCKETS,
+                registry=registry,
+            )
+            for name, doc in HISTOGRAMS.items()
+        }
+        self._counters = {
+            name: prometheus_client.Counter(
+                f"voice_{name}", doc, LABELS + EXTRA_LABELS.get(name, ()), registry=registry
+            )
+            for name, doc in COUNTERS.items()
+        }
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        self._histograms[name].labels(**labels).observe(value)
+
+    def add(self, name: str, value: float, labels: dict[str, str]) -> None:
+        self._counters[name].labels(**labels).inc(value)
+
+    def flush(self) -> None:
+        pass
+
+
+class OtlpBackend:
+    """
+    Records into OpenTelemetry instruments and pushes them over OTLP/HTTP (configured
+    with the standard `OTEL_EXPORTER_OTLP_*` variables), so every job process reports
+    on its own and no shared endpoint is needed.
+    """
+
+    def __init__(self, reader: MetricReader | None = None, export_interval: float = 15.0) -> None:
+        if reader is None:
+            from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+
+            reader = PeriodicExportingMetricReader(
+                OTLPMetricExporter(), export_interval_millis=export_interval * 1000
+            )
+        self._provider = MeterProvider(
+            metric_readers=[reader],
+            resource=Resource.create({"service.name": "livekit-outbound-calls"}),
+            views=[
+                View(
+                    instrument_name="voice_*_seconds",
+                    aggregation=ExplicitBucketHistogramAggregation(LATENCY_BUCKETS),
+                )
+            ],
+        )
+        meter = self._provider.get_meter(__name__)
+        self._histograms = {
+            name: meter.create_histogram(f"voice_{name}", unit="s", description=doc)
+            for name, doc in HISTOGRAMS.items()
+        }
+        self._counters = {
+            name: meter.create_counter(f"voice_{name}", description=doc)
+            for name, doc in COUNTERS.items()
+        }
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        self._histograms[name].record(value, labels)
+
+    def add(self, name: str, value: float, labels: dict[str, str]) -> None:
+        self._counters[name].add(value, labels)
+
+    def flush(self) -> None:
+        self._provider.force_flush()
+
+
+class VoiceMetrics:
+    """
+    Turns the `metrics_collected` events of one session into histogram observations and
+    usage counters labelled with the agent and the SIP trunk carrying the call.
+    """
+
+    def __init__(self, backend: MetricsBackend | None, *, agent: str, trunk: str = "unknown"):
+        self._backend = backend
+        self.labels = {"agent": agent, "trunk": trunk}
+
+    def set_trunk(self, participant: rtc.RemoteParticipant) -> None:
+        """Label the call with the SIP trunk of `participant`, if it's the SIP leg."""
+        if trunk_id := participant.attributes.get("sip.trunkID"):
+            self.labels["trunk"] = trunk_id
+
+    def collect(self, ev: metrics.AgentMetrics) -> None:
+        match ev:
+            case metrics.LLMMetrics():
+                if not ev.cancelled and ev.ttft >= 0:
+                    self._observe("llm_ttft_seconds", ev.ttft)
+                self._add("llm_prompt_tokens", ev.prompt_tokens)
+                self._add("llm_prompt_cached_tokens", ev.prompt_cached_tokens)
+                self._add("llm_completion_tokens", ev.completion_tokens)
+            case metrics.RealtimeModelMetrics():
+                if not ev.cancelled and ev.ttft >= 0:
+                    self._observe("llm_ttft_seconds", ev.ttft)
+                self._add("llm_prompt_tokens", ev.input_tokens)
+                self._add("llm_prompt_cached_tokens", ev.input_token_details.cached_tokens)
+                self._add("llm_completion_tokens", ev.output_tokens)
+            case metrics.TTSMetrics():
+                if not ev.cancelled and ev.ttfb >= 0:
+                    self._observe("tts_ttfb_seconds", ev.ttfb)
+                self._add("tts_characters", ev.characters_count)
+            case metrics.STTMetrics():
+                # Streaming STT reports no per-request latency; its delay shows up in EOU.
+                if not ev.streamed:
+                    self._observe("stt_duration_seconds", ev.duration)
+                self._add("stt_audio_seconds", ev.audio_duration)
+            case metrics.EOUMetrics():
+                self._observe("eou_delay_seconds", ev.end_of_utterance_delay)
+                self._observe("stt_transcription_delay_seconds", ev.transcription_delay)
+            case _:
+                pass
+
+    def collect_tts_cache(self, ev: TTSCacheLookup) -> None:
+        self._add("tts_cache_hits" if ev.hit else "tts_cache_misses", 1)
+        self._add("tts_cache_bytes_saved", ev.audio_bytes)
+
+    def collect_speculation(self, speculation: Speculation) -> None:
+        if speculation.wasted:
+            self._add("llm_speculations_wasted", 1)
+            self._add("llm_speculation_wasted_tokens", speculation.tokens)
+        elif speculation.lead_time is not None:
+            self._add("llm_speculations_used", 1)
+            self._observe("llm_speculation_saved_seconds", speculation.saved)
+
+    def collect_tool(self, ev: ToolExecution) -> None:
+        labels = {"tool": ev.name}
+        self._observe("tool_duration_seconds", ev.duration, labels)
+        self._add("tool_timeouts", ev.timed_out, labels)
+        self._add("tool_fillers", ev.filler, labels)
+
+    def collect_loop(self, watchdog: LoopWatchdog) -> None:
+        """Once per call, when it's over."""
+        for stall in watchdog.stalls:
+            self._observe("event_loop_stall_seconds", stall.duration)
+        self._add("event_loop_stalls", watchdog.stall_count)
+        self._observe("event_loop_lag_max_seconds", watchdog.max_lag)
+
+    async def flush(self) -> None:
+        """Push pending data (OTLP) before the job process exits."""
+        if self._backend is not None:
+            await asyncio.to_thread(self._backend.flush)
+
+    def _observe(self, name: str, value: float, extra: dict[str, str] | None = None) -> None:
+        if self._backend is not None:
+            self._backend.observe(name, value, self.labels | (extra or {}))
+
+    def _add(self, name: str, value: float, extra: dict[str, str] | None = None) -> None:
+        if self._backend is not None and value:
+            self._backend.add(name, value, self.labels | (extra or {}))
+
+
+@lru_cache(maxsize=1)
+def metrics_backend(config: Config | None = None) -> MetricsBackend | None:
+    """The process-wide backend selected by `METRICS_EXPORTER` (prometheus, otlp or none)."""
+    config = config or get_config()
+    match config.metrics_exporter:
+        case "prometheus":
+            return PrometheusBackend()
+        case "otlp":
+            return OtlpBackend()
+        case "none":
+            return None
+        case other:
+            raise ValueError(
+                f"Unknown METRICS_EXPORTER {other!r}, expected prometheus, otlp or none"
+            )
+
+
+def start_metrics_server(config: Config | None = None) -> None:
+    """
+    Serve `/metrics` on `METRICS_PORT` from the worker's main process. With
+    `PROMETHEUS_MULTIPROC_DIR` set, it aggregates the metrics of every job process.
+    """
+    config = config or get_config()
+    if config.metrics_exporter != "prometheus" or not config.metrics_port:
+        return
+    registry = prometheus_client.REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        logger.warning(
+            "PROMETHEUS_MULTIPROC_DIR is not set, metrics from job processes won't be exported"
+        )
+    try:
+        prometheus_client.start_http_server(config.metrics_port, registry=registry)
+    except OSError as e:
+        logger.warning(f"Could not start metrics server on port {config.metrics_port}: {e}")
+        return
+    logger.info(f"Serving metrics on :{config.metrics_port}/metrics")
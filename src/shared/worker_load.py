@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+
+from livekit.agents import JobRequest, Worker
+from livekit.agents.utils.hw import get_cpu_monitor
+
+from utils.environment import Config, get_config
+
+logger = logging.getLogger(__name__)
+
+
+def _cpu_sampler() -> Callable[[], float]:
+    monitor = get_cpu_monitor()
+    # blocks for the interval, `load` runs in the worker's executor
+    return lambda: monitor.cpu_percent(interval=0.5)
+
+
+class WorkerLoad:
+    """
+    `load_fnc` and `request_fnc` for `WorkerOptions`, so a worker stops taking calls
+    before VAD, turn detection and noise cancellation run out of CPU, instead of when
+    the default CPU average says it's full.
+
+    The load is the highest of the CPU use, the CPU it would reach with one more call
+    (the CPU per active call, learned while calls run), and the worker's event-loop lag
+    against `max_lag`. Job processes share the machine's cores, so when they saturate
+    them the worker's loop falls behind too. Calls accepted in the last `ramp_up`
+    seconds, which haven't started using CPU yet, count as running, so a campaign
+    starting at once doesn't land on the first worker that looks idle.
+
+    A dispatch is rejected when one more call would take the load over `threshold`, and
+    LiveKit offers it to another worker; at `threshold` the worker reports itself full.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.75,
+        max_lag: float = 0.1,
+        ramp_up: float = 10.0,
+        session_cpu: float = 0.05,
+        cpu: Callable[[], float] | None = None,
+    ) -> None:
+        self.threshold = threshold
+        self.max_lag = max_lag
+        self.ramp_up = ramp_up
+        # CPU share of one call, until there are calls to measure it
+        self.session_cpu = session_cpu
+        self.cpu = 0.0
+        self.lag = 0.0
+        self.sessions = 0
+        self.accepted = 0
+        self.rejected = 0
+        self._sample_cpu = cpu or _cpu_sampler()
+        self._lags: deque[float] = deque(maxlen=20)
+        self._recent: deque[float] = deque()
+        self._lag_task: asyncio.Task[None] | None = None
+
+    def load(self, worker: Worker) -> float:
+        """Called by the worker every few seconds, in a thread."""
+        cpu = self._sample_cpu()
+        # smooth over the last few samples, like the default load
+        self.cpu = cpu if not self.cpu else 0.6 * self.cpu + 0.4 * cpu
+        self.sessions = len(worker.active_jobs)
+        if self.sessions:
+            self.session_cpu = 0.8 * self.session_cpu + 0.2 * self.cpu / self.sessions
+        return self.current_load()
+
+    def current_load(self, extra_sessions: int = 0) -> float:
+        # `load` runs in another thread than `request` and the lag sampler, which append
+        self.lag = max(tuple(self._lags), default=0.0)
+        since = time.monotonic() - self.ramp_up
+        pending = sum(1 for t in tuple(self._recent) if t > since)
+        cpu = self.cpu + self.session_cpu * (pending + extra_sessions)
+        return min(1.0, max(cpu, self.lag / self.max_lag))
+
+    async def request(self, job: JobRequest) -> None:
+        self._watch_lag()
+        now = time.monotonic()
+        while self._recent and self._recent[0] <= now - self.ramp_up:
+            self._recent.popleft()
+
+        load = self.current_load(extra_sessions=1)
+        if load > self.threshold:
+            self.rejected += 1
+            logger.info(
+                f"Rejecting job {job.id}: load would be {load:.2f} (cpu {self.cpu:.2f}, "
+                f"lag {self.lag * 1000:.0f} ms, {self.sessions} calls), over {self.threshold}"
+            )
+            await job.reject()
+            return
+        self.accepted += 1
+        self._recent.append(now)
+        await job.accept()
+
+    def _watch_lag(self) -> None:
+        # request_fnc is the first code of ours to run on the worker's loop
+        if self._lag_task is None:
+            self._lag_task = asyncio.create_task(self._sample_lag(), name="worker_loop_lag")
+
+    async def _sample_lag(self, interval: float = 0.25) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            self._lags.append(max(0.0, time.perf_counter() - started - interval))
+
+
+def worker_load_from_config(config: Config | None = None) -> WorkerLoad:
+    config = config or get_config()
+    return WorkerLoad(threshold=config.worker_load_threshold, max_lag=config.worker_max_loop_lag)
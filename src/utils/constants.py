@@ -1,8 +1,9 @@
 from pathlib import Path
 
-(output_dir := Path(__file__).parent.parent.parent / "output").mkdir(parents=True, exist_ok=True)
+output_dir = Path(__file__).parent.parent.parent / "output"
 
 
 def get_output_path(filename: str) -> Path:
-    """Get the output path for a given filename."""
+    """Get the output path for a given filename, creating the output directory on first use."""
+    output_dir.mkdir(parents=True, exist_ok=True)
     return output_dir / filename
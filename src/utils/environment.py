@@ -64,6 +64,129 @@ class Config:
     phone_number: str = attrs.field(
         factory=lambda: os.getenv("PHONE_NUMBER", ""), metadata={"required": True}
     )
+    sip_outbound_trunks: str = attrs.field(
+        factory=lambda: os.getenv("SIP_OUTBOUND_TRUNKS", ""), metadata={"required": False}
+    )
+    sip_trunk_strategy: str = attrs.field(
+        factory=lambda: os.getenv("SIP_TRUNK_STRATEGY", "least_loaded"),
+        metadata={"required": False},
+    )
+
+    # Outbound campaigns
+    campaign_concurrency: int = attrs.field(
+        factory=lambda: int(os.getenv("CAMPAIGN_CONCURRENCY", "20")), metadata={"required": False}
+    )
+    campaign_calls_per_second: float = attrs.field(
+        factory=lambda: float(os.getenv("CAMPAIGN_CALLS_PER_SECOND", "5")),
+        metadata={"required": False},
+    )
+    dial_overlap: bool = attrs.field(
+        factory=lambda: os.getenv("DIAL_OVERLAP", "true").lower() == "true",
+        metadata={"required": False},
+    )
+    dial_debug_sample_rate: float = attrs.field(
+        factory=lambda: float(os.getenv("DIAL_DEBUG_SAMPLE_RATE", "0")),
+        metadata={"required": False},
+    )
+    dial_max_attempts: int = attrs.field(
+        factory=lambda: int(os.getenv("DIAL_MAX_ATTEMPTS", "5")), metadata={"required": False}
+    )
+    dial_retry_base_delay: float = attrs.field(
+        factory=lambda: float(os.getenv("DIAL_RETRY_BASE_DELAY", "2")),
+        metadata={"required": False},
+    )
+    dial_retry_max_delay: float = attrs.field(
+        factory=lambda: float(os.getenv("DIAL_RETRY_MAX_DELAY", "60")),
+        metadata={"required": False},
+    )
+
+    # Transcripts
+    transcript_storage: str = attrs.field(
+        factory=lambda: os.getenv("TRANSCRIPT_STORAGE", "local"), metadata={"required": False}
+    )
+    transcript_dir: str = attrs.field(
+        factory=lambda: os.getenv("TRANSCRIPT_DIR", ""), metadata={"required": False}
+    )
+    transcript_keep_days: int = attrs.field(
+        factory=lambda: int(os.getenv("TRANSCRIPT_KEEP_DAYS", "0")), metadata={"required": False}
+    )
+    transcript_s3_bucket: str = attrs.field(
+        factory=lambda: os.getenv("TRANSCRIPT_S3_BUCKET", ""), metadata={"required": False}
+    )
+    transcript_s3_endpoint: str = attrs.field(
+        factory=lambda: os.getenv("TRANSCRIPT_S3_ENDPOINT", "https://s3.amazonaws.com"),
+        metadata={"required": False},
+    )
+    transcript_s3_region: str = attrs.field(
+        factory=lambda: os.getenv("TRANSCRIPT_S3_REGION", "us-east-1"),
+        metadata={"required": False},
+    )
+    transcript_s3_prefix: str = attrs.field(
+        factory=lambda: os.getenv("TRANSCRIPT_S3_PREFIX", "transcripts/"),
+        metadata={"required": False},
+    )
+    transcript_s3_access_key: str = attrs.field(
+        factory=lambda: os.getenv("AWS_ACCESS_KEY_ID", ""), metadata={"required": False}
+    )
+    transcript_s3_secret_key: str = attrs.field(
+        factory=lambda: os.getenv("AWS_SECRET_ACCESS_KEY", ""), metadata={"required": False}
+    )
+    transcript_upload_batch: int = attrs.field(
+        factory=lambda: int(os.getenv("TRANSCRIPT_UPLOAD_BATCH", "20")),
+        metadata={"required": False},
+    )
+    transcript_upload_max_age: float = attrs.field(
+        factory=lambda: float(os.getenv("TRANSCRIPT_UPLOAD_MAX_AGE", "300")),
+        metadata={"required": False},
+    )
+
+    # Metrics
+    metrics_exporter: str = attrs.field(
+        factory=lambda: os.getenv("METRICS_EXPORTER", "prometheus"), metadata={"required": False}
+    )
+    metrics_port: int = attrs.field(
+        factory=lambda: int(os.getenv("METRICS_PORT", "0")), metadata={"required": False}
+    )
+
+    # Greeting and TTS audio cache
+    greeting_mode: str = attrs.field(
+        factory=lambda: os.getenv("GREETING_MODE", "generate"), metadata={"required": False}
+    )
+    audio_cache_dir: str = attrs.field(
+        factory=lambda: os.getenv("AUDIO_CACHE_DIR", ""), metadata={"required": False}
+    )
+    audio_cache_memory_mb: int = attrs.field(
+        factory=lambda: int(os.getenv("AUDIO_CACHE_MEMORY_MB", "32")), metadata={"required": False}
+    )
+    audio_cache_disk_mb: int = attrs.field(
+        factory=lambda: int(os.getenv("AUDIO_CACHE_DISK_MB", "512")), metadata={"required": False}
+    )
+    tts_cache_max_chars: int = attrs.field(
+        factory=lambda: int(os.getenv("TTS_CACHE_MAX_CHARS", "120")), metadata={"required": False}
+    )
+    preemptive_generation: bool = attrs.field(
+        factory=lambda: os.getenv("PREEMPTIVE_GENERATION", "false").lower() == "true",
+        metadata={"required": False},
+    )
+    preemptive_max_wasted: int = attrs.field(
+        factory=lambda: int(os.getenv("PREEMPTIVE_MAX_WASTED", "10")), metadata={"required": False}
+    )
+
+    # Worker admission: the load (0-1) above which calls go to other workers, and the
+    # event-loop lag that counts as full load
+    worker_load_threshold: float = attrs.field(
+        factory=lambda: float(os.getenv("WORKER_LOAD_THRESHOLD", "0.75")),
+        metadata={"required": False},
+    )
+    worker_max_loop_lag: float = attrs.field(
+        factory=lambda: float(os.getenv("WORKER_MAX_LOOP_LAG", "0.1")),
+        metadata={"required": False},
+    )
+    # seconds a job's event loop may run one callback before its stack is reported
+    loop_stall_threshold: float = attrs.field(
+        factory=lambda: float(os.getenv("LOOP_STALL_THRESHOLD", "0.1")),
+        metadata={"required": False},
+    )
 
     # MCP Server
     mcp_server_url:str = attrs.field(
@@ -75,6 +198,38 @@ class Config:
     mcp_server_token:str = attrs.field(
         factory=lambda: os.getenv("MCP_TOKEN", ""), metadata={"required": True}
     )
+    mcp_tools_ttl: float = attrs.field(
+        factory=lambda: float(os.getenv("MCP_TOOLS_TTL", "300")), metadata={"required": False}
+    )
+    mcp_cached_tools: str = attrs.field(
+        factory=lambda: os.getenv("MCP_CACHED_TOOLS", ""), metadata={"required": False}
+    )
+
+    # Conversation context sent to the LLM
+    context_window_turns: int = attrs.field(
+        factory=lambda: int(os.getenv("CONTEXT_WINDOW_TURNS", "6")), metadata={"required": False}
+    )
+    context_max_tokens: int = attrs.field(
+        factory=lambda: int(os.getenv("CONTEXT_MAX_TOKENS", "3000")), metadata={"required": False}
+    )
+    context_summary: bool = attrs.field(
+        factory=lambda: os.getenv("CONTEXT_SUMMARY", "true").lower() == "true",
+        metadata={"required": False},
+    )
+
+    # Function tool budgets
+    tool_soft_deadline: float = attrs.field(
+        factory=lambda: float(os.getenv("TOOL_SOFT_DEADLINE", "1.5")), metadata={"required": False}
+    )
+    tool_hard_deadline: float = attrs.field(
+        factory=lambda: float(os.getenv("TOOL_HARD_DEADLINE", "10")), metadata={"required": False}
+    )
+    tool_budgets: str = attrs.field(
+        factory=lambda: os.getenv("TOOL_BUDGETS", ""), metadata={"required": False}
+    )
+    tool_max_concurrency: int = attrs.field(
+        factory=lambda: int(os.getenv("TOOL_MAX_CONCURRENCY", "4")), metadata={"required": False}
+    )
 
     # Typesense - Search
     typesense_url: str = attrs.field(
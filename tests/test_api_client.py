@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from calls.api_client import TokenCache
+
+
+def test_token_cache_reuses_until_refresh() -> None:
+    now = 0.0
+    signed: list[str] = []
+
+    def auth_header(grants: str) -> dict[str, str]:
+        signed.append(grants)
+        return {"authorization": f"Bearer {grants}-{len(signed)}"}
+
+    cache = TokenCache(
+        ttl=timedelta(minutes=30), refresh_margin=timedelta(minutes=10), clock=lambda: now
+    )
+    cached = cache.wrap(auth_header)
+
+    first = cached("sip-call")
+    first["Content-Type"] = "application/protobuf"
+    assert cached("sip-call") == {"authorization": "Bearer sip-call-1"}
+    assert cached("room-a") == {"authorization": "Bearer room-a-2"}
+    assert signed == ["sip-call", "room-a"]
+
+    now = 20 * 60 + 1
+    assert cached("sip-call") == {"authorization": "Bearer sip-call-3"}
+    assert (cache.hits, cache.misses) == (1, 3)
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import pytest
+from livekit import api
+
+from calls.call_queue import Backoff, CallQueue, CallStatus, run_durable_campaign
+from calls.models import CampaignRow, DialResult
+
+
+def _rows(count: int) -> list[CampaignRow]:
+    return [CampaignRow(phone_number=f"+1555{i:04}", row_index=i) for i in range(count)]
+
+
+def test_enqueue_is_idempotent_and_survives_restart(tmp_path: Path) -> None:
+    now = 100.0
+    path = tmp_path / "calls.sqlite"
+    queue = CallQueue(path, room_name_prefix="survey-", clock=lambda: now)
+    assert queue.enqueue(_rows(3)) == 3
+    assert queue.enqueue(_rows(4)) == 1
+
+    first = queue.claim()
+    assert first is not None
+    assert first.attempt == 1
+    queue.mark_retry(first.idempotency_key, "busy", delay=30)
+    second = queue.claim()
+    assert second is not None
+    assert second.row_index == 1
+    queue.close()
+
+    # The process died while row 1 was dialing: it may have been placed, so it's never
+    # claimed again.
+    queue = CallQueue(path, room_name_prefix="survey-", clock=lambda: now)
+    assert queue.recover() == 1
+    assert queue.counts() == {CallStatus.pending: 3, CallStatus.uncertain: 1}
+
+    assert [queue.claim().row_index for _ in range(2)] == [2, 3]  # pyright: ignore[reportOptionalMemberAccess]
+    assert queue.claim() is None
+    now += 31
+    retried = queue.claim()
+    assert retried is not None
+    assert (retried.row_index, retried.attempt) == (0, 2)
+
+
+@pytest.mark.asyncio
+async def test_durable_campaign_retries_transient_failures(tmp_path: Path) -> None:
+    queue = CallQueue(tmp_path / "calls.sqlite", room_name_prefix="survey-")
+    queue.enqueue(_rows(3))
+    attempts: dict[int, int] = {}
+
+    async def dial(row: CampaignRow) -> DialResult:
+        attempts[row.row_index] = row.attempt
+        if row.row_index == 1 and row.attempt < 3:
+            raise api.TwirpError("resource_exhausted", "too many calls", status=429)
+        if row.row_index == 2:
+            raise api.TwirpError("invalid_argument", "bad number", status=400)
+        assert row.room_name is not None
+        return DialResult(row.room_name, "AD_1", "PA_1")
+
+    results = [
+        r
+        async for r in run_durable_campaign(
+            queue, dial, concurrency=2, backoff=Backoff(base_delay=0.01, max_attempts=5)
+        )
+    ]
+
+    assert attempts == {0: 1, 1: 3, 2: 1}
+    assert len(results) == 5
+    assert queue.counts() == {CallStatus.done: 2, CallStatus.failed: 1}
@@ -0,0 +1,60 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from calls.campaign import read_campaign, run_campaign
+from calls.models import CampaignRow, DialResult
+
+
+def test_read_campaign_csv_and_jsonl(tmp_path: Path) -> None:
+    csv_path = tmp_path / "numbers.csv"
+    csv_path.write_text("phone_number,user_name\n+15550001,Ana\n,Missing\n+15550002,Luis\n")
+    rows = list(read_campaign(csv_path))
+    assert [r.phone_number for r in rows] == ["+15550001", "+15550002"]
+    assert rows[1].metadata == {"user_name": "Luis"}
+    assert rows[1].row_index == 2
+
+    jsonl_path = tmp_path / "numbers.jsonl"
+    jsonl_path.write_text('{"phone_number": "+15550003", "age": 41}\n\n')
+    (row,) = read_campaign(jsonl_path)
+    assert row.metadata == {"age": 41}
+
+
+@pytest.mark.asyncio
+async def test_run_campaign_caps_concurrency_and_records_errors() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def dial(row: CampaignRow) -> DialResult:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if row.row_index == 3:
+            raise RuntimeError("trunk busy")
+        return DialResult(f"room-{row.row_index}", f"AD_{row.row_index}", f"PA_{row.row_index}")
+
+    rows = [CampaignRow(phone_number=f"+1555{i:04}", row_index=i) for i in range(20)]
+    results = [r async for r in run_campaign(rows, dial, concurrency=4)]
+
+    assert peak == 4
+    assert sorted(r.row_index for r in results) == list(range(20))
+    failed = [r for r in results if r.error]
+    assert len(failed) == 1
+    assert failed[0].row_index == 3
+    assert failed[0].error == "RuntimeError: trunk busy"
+    assert all(r.latency > 0 for r in results)
+
+
+@pytest.mark.asyncio
+async def test_run_campaign_surfaces_bad_file(tmp_path: Path) -> None:
+    path = tmp_path / "numbers.csv"
+    path.write_text("name\nAna\n")
+
+    async def dial(row: CampaignRow) -> DialResult:
+        raise AssertionError("should not dial")
+
+    with pytest.raises(ValueError):
+        _ = [r async for r in run_campaign(read_campaign(path), dial, concurrency=2)]
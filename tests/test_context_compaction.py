@@ -0,0 +1,132 @@
+from typing import Any, Never
+
+import pytest
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions, NotGivenOr, llm
+from livekit.agents.types import NOT_GIVEN
+
+from shared.context_compaction import ContextCompactor, estimate_tokens
+
+
+class ScriptedLLM(llm.LLM[Never]):
+    """Answers every request with `reply`, and keeps the requests."""
+
+    def __init__(self, reply: str) -> None:
+        super().__init__()
+        self.reply = reply
+        self.requests: list[llm.ChatContext] = []
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools: list[llm.FunctionTool | llm.RawFunctionTool] | None = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        parallel_tool_calls: NotGivenOr[bool] = NOT_GIVEN,
+        tool_choice: NotGivenOr[llm.ToolChoice] = NOT_GIVEN,
+        extra_kwargs: NotGivenOr[dict[str, Any]] = NOT_GIVEN,
+    ) -> llm.LLMStream:
+        self.requests.append(chat_ctx)
+        return ScriptedStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class ScriptedStream(llm.LLMStream):
+    async def _run(self) -> None:
+        assert isinstance(self._llm, ScriptedLLM)
+        self._event_ch.send_nowait(
+            llm.ChatChunk(id="scripted", delta=llm.ChoiceDelta(content=self._llm.reply))
+        )
+
+
+def _call(turns: int) -> llm.ChatContext:
+    ctx = llm.ChatContext()
+    ctx.add_message(role="system", content="You are a helpful voice AI assistant.")
+    ctx.add_message(role="assistant", content="The user information is: {'user_name': 'Ana'}")
+    for turn in range(turns):
+        ctx.add_message(role="user", content=f"Question number {turn}, about Python.")
+        ctx.add_message(role="assistant", content=f"Answer number {turn}. " * 10)
+    return ctx
+
+
+def _texts(ctx: llm.ChatContext) -> list[str]:
+    return [item.text_content or "" for item in ctx.items if isinstance(item, llm.ChatMessage)]
+
+
+def test_sliding_window_and_token_cap() -> None:
+    compactor = ContextCompactor(window_turns=3, window_step=1, max_tokens=10_000)
+    sent = _texts(compactor.compact(_call(10)))
+    # the preamble, then the last three turns
+    assert sent[:2] == ["You are a helpful voice AI assistant.", sent[1]]
+    assert sent[2] == "Question number 7, about Python."
+    assert len(sent) == 2 + 3 * 2
+
+    # the window moves three turns at a time, so requests keep the same prefix
+    compactor = ContextCompactor(window_turns=3, window_step=3, max_tokens=10_000)
+    for turns in (10, 11):
+        assert _texts(compactor.compact(_call(turns)))[2] == "Question number 6, about Python."
+    assert _texts(compactor.compact(_call(12)))[2] == "Question number 9, about Python."
+
+    call = _call(10)
+    preamble = sum(estimate_tokens(item) for item in call.items[:2])
+    compactor = ContextCompactor(window_turns=3, max_tokens=preamble + 100)
+    sent = _texts(compactor.compact(call))
+    assert sent[2] == "Question number 9, about Python."
+    assert compactor.max_tokens_sent <= preamble + 100
+    assert compactor.tokens_saved > 0
+
+
+@pytest.mark.asyncio
+async def test_old_turns_are_summarized_between_turns() -> None:
+    summarizer = ScriptedLLM("Ana is learning Python and asked six questions.")
+    compactor = ContextCompactor(summarizer, window_turns=3, max_tokens=10_000)
+
+    # until the summary arrives, turns that left the window are still sent
+    call = _call(10)
+    assert len(compactor.compact(call).items) == len(call.items)
+
+    compactor.summarize_later(call)
+    await compactor.summarized()
+    assert compactor.summaries == 1
+    request = summarizer.requests[0].items[-1]
+    assert isinstance(request, llm.ChatMessage)
+    assert "Question number 5" in (request.text_content or "")
+    assert "Question number 6" not in (request.text_content or "")
+
+    # the summary comes after the instructions and the per-call preamble, not as a system
+    # message, which would change the cached prefix
+    sent = compactor.compact(call).items
+    assert [item.role for item in sent[:3] if isinstance(item, llm.ChatMessage)] == [
+        "system",
+        "assistant",
+        "assistant",
+    ]
+    assert _texts(compactor.compact(call))[2:4] == [
+        f"Summary of the call so far: {summarizer.reply}",
+        "Question number 6, about Python.",
+    ]
+
+    # the next summary waits for the window to move, and only gets the turns that left it
+    for turn in (10, 11):
+        call.add_message(role="user", content=f"Question number {turn}, about Python.")
+        call.add_message(role="assistant", content=f"Answer number {turn}.")
+        compactor.summarize_later(call)
+        await compactor.summarized()
+    assert compactor.summaries == 2
+    request = summarizer.requests[1].items[-1]
+    assert isinstance(request, llm.ChatMessage)
+    assert summarizer.reply in (request.text_content or "")
+    assert "Question number 5" not in (request.text_content or "")
+    assert "Question number 8" in (request.text_content or "")
+    await compactor.aclose()
+
+
+def test_system_messages_come_first() -> None:
+    call = llm.ChatContext()
+    call.add_message(role="assistant", content="The user information is: {}")
+    call.add_message(role="system", content="You are a helpful voice AI assistant.")
+    call.add_message(role="user", content="Hola")
+    sent = ContextCompactor().compact(call).items
+    assert [item.role for item in sent if isinstance(item, llm.ChatMessage)] == [
+        "system",
+        "assistant",
+        "user",
+    ]
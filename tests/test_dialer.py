@@ -0,0 +1,112 @@
+import asyncio
+from typing import Any
+
+import pytest
+from livekit import api
+
+from calls.dialer import find_placed_call, place_call
+
+
+class FakeLiveKitAPI:
+    def __init__(self, sip_error: Exception | None = None) -> None:
+        self.sip_error = sip_error
+        self.calls: list[str] = []
+        self.participants: list[api.ParticipantInfo] = []
+        self.dispatches: list[api.AgentDispatch] = []
+        self.agent_dispatch = self
+        self.sip = self
+        self.room = self
+
+    async def create_dispatch(self, req: api.CreateAgentDispatchRequest) -> api.AgentDispatch:
+        self.calls.append("create_dispatch")
+        await asyncio.sleep(0.05)
+        return api.AgentDispatch(id="AD_1", room=req.room)
+
+    async def create_sip_participant(
+        self, req: api.CreateSIPParticipantRequest
+    ) -> api.SIPParticipantInfo:
+        self.calls.append("create_sip_participant")
+        await asyncio.sleep(0.05)
+        if self.sip_error:
+            raise self.sip_error
+        return api.SIPParticipantInfo(participant_id="PA_1", room_name=req.room_name)
+
+    async def delete_dispatch(self, dispatch_id: str, room_name: str) -> api.AgentDispatch:
+        self.calls.append(f"delete_dispatch {dispatch_id}")
+        return api.AgentDispatch(id=dispatch_id, room=room_name)
+
+    async def list_dispatch(self, room_name: str) -> list[api.AgentDispatch]:
+        self.calls.append("list_dispatch")
+        return self.dispatches
+
+    async def list_participants(
+        self, req: api.ListParticipantsRequest
+    ) -> api.ListParticipantsResponse:
+        return api.ListParticipantsResponse(participants=self.participants)
+
+
+async def _dial(lkapi: Any, **kwargs: Any):
+    return await place_call(
+        lkapi,
+        "+15550000000",
+        "{}",
+        agent_name="test-agent",
+        trunk_id="ST_test",
+        room_name_prefix="test-",
+        **kwargs,
+    )
+
+
+async def _find(lkapi: Any):
+    return await find_placed_call(lkapi, "room", agent_name="test-agent", metadata_json="{}")
+
+
+@pytest.mark.asyncio
+async def test_overlapped_dial_records_timings_without_list_dispatch() -> None:
+    lkapi = FakeLiveKitAPI()
+    result = await _dial(lkapi)
+
+    assert lkapi.calls == ["create_dispatch", "create_sip_participant"]
+    assert (result.dispatch_id, result.sip_participant_id) == ("AD_1", "PA_1")
+    assert result.timings.dispatch >= 0.05
+    assert result.timings.sip_participant >= 0.05
+    # Both requests ran concurrently, so the dial took about one round trip.
+    assert result.timings.total < 0.09
+
+
+@pytest.mark.asyncio
+async def test_failed_sip_participant_deletes_dispatch() -> None:
+    lkapi = FakeLiveKitAPI(sip_error=RuntimeError("busy"))
+    with pytest.raises(RuntimeError):
+        await _dial(lkapi, overlap=False)
+    assert lkapi.calls == ["create_dispatch", "create_sip_participant", "delete_dispatch AD_1"]
+
+
+@pytest.mark.asyncio
+async def test_sip_timeout_keeps_dispatch_for_the_retry() -> None:
+    # The phone may be ringing after a timeout, so the agent must stay dispatched.
+    lkapi = FakeLiveKitAPI(sip_error=TimeoutError())
+    with pytest.raises(TimeoutError):
+        await _dial(lkapi, overlap=False)
+    assert lkapi.calls == ["create_dispatch", "create_sip_participant"]
+
+
+@pytest.mark.asyncio
+async def test_find_placed_call_guards_retries() -> None:
+    lkapi = FakeLiveKitAPI()
+    lkapi.dispatches = [api.AgentDispatch(id="AD_old", room="room")]
+    assert await _find(lkapi) is None
+    assert lkapi.calls == ["list_dispatch", "delete_dispatch AD_old"]
+
+    lkapi.participants = [api.ParticipantInfo(identity="phone_user", sid="PA_old")]
+    placed = await _find(lkapi)
+    assert placed is not None
+    assert (placed.dispatch_id, placed.sip_participant_id) == ("AD_old", "PA_old")
+
+    # The phone rang but the agent's dispatch is gone: dispatch it again.
+    lkapi.dispatches = []
+    lkapi.calls.clear()
+    placed = await _find(lkapi)
+    assert placed is not None
+    assert (placed.dispatch_id, placed.sip_participant_id) == ("AD_1", "PA_old")
+    assert lkapi.calls == ["list_dispatch", "create_dispatch"]
@@ -0,0 +1,179 @@
+from pathlib import Path
+from typing import Never
+
+import pytest
+from livekit.agents import APIConnectOptions, tts
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS
+
+from shared.audio_cache import AudioCache
+from shared.cached_tts import CachedTTS, TTSCacheLookup
+from shared.greeting import GreetingCache
+
+SAMPLE_RATE = 8000
+
+
+class FakeTTS(tts.TTS[Never]):
+    """Synthesizes 10 ms of silence per character and records what it was asked for."""
+
+    def __init__(self, *, streaming: bool = False) -> None:
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=streaming),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+        )
+        self.requests: list[str] = []
+        self.streamed: list[str] = []
+
+    def stream(
+        self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> tts.SynthesizeStream:
+        return FakeSynthesizeStream(tts=self, conn_options=conn_options, streamed=self.streamed)
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> tts.ChunkedStream:
+        self.requests.append(text)
+        return FakeStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class FakeStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        output_emitter.initialize(
+            request_id="fake", sample_rate=SAMPLE_RATE, num_channels=1, mime_type="audio/pcm"
+        )
+        output_emitter.push(b"\x00\x00" * (SAMPLE_RATE // 100) * len(self.input_text))
+        output_emitter.flush()
+
+
+class FakeSynthesizeStream(tts.SynthesizeStream):
+    def __init__(
+        self, *, tts: tts.TTS[Never], conn_options: APIConnectOptions, streamed: list[str]
+    ) -> None:
+        super().__init__(tts=tts, conn_options=conn_options)
+        self.streamed = streamed
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        output_emitter.initialize(
+            request_id="fake",
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+            mime_type="audio/pcm",
+            stream=True,
+        )
+        output_emitter.start_segment(segment_id="fake")
+        text = "".join([data async for data in self._input_ch if isinstance(data, str)])
+        self.streamed.append(text)
+        output_emitter.push(b"\x00\x00" * (SAMPLE_RATE // 100) * len(text))
+        output_emitter.flush()
+
+
+@pytest.mark.asyncio
+async def test_greeting_sentences_are_cached_across_processes(tmp_path: Path) -> None:
+    template = "Hi {user_name}. This is Lyra. Where would you like to start?"
+    first_tts = FakeTTS()
+    greeting = GreetingCache(CachedTTS(first_tts, AudioCache(tmp_path), voice="v")).prepare(
+        template, user_name="Ana"
+    )
+    assert await greeting.ready()
+    frames = [frame async for frame in greeting.frames()]
+    assert sum(f.samples_per_channel for f in frames) * 2 == sum(
+        segment.result().nbytes for segment in greeting.segments
+    )
+    assert first_tts.requests == ["Hi Ana.", "This is Lyra.", "Where would you like to start?"]
+    # The sentence with the callee's name stays in memory.
+    assert len(list(tmp_path.glob("*.pcm"))) == 2
+
+    # A new job process starts with an empty memory tier and reads the rest from disk.
+    second_tts = FakeTTS()
+    greeting = GreetingCache(CachedTTS(second_tts, AudioCache(tmp_path), voice="v")).prepare(
+        template, user_name="Bruno"
+    )
+    assert await greeting.ready()
+    assert second_tts.requests == ["Hi Bruno."]
+
+
+@pytest.mark.asyncio
+async def test_cached_tts_replays_short_sentences(tmp_path: Path) -> None:
+    fake_tts = FakeTTS()
+    cached_tts = CachedTTS(fake_tts, AudioCache(tmp_path), voice="v", max_chars=30)
+    lookups: list[TTSCacheLookup] = []
+    cached_tts.on("cache_lookup", lookups.append)
+
+    async def speak(text: str) -> bytes:
+        async with cached_tts.synthesize(text) as stream:
+            return b"".join([ev.frame.data.tobytes() async for ev in stream])
+
+    first = await speak("Un momento,  por favor.")
+    assert await speak("Un momento, por favor.") == first
+    await speak("This sentence is too long to be worth caching.")
+    await speak("This sentence is too long to be worth caching.")
+
+    assert fake_tts.requests == [
+        "Un momento,  por favor.",
+        "This sentence is too long to be worth caching.",
+        "This sentence is too long to be worth caching.",
+    ]
+    assert [ev.hit for ev in lookups] == [False, True, False, False]
+    assert cached_tts.bytes_saved == lookups[1].audio_bytes > 0
+
+
+@pytest.mark.asyncio
+async def test_cached_tts_streams_long_sentences_from_the_provider(tmp_path: Path) -> None:
+    fake_tts = FakeTTS(streaming=True)
+    cached_tts = CachedTTS(fake_tts, AudioCache(tmp_path), voice="v", max_chars=30)
+    lookups: list[TTSCacheLookup] = []
+    cached_tts.on("cache_lookup", lookups.append)
+
+    async def speak(text: str) -> bytes:
+        async with cached_tts.stream() as stream:
+            stream.push_text(text)
+            stream.end_input()
+            return b"".join([ev.frame.data.tobytes() async for ev in stream])
+
+    long_sentence = "This sentence is too long to be worth caching."
+    reply = f"Un momento, por favor. {long_sentence}"
+    first = await speak(reply)
+    assert await speak(reply) == first
+
+    # Both misses went over the provider's stream, never its one-shot synthesis.
+    assert fake_tts.streamed == ["Un momento, por favor.", long_sentence, long_sentence]
+    assert fake_tts.requests == []
+    assert [ev.hit for ev in lookups] == [False, False, True, False]
+
+
+@pytest.mark.asyncio
+async def test_only_scripted_phrases_are_persisted(tmp_path: Path) -> None:
+    async def speak(cached_tts: CachedTTS, text: str) -> None:
+        async with cached_tts.synthesize(text) as stream:
+            _ = [ev async for ev in stream]
+
+    first = CachedTTS(FakeTTS(), AudioCache(tmp_path), voice="v", phrases=["Un momento."])
+    await speak(first, "Un momento.")
+    await speak(first, "Your order ships to Ana.")
+
+    # A new job process only finds the scripted phrase on disk.
+    fake_tts = FakeTTS()
+    second = CachedTTS(fake_tts, AudioCache(tmp_path), voice="v", phrases=["Un momento."])
+    await speak(second, "Un momento.")
+    await speak(second, "Your order ships to Ana.")
+    assert fake_tts.requests == ["Your order ships to Ana."]
+
+
+def test_audio_cache_maps_entries_from_disk(tmp_path: Path) -> None:
+    AudioCache(tmp_path).put("a", b"pcm")
+    cache = AudioCache(tmp_path)
+    pcm = cache.get("a")
+    assert pcm is not None and pcm.tobytes() == b"pcm"
+    assert "a" in cache._mapped  # pyright: ignore[reportPrivateUsage]
+    assert cache.get("missing") is None
+
+
+def test_audio_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = AudioCache(tmp_path, max_memory_bytes=10, max_disk_bytes=10)
+    cache.put("a", b"x" * 4)
+    cache.put("b", b"x" * 4)
+    assert cache.get("a") is not None  # a is now the most recent
+    cache.put("c", b"x" * 4)
+
+    assert list(cache._memory) == ["a", "c"]  # pyright: ignore[reportPrivateUsage]
+    assert len(list(tmp_path.glob("*.pcm"))) == 2
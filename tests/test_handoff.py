@@ -0,0 +1,154 @@
+import asyncio
+from typing import Any, Never
+
+import pytest
+from livekit.agents import (
+    DEFAULT_API_CONNECT_OPTIONS,
+    AgentSession,
+    APIConnectOptions,
+    ChatContext,
+    NotGivenOr,
+    RunContext,
+    llm,
+    stt,
+)
+from livekit.agents.llm import function_tool
+from livekit.agents.types import NOT_GIVEN
+from livekit.agents.utils import AudioBuffer
+
+from shared.config import SessionInfo
+from shared.context_compaction import ContextCompactor
+from shared.handoff import HandoffAgent, SharedSTTStream
+
+
+class ScriptedLLM(llm.LLM[Never]):
+    """Answers each request with the next reply: a text, or the name of a tool to call."""
+
+    def __init__(self, *replies: str) -> None:
+        super().__init__()
+        self.replies = list(replies)
+        self.requests: list[llm.ChatContext] = []
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools: list[llm.FunctionTool | llm.RawFunctionTool] | None = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        parallel_tool_calls: NotGivenOr[bool] = NOT_GIVEN,
+        tool_choice: NotGivenOr[llm.ToolChoice] = NOT_GIVEN,
+        extra_kwargs: NotGivenOr[dict[str, Any]] = NOT_GIVEN,
+    ) -> llm.LLMStream:
+        self.requests.append(chat_ctx)
+        return ScriptedStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class ScriptedStream(llm.LLMStream):
+    async def _run(self) -> None:
+        assert isinstance(self._llm, ScriptedLLM)
+        reply = self._llm.replies.pop(0)
+        if reply.startswith("tool:"):
+            call = llm.FunctionToolCall(name=reply[5:], arguments="{}", call_id=reply)
+            delta = llm.ChoiceDelta(role="assistant", tool_calls=[call])
+        else:
+            delta = llm.ChoiceDelta(role="assistant", content=reply)
+        self._event_ch.send_nowait(llm.ChatChunk(id="scripted", delta=delta))
+
+
+class SilentSTT(stt.STT[Never]):
+    """A streaming STT that hears nothing, and counts its streams."""
+
+    def __init__(self) -> None:
+        super().__init__(capabilities=stt.STTCapabilities(streaming=True, interim_results=False))
+        self.streams = 0
+
+    async def _recognize_impl(
+        self,
+        buffer: AudioBuffer,
+        *,
+        language: NotGivenOr[str] = NOT_GIVEN,
+        conn_options: APIConnectOptions,
+    ) -> stt.SpeechEvent:
+        raise NotImplementedError
+
+    def stream(
+        self,
+        *,
+        language: NotGivenOr[str] = NOT_GIVEN,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> stt.RecognizeStream:
+        self.streams += 1
+        return SilentStream(stt=self, conn_options=conn_options)
+
+
+class SilentStream(stt.RecognizeStream):
+    async def _run(self) -> None:
+        async for _ in self._input_ch:
+            pass
+
+
+class Greeter(HandoffAgent):
+    @function_tool
+    async def to_authenticator(self, _: RunContext[SessionInfo]):
+        """Hand the call to the authenticator."""
+        return await self.handoff("authenticator")
+
+
+class Authenticator(HandoffAgent):
+    @function_tool
+    async def to_main(self, context: RunContext[SessionInfo]):
+        """Hand the call to the main agent."""
+        context.userdata.authenticated = True
+        return await self.handoff("main")
+
+
+@pytest.mark.asyncio
+async def test_agents_hand_off_within_one_session() -> None:
+    model = ScriptedLLM(
+        "tool:to_authenticator", "What's your password?", "tool:to_main", "How can I help?"
+    )
+    speech = SilentSTT()
+    stt_stream = SharedSTTStream(speech)
+    compactor = ContextCompactor()
+    initial_ctx = ChatContext()
+    initial_ctx.add_message(role="assistant", content="The user information is: Ana")
+    info = SessionInfo(
+        {
+            "greeter": Greeter(
+                instructions="Greet",
+                chat_ctx=initial_ctx,
+                compactor=compactor,
+                stt_stream=stt_stream,
+            ),
+            "authenticator": Authenticator(
+                instructions="Authenticate", compactor=compactor, stt_stream=stt_stream
+            ),
+            "main": HandoffAgent(instructions="Help", compactor=compactor, stt_stream=stt_stream),
+        }
+    )
+
+    async with AgentSession[SessionInfo](userdata=info, llm=model, stt=speech) as session:
+        await session.start(info.agents["greeter"])
+        await session.run(user_input="Hi, this is Ana")
+        await session.run(user_input="My password is password")
+        await asyncio.sleep(0.1)
+
+        assert session.current_agent is info.agents["main"]
+        assert info.authenticated
+        assert info.prev_agent is info.agents["authenticator"]
+        assert len(info.handoff_latencies) == 2
+        # every agent listened on the same STT stream
+        assert (speech.streams, stt_stream.opened) == (1, 1)
+
+        # the main agent got the whole conversation, under its own instructions
+        texts = [
+            item.text_content
+            for item in model.requests[-1].items
+            if isinstance(item, llm.ChatMessage)
+        ]
+        assert texts[0] == "Help"
+        assert "Hi, this is Ana" in texts
+        assert "What's your password?" in texts
+        assert "My password is password" in texts
+
+    await stt_stream.aclose()
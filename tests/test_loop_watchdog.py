@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+import pytest
+
+from shared.loop_watchdog import LoopWatchdog
+
+
+def _slow_handler() -> None:
+    time.sleep(0.25)
+
+
+@pytest.mark.asyncio
+async def test_blocking_callback_is_reported_with_its_stack() -> None:
+    watchdog = LoopWatchdog(stall_threshold=0.1, interval=0.01)
+    watchdog.start()
+    await asyncio.sleep(0.1)
+    asyncio.get_running_loop().call_soon(_slow_handler)
+    await asyncio.sleep(0.1)
+    await watchdog.aclose()
+
+    assert watchdog.stall_count == 1
+    [stall] = watchdog.stalls
+    assert stall.duration == pytest.approx(0.25, abs=0.05)
+    assert "_slow_handler" in stall.stack
+
+    [(stack, count, seconds)] = watchdog.top_stacks()
+    assert (stack, count, seconds) == (stall.stack, 1, stall.duration)
+    summary = watchdog.summary()
+    assert summary["stalls"] == 1
+    assert summary["lag_max_ms"] >= 200
+    assert summary["lag_p50_ms"] < 20
+
+
+@pytest.mark.asyncio
+async def test_short_callbacks_are_not_stalls() -> None:
+    watchdog = LoopWatchdog(stall_threshold=0.1, interval=0.01)
+    watchdog.start()
+    for _ in range(5):
+        time.sleep(0.02)
+        await asyncio.sleep(0.02)
+    await watchdog.aclose()
+
+    assert watchdog.stall_count == 0
+    assert watchdog.top_stacks() == []
+    assert 0.01 <= watchdog.max_lag < 0.1
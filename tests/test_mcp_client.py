@@ -0,0 +1,111 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+
+import pytest
+import pytest_asyncio
+import uvicorn
+from livekit.agents.llm.tool_context import get_raw_function_info
+from mcp import types
+from mcp.server.fastmcp import FastMCP
+
+from shared.mcp_client import SharedMCPServer, parse_cached_tools
+
+
+class MCPStub:
+    """A local MCP server over streamable HTTP that counts the requests it serves."""
+
+    def __init__(self) -> None:
+        self.calls: dict[str, int] = {}
+        self.listings = 0
+        server = FastMCP("stub", stateless_http=True, log_level="WARNING")
+
+        @server.tool()
+        async def get_course(course_id: str) -> str:
+            """Read-only lookup."""
+            self.calls["get_course"] = self.calls.get("get_course", 0) + 1
+            await asyncio.sleep(0.2)
+            return f"course {course_id}"
+
+        @server.tool()
+        async def enroll(course_id: str) -> str:
+            """Has side effects, never cached."""
+            self.calls["enroll"] = self.calls.get("enroll", 0) + 1
+            return f"enrolled in {course_id}"
+
+        # count tools/list requests
+        handlers = server._mcp_server.request_handlers  # pyright: ignore[reportPrivateUsage]
+        list_tools = handlers[types.ListToolsRequest]
+
+        async def counting_list_tools(request: types.ListToolsRequest) -> types.ServerResult:
+            self.listings += 1
+            return await list_tools(request)
+
+        handlers[types.ListToolsRequest] = counting_list_tools  # pyright: ignore[reportArgumentType]
+        self.app = server.streamable_http_app()
+
+
+@pytest_asyncio.fixture
+async def stub() -> AsyncIterator[tuple[MCPStub, str]]:
+    stub = MCPStub()
+    server = uvicorn.Server(uvicorn.Config(stub.app, port=0, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield stub, f"http://127.0.0.1:{port}/mcp"
+    server.should_exit = True
+    await task
+
+
+def test_parse_cached_tools() -> None:
+    assert parse_cached_tools("get_course:60, get_paths", 300) == {
+        "get_course": 60.0,
+        "get_paths": 300.0,
+    }
+    assert parse_cached_tools("") == {}
+
+
+@pytest.mark.asyncio
+async def test_tool_list_is_shared_and_expires(stub: tuple[MCPStub, str]) -> None:
+    mcp_stub, url = stub
+    server = SharedMCPServer(url, tools_ttl=0.3)
+
+    # two agents starting at once share one session and one listing
+    first, second = await asyncio.gather(server.list_tools(), server.list_tools())
+    assert len(first) == len(second) == 2
+    assert mcp_stub.listings == 1
+
+    await asyncio.sleep(0.3)
+    await server.list_tools()
+    assert mcp_stub.listings == 2
+    await server.aclose()
+
+
+@pytest.mark.asyncio
+async def test_cached_tools_run_once_per_arguments(stub: tuple[MCPStub, str]) -> None:
+    mcp_stub, url = stub
+    server = SharedMCPServer(url, cached_tools={"get_course": 60})
+    tools = {get_raw_function_info(t).name: t for t in await server.list_tools()}
+    get_course, enroll = tools["get_course"], tools["enroll"]
+
+    # identical calls in flight share one request, independent ones run concurrently
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        get_course(raw_arguments={"course_id": "py"}),
+        get_course(raw_arguments={"course_id": "py"}),
+        get_course(raw_arguments={"course_id": "go"}),
+        get_course(raw_arguments={"course_id": "rs"}),
+    )
+    assert time.perf_counter() - started < 0.6
+    assert results[0] == results[1] != results[2]
+    assert mcp_stub.calls["get_course"] == 3
+
+    assert await get_course(raw_arguments={"course_id": "go"}) == results[2]
+    assert mcp_stub.calls["get_course"] == 3
+    assert (server.result_hits, server.result_misses) == (2, 3)
+
+    await enroll(raw_arguments={"course_id": "py"})
+    await enroll(raw_arguments={"course_id": "py"})
+    assert mcp_stub.calls["enroll"] == 2
+    await server.aclose()
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from shared.metadata import CallMetadata
+
+
+def test_round_trip_keeps_extra_fields_as_text() -> None:
+    record = {"user_name": " Ana ", "age": "41", "crm": {"plan": "pro", "visits": [1, 2]}}
+    metadata = CallMetadata.from_record(record)
+    assert (metadata.user_name, metadata.age) == ("Ana", 41)
+
+    decoded = CallMetadata.decode(metadata.encode())
+    assert decoded == metadata
+    assert decoded.extra == {"crm": {"plan": "pro", "visits": [1, 2]}}
+    assert decoded.describe() == (
+        'The user information is: {"age":41,"user_name":"Ana"}\n'
+        'More about the user: {"crm":{"plan":"pro","visits":[1,2]}}'
+    )
+
+
+def test_decode_accepts_plain_json_and_empty_metadata() -> None:
+    legacy = CallMetadata.decode(json.dumps({"user_name": "Luis", "age": 30}))
+    assert (legacy.user_name, legacy.age, legacy.extra) == ("Luis", 30, {})
+    assert CallMetadata.decode("") == CallMetadata()
+
+
+@pytest.mark.parametrize(
+    "record",
+    [{"age": "forty"}, {"age": 400}, {"user_name": 7}, {"when": object()}],
+)
+def test_invalid_records_are_rejected_on_dispatch(record: dict[str, object]) -> None:
+    with pytest.raises(ValueError):
+        CallMetadata.from_record(record)
+
+
+def test_size_limit_and_version() -> None:
+    metadata = CallMetadata.from_record({"notes": "x" * 2000})
+    with pytest.raises(ValueError, match="limit"):
+        metadata.encode(max_bytes=1000)
+    with pytest.raises(ValueError, match="limit"):
+        CallMetadata.decode(metadata.encode(), max_bytes=1000)
+    with pytest.raises(ValueError, match="version"):
+        CallMetadata.decode('2\n{"age":null,"user_name":null}\n{}')
+
+
+@pytest.mark.parametrize(
+    "wire",
+    [
+        "1\n[]\n{}",
+        '1\n{"age":true,"user_name":null}\n{}',
+        '1\n{"age":null,"user_name":null}\n{broken',
+        '1\n{"age":null,"user_name":null}\n[1]',
+        "1\n{not json\n{}",
+        "{broken",
+        "[" * 10_000,
+    ],
+)
+def test_malformed_wire_raises_value_error(wire: str) -> None:
+    with pytest.raises(ValueError):
+        CallMetadata.decode(wire)
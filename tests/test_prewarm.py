@@ -0,0 +1,27 @@
+from typing import Any
+
+from livekit.plugins import silero
+
+from shared.prewarm import load_models
+from shared.providers import ProviderRegistry
+
+
+class FakeProcess:
+    pid = 1234
+
+    def __init__(self) -> None:
+        self.userdata: dict[str, Any] = {}
+
+
+def test_load_models_fills_userdata_and_times_each_step() -> None:
+    proc = FakeProcess()
+    providers = ProviderRegistry()
+    llm = providers.register("llm", object)
+
+    timings = load_models(proc, providers)  # pyright: ignore[reportArgumentType]
+
+    assert isinstance(proc.userdata["vad"], silero.VAD)
+    assert proc.userdata["noise_cancellation"] is not None
+    assert llm.built
+    assert list(timings) == ["vad", "noise_cancellation", "turn_detector", "provider.llm"]
+    assert proc.userdata["prewarm_timings"] is timings
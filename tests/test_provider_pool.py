@@ -0,0 +1,89 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from shared.provider_pool import ProviderPool
+from shared.providers import ProviderEndpoint
+
+
+class ProviderStandIn:
+    def __init__(self) -> None:
+        self.connections: set[int] = set()
+        self.checks = 0
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        if request.transport is not None:
+            self.connections.add(id(request.transport))
+        if request.path == "/ws":
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            await ws.close()
+            return ws
+        self.checks += 1
+        if request.headers.get("Authorization") != "Token good":
+            return web.Response(status=401)
+        return web.Response(text="ok")
+
+
+@pytest_asyncio.fixture
+async def provider() -> AsyncIterator[tuple[ProviderStandIn, str]]:
+    stand_in = ProviderStandIn()
+    app = web.Application()
+    app.router.add_get("/{path:.*}", stand_in.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # pyright: ignore[reportOptionalMemberAccess, reportAttributeAccessIssue]
+    yield stand_in, f"http://127.0.0.1:{port}"
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_websocket_reuses_warmed_connection(provider: tuple[ProviderStandIn, str]) -> None:
+    stand_in, url = provider
+    async with aiohttp.ClientSession() as session:
+        pool = ProviderPool(
+            [
+                ProviderEndpoint("stt", f"{url}/v1/projects", {"Authorization": "Token good"}),
+                ProviderEndpoint("tts", f"{url}/voices/x", {"Authorization": "Token bad"}),
+            ],
+            session=session,
+        )
+        await pool.warm()
+        assert pool.healthy == {"stt": True, "tts": False}
+        warmed = len(stand_in.connections)
+
+        async with session.ws_connect(f"{url}/ws"):
+            pass
+        assert len(stand_in.connections) == warmed
+
+
+@pytest.mark.asyncio
+async def test_health_checks_stop_when_call_goes_idle(
+    provider: tuple[ProviderStandIn, str],
+) -> None:
+    stand_in, url = provider
+    async with aiohttp.ClientSession() as session:
+        pool = ProviderPool(
+            [ProviderEndpoint("stt", f"{url}/v1/projects", {"Authorization": "Token good"})],
+            session=session,
+            health_check_interval=0.01,
+            idle_timeout=0.05,
+        )
+        pool.start()
+        await asyncio.sleep(0.2)
+        checks = stand_in.checks
+        assert checks > 1
+        await asyncio.sleep(0.05)
+        assert stand_in.checks == checks
+
+        # activity resumes the checks
+        pool.touch()
+        await asyncio.sleep(0.03)
+        assert stand_in.checks > checks
+        await pool.aclose()
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from shared.providers import ProviderRegistry
+
+
+def test_providers_are_built_once_per_process(monkeypatch: pytest.MonkeyPatch) -> None:
+    providers = ProviderRegistry()
+    built: list[int] = []
+    llm = providers.register("llm", lambda: built.append(len(built)) or object())
+    providers.register("tts", object)
+
+    assert not built and not llm.built
+    assert llm.get() is llm.get()
+    assert list(providers.warm()) == ["tts"]
+
+    # A forked job process must not reuse the parent's instance.
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    assert not llm.built
+    llm.get()
+    assert built == [0, 1]
+
+    # A load test swaps in a stand-in, built on the next `get`.
+    llm.override(lambda: "stand-in")
+    assert llm.get() == "stand-in"
+
+    with pytest.raises(ValueError):
+        providers.register("llm", object)
+
+
+def test_agent_config_import_skips_provider_sdks() -> None:
+    code = (
+        "import sys, agents.starter.config\n"
+        "assert not [m for m in sys.modules if m.startswith('livekit.plugins')], sys.modules"
+    )
+    env = {**os.environ, "PYTHONPATH": str(Path(__file__).parent.parent / "src")}
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
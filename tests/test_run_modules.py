@@ -0,0 +1,13 @@
+import importlib
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["run", "agents.starter.run", "agents.authenticator.run"],
+)
+def test_worker_entrypoints_import(module: str) -> None:
+    worker = importlib.import_module(module)
+    assert callable(worker.entrypoint)
+    assert callable(worker.main)
@@ -0,0 +1,138 @@
+import asyncio
+import time
+from typing import Any, Never
+
+import pytest
+from livekit.agents import (
+    DEFAULT_API_CONNECT_OPTIONS,
+    Agent,
+    AgentSession,
+    APIConnectOptions,
+    NotGivenOr,
+    llm,
+    stt,
+)
+from livekit.agents.types import NOT_GIVEN
+from livekit.agents.voice.agent_activity import AgentActivity
+from livekit.agents.voice.audio_recognition import _EndOfTurnInfo, _PreemptiveGenerationInfo
+
+from shared.speculation import SpeculationTracker
+
+
+class ReplyLLM(llm.LLM[Never]):
+    """Answers every request with the same reply."""
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools: list[llm.FunctionTool | llm.RawFunctionTool] | None = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        parallel_tool_calls: NotGivenOr[bool] = NOT_GIVEN,
+        tool_choice: NotGivenOr[llm.ToolChoice] = NOT_GIVEN,
+        extra_kwargs: NotGivenOr[dict[str, Any]] = NOT_GIVEN,
+    ) -> llm.LLMStream:
+        return ReplyStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class ReplyStream(llm.LLMStream):
+    async def _run(self) -> None:
+        delta = llm.ChoiceDelta(role="assistant", content="Claro.")
+        self._event_ch.send_nowait(llm.ChatChunk(id="reply", delta=delta))
+
+
+def _hear(activity: AgentActivity, transcript: str) -> None:
+    """A final transcript, as the session's audio recognition reports it."""
+    activity.on_final_transcript(
+        stt.SpeechEvent(
+            type=stt.SpeechEventType.FINAL_TRANSCRIPT,
+            alternatives=[stt.SpeechData(language="es", text=transcript)],
+        )
+    )
+    activity.on_preemptive_generation(_PreemptiveGenerationInfo(transcript, 1.0))
+
+
+def _end_turn(activity: AgentActivity, transcript: str) -> None:
+    activity.on_end_of_turn(
+        _EndOfTurnInfo(
+            new_transcript=transcript,
+            transcription_delay=0.1,
+            end_of_utterance_delay=0.3,
+            transcript_confidence=1.0,
+            last_speaking_time=time.time(),
+        )
+    )
+
+
+async def _settle(session: AgentSession[Any]) -> None:
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if session.current_speech is None:
+            return
+
+
+@pytest.mark.asyncio
+async def test_preemptive_reply_is_discarded_for_a_newer_transcript() -> None:
+    tracker = SpeculationTracker()
+    async with AgentSession[None](llm=ReplyLLM(), preemptive_generation=True) as session:
+        tracker.attach(session)
+        await session.start(Agent(instructions="Help"))
+        activity = session._activity  # pyright: ignore[reportPrivateUsage]
+        assert activity is not None
+
+        # the session speculates on each final transcript, cancelling the previous reply
+        _hear(activity, "Hola")
+        await asyncio.sleep(0.05)
+        _hear(activity, "Hola, quiero aprender Python")
+        await asyncio.sleep(0.05)
+        _end_turn(activity, "Hola, quiero aprender Python")
+        await _settle(session)
+
+    early, kept = tracker.speculations.values()
+    assert early.wasted and early.lead_time is None
+    assert not kept.wasted and kept.lead_time is not None
+    assert tracker.summary()["used"] == 1
+    assert tracker.summary()["wasted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_speculation_stops_after_max_wasted() -> None:
+    tracker = SpeculationTracker(max_wasted=2)
+    async with AgentSession[None](llm=ReplyLLM(), preemptive_generation=True) as session:
+        tracker.attach(session)
+        await session.start(Agent(instructions="Help"))
+        activity = session._activity  # pyright: ignore[reportPrivateUsage]
+        assert activity is not None
+
+        _hear(activity, "Hola")
+        await asyncio.sleep(0.05)
+        _hear(activity, "Hola, quiero")
+        await asyncio.sleep(0.05)
+        assert session.options.preemptive_generation
+
+        # the turn was committed with a different transcript, so the second reply is
+        # cancelled too
+        _end_turn(activity, "Hola, quiero aprender")
+        await _settle(session)
+
+    assert not session.options.preemptive_generation
+    assert tracker.summary()["used"] == 0
+    assert tracker.summary()["wasted"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_reply_is_wasted_without_another_turn() -> None:
+    tracker = SpeculationTracker()
+    async with AgentSession[None](llm=ReplyLLM(), preemptive_generation=True) as session:
+        tracker.attach(session)
+        await session.start(Agent(instructions="Help"))
+        activity = session._activity  # pyright: ignore[reportPrivateUsage]
+        assert activity is not None
+
+        _hear(activity, "Hola")
+        await asyncio.sleep(0.05)
+        # cancels the speculative reply, and no turn or transcript follows
+        await session.interrupt()
+        await _settle(session)
+
+        assert tracker.summary()["wasted"] == 1
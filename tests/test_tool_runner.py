@@ -0,0 +1,98 @@
+import asyncio
+import inspect
+import time
+
+import pytest
+from livekit.agents import RunContext
+from livekit.agents.llm import ToolError
+
+from shared.context_compaction import ContextCompactor
+from shared.handoff import HandoffAgent
+from shared.tool_runner import ToolBudget, ToolExecution, ToolRunner, budgeted, parse_tool_budgets
+
+
+class FakeSession:
+    def __init__(self, agent: object = None) -> None:
+        self.said: list[str] = []
+        self.current_agent = agent
+
+    def say(self, text: str, *, add_to_chat_ctx: bool = True) -> None:
+        self.said.append(text)
+
+
+async def _slow(seconds: float) -> str:
+    await asyncio.sleep(seconds)
+    return "done"
+
+
+def test_parse_tool_budgets() -> None:
+    assert parse_tool_budgets("get_course:1:5, lookup_weather:0.5:3") == {
+        "get_course": ToolBudget(1, 5),
+        "lookup_weather": ToolBudget(0.5, 3),
+    }
+
+
+@pytest.mark.asyncio
+async def test_filler_after_soft_deadline_and_error_after_hard() -> None:
+    runner = ToolRunner(
+        default_budget=ToolBudget(soft=0.05, hard=0.2), fillers=["One moment, please."]
+    )
+    executions: list[ToolExecution] = []
+    runner.on("tool_executed", executions.append)
+    session = FakeSession()
+
+    assert await runner.run("fast", lambda: _slow(0.01), session=session) == "done"  # pyright: ignore[reportArgumentType]
+    assert await runner.run("slow", lambda: _slow(0.1), session=session) == "done"  # pyright: ignore[reportArgumentType]
+    assert session.said == ["One moment, please."]
+    with pytest.raises(ToolError):
+        await runner.run("stuck", lambda: _slow(1), session=session)  # pyright: ignore[reportArgumentType]
+
+    assert [(e.name, e.filler, e.timed_out) for e in executions] == [
+        ("fast", False, False),
+        ("slow", True, False),
+        ("stuck", True, True),
+    ]
+    assert executions[2].duration == pytest.approx(0.2, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_fillers_are_the_current_agents() -> None:
+    runner = ToolRunner(default_budget=ToolBudget(soft=0.01, hard=1), fillers=["One moment."])
+    agent = HandoffAgent(
+        compactor=ContextCompactor(),
+        fillers=["Un momento.", "Sigo en ello."],
+        instructions="You talk in spanish.",
+    )
+    session = FakeSession(agent)
+
+    for _ in range(3):
+        await runner.run("slow", lambda: _slow(0.05), session=session)  # pyright: ignore[reportArgumentType]
+    assert session.said == ["Un momento.", "Sigo en ello.", "Un momento."]
+
+    session.current_agent = HandoffAgent(compactor=ContextCompactor(), instructions="Hi.")
+    await runner.run("slow", lambda: _slow(0.05), session=session)  # pyright: ignore[reportArgumentType]
+    assert session.said[-1] == "One moment."
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded() -> None:
+    runner = ToolRunner(max_concurrency=2)
+    started = time.perf_counter()
+    await asyncio.gather(*(runner.run("t", lambda: _slow(0.1)) for _ in range(4)))
+    assert time.perf_counter() - started == pytest.approx(0.2, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_budgeted_keeps_the_tool_signature() -> None:
+    runner = ToolRunner(default_budget=ToolBudget(soft=1, hard=0.05))
+
+    @budgeted(lambda: runner)
+    async def lookup_weather(context: RunContext[None], location: str) -> str:
+        """Look up the weather."""
+        await asyncio.sleep(1)
+        return "sunny"
+
+    assert list(inspect.signature(lookup_weather).parameters) == ["context", "location"]
+    assert lookup_weather.__doc__ == "Look up the weather."
+    with pytest.raises(ToolError):
+        await lookup_weather(None, "Lima")  # pyright: ignore[reportArgumentType]
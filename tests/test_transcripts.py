@@ -0,0 +1,74 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from livekit.agents import ChatContext
+
+from shared.transcripts import (
+    TranscriptStream,
+    TranscriptWriter,
+    compact_transcript,
+    encode_chunks,
+    write_json_atomic,
+)
+
+
+def test_compact_chunks_match_json_dumps() -> None:
+    payload = {"items": [{"role": "user", "content": ["¿hola?"]}, {"n": 1}], "meta": {"a": None}}
+    encoded = "".join(encode_chunks(payload))
+    assert encoded == json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    assert "".join(encode_chunks(payload, indent=2)) == json.dumps(
+        payload, indent=2, ensure_ascii=False
+    )
+
+
+def test_failed_write_keeps_previous_file(tmp_path: Path) -> None:
+    path = tmp_path / "transcript.json"
+    write_json_atomic(path, {"items": [1]})
+    with pytest.raises(TypeError):
+        write_json_atomic(path, {"items": [object()]})
+    assert json.loads(path.read_text()) == {"items": [1]}
+    assert [p.name for p in tmp_path.iterdir()] == ["transcript.json"]
+
+
+@pytest.mark.asyncio
+async def test_writer_saves_session_history(tmp_path: Path) -> None:
+    chat_ctx = ChatContext()
+    chat_ctx.add_message(role="user", content="hola")
+    chat_ctx.add_message(role="assistant", content="¿en qué te ayudo?")
+
+    path = await TranscriptWriter(tmp_path / "output").write("t.json", chat_ctx.to_dict())
+
+    assert json.loads(path.read_text(encoding="utf-8")) == chat_ctx.to_dict()
+
+
+@pytest.mark.asyncio
+async def test_stream_flushes_items_and_compacts(tmp_path: Path) -> None:
+    chat_ctx = ChatContext()
+    first = chat_ctx.add_message(role="user", content="hola", created_at=2.0)
+    second = chat_ctx.add_message(role="assistant", content="buenas", created_at=1.0)
+    stream = TranscriptStream(tmp_path / "t.jsonl", flush_interval=60, max_batch=2)
+
+    stream.append(first)
+    stream.append(second)
+    await asyncio.sleep(0.05)
+    # The batch filled up, so it is on disk before the session ends.
+    assert len(stream.path.read_text().splitlines()) == 2
+
+    final_path = await stream.close()
+    assert final_path == tmp_path / "t.json"
+    assert not stream.path.exists()
+    items = json.loads((tmp_path / "t.json").read_text())["items"]
+    assert [item["id"] for item in items] == [second.id, first.id]
+
+
+def test_compaction_skips_line_truncated_by_crash(tmp_path: Path) -> None:
+    stream_path = tmp_path / "t.jsonl"
+    stream_path.write_text(
+        '{"id":"a","content":["v1"],"created_at":1}\n'
+        '{"id":"a","content":["v2"],"created_at":1}\n'
+        '{"id":"b","content":["cut'
+    )
+    assert compact_transcript(stream_path, tmp_path / "t.json") == 1
+    assert json.loads((tmp_path / "t.json").read_text())["items"][0]["content"] == ["v2"]
@@ -0,0 +1,86 @@
+import asyncio
+from collections import Counter
+
+import pytest
+from livekit import api
+
+from calls.trunks import Trunk, TrunkGovernor, parse_trunks
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.time = 0.0
+
+    def now(self) -> float:
+        return self.time
+
+    async def sleep(self, seconds: float) -> None:
+        self.time += seconds
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_governor_spaces_starts_at_trunk_cps() -> None:
+    clock = FakeClock()
+    governor = TrunkGovernor([Trunk("ST_a", calls_per_second=2, max_concurrent=10)], clock=clock)
+    starts: list[float] = []
+    for _ in range(4):
+        async with governor.acquire():
+            starts.append(clock.now())
+    assert starts == pytest.approx([0.0, 0.5, 1.0, 1.5])
+
+
+@pytest.mark.asyncio
+async def test_governor_caps_concurrent_channels() -> None:
+    clock = FakeClock()
+    governor = TrunkGovernor([Trunk("ST_a", calls_per_second=100, max_concurrent=2)], clock=clock)
+    release = asyncio.Event()
+    in_flight = 0
+    peak = 0
+
+    async def dial() -> None:
+        nonlocal in_flight, peak
+        async with governor.acquire():
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await release.wait()
+            in_flight -= 1
+
+    tasks = [asyncio.create_task(dial()) for _ in range(5)]
+    for _ in range(20):
+        await asyncio.sleep(0)
+    assert peak == 2
+    release.set()
+    await asyncio.gather(*tasks)
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_weighted_selection_and_throttle_backoff() -> None:
+    clock = FakeClock()
+    trunks = parse_trunks("ST_a:100:50:3,ST_b:100:50:1", "unused", 1, 1)
+    governor = TrunkGovernor(trunks, strategy="weighted", cooldown=5, clock=clock)
+    picks: Counter[str] = Counter()
+    for _ in range(8):
+        async with governor.acquire() as trunk_id:
+            picks[trunk_id] += 1
+        clock.time += 1  # refill both buckets so only the weights decide
+    assert picks == {"ST_a": 6, "ST_b": 2}
+
+    throttled_trunk = None
+    with pytest.raises(api.TwirpError):
+        async with governor.acquire() as throttled_trunk:
+            raise api.TwirpError("resource_exhausted", "slow down", status=429)
+    assert throttled_trunk is not None
+    stats = governor.stats()[throttled_trunk]
+    assert stats["rate"] == 50
+    assert stats["throttled"] == 1
+
+    # The throttled trunk sits out its cooldown while the other keeps dialing.
+    async with governor.acquire() as next_trunk:
+        assert next_trunk != throttled_trunk
+
+
+def test_unknown_strategy_is_rejected() -> None:
+    with pytest.raises(ValueError, match="least_loaded, weighted"):
+        TrunkGovernor([Trunk("ST_a", 1, 1)], strategy="roundrobin")  # pyright: ignore[reportArgumentType]
@@ -0,0 +1,95 @@
+import json
+from pathlib import Path
+
+import pytest
+from livekit.agents import metrics
+from livekit.agents.voice import (
+    AgentStateChangedEvent,
+    MetricsCollectedEvent,
+    SpeechCreatedEvent,
+    SpeechHandle,
+)
+
+from shared.turn_tracer import TurnTracer
+
+
+def _llm(speech_id: str, timestamp: float, duration: float, ttft: float) -> metrics.LLMMetrics:
+    return metrics.LLMMetrics(
+        label="llm",
+        request_id=speech_id,
+        timestamp=timestamp,
+        duration=duration,
+        ttft=ttft,
+        cancelled=False,
+        completion_tokens=10,
+        prompt_tokens=100,
+        prompt_cached_tokens=0,
+        total_tokens=110,
+        tokens_per_second=10,
+        speech_id=speech_id,
+    )
+
+
+def _tts(speech_id: str, timestamp: float, duration: float, ttfb: float) -> metrics.TTSMetrics:
+    return metrics.TTSMetrics(
+        label="tts",
+        request_id=speech_id,
+        timestamp=timestamp,
+        ttfb=ttfb,
+        duration=duration,
+        audio_duration=1.0,
+        cancelled=False,
+        characters_count=20,
+        streamed=True,
+        speech_id=speech_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_tracer_stitches_turn_waterfall(tmp_path: Path) -> None:
+    tracer = TurnTracer()
+    interrupted = SpeechHandle.create()
+    reply = SpeechHandle.create()
+
+    # A reply that was interrupted before it played must not take the playout.
+    tracer.on_speech_created(
+        SpeechCreatedEvent(speech_handle=interrupted, user_initiated=True, source="say")
+    )
+    interrupted._cancel()
+    tracer.on_speech_created(
+        SpeechCreatedEvent(speech_handle=reply, user_initiated=False, source="generate_reply")
+    )
+    tracer.on_metrics_collected(
+        MetricsCollectedEvent(
+            metrics=metrics.EOUMetrics(
+                timestamp=100.5,
+                end_of_utterance_delay=0.4,
+                transcription_delay=0.2,
+                on_user_turn_completed_delay=0.0,
+                last_speaking_time=100.0,
+                speech_id=reply.id,
+            )
+        )
+    )
+    tracer.on_agent_state_changed(
+        AgentStateChangedEvent(old_state="thinking", new_state="speaking", created_at=101.2)
+    )
+    # LLM and TTS report when their requests finish, after playout began.
+    tracer.on_metrics_collected(MetricsCollectedEvent(metrics=_llm(reply.id, 102.0, 1.55, 0.3)))
+    tracer.on_metrics_collected(MetricsCollectedEvent(metrics=_tts(reply.id, 102.5, 1.5, 0.15)))
+
+    path = await tracer.write(tmp_path / "call.turns.json")
+    assert path is not None
+    waterfall = json.loads(path.read_text())
+    [turn] = [t for t in waterfall["turns"] if t["speech_id"] == reply.id]
+    assert turn["latency_ms"] == 1200.0
+    assert turn["offsets_ms"] == {
+        "end_of_speech": 0.0,
+        "transcript_final": 200.0,
+        "turn_decided": 400.0,
+        "llm_started": 450.0,
+        "llm_first_token": 750.0,
+        "tts_first_byte": 1150.0,
+        "playout_started": 1200.0,
+    }
+    assert waterfall["summary"]["p50_ms"] == 1200.0
@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+
+import prometheus_client
+from livekit.agents import metrics
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from shared.tool_runner import ToolExecution
+from shared.voice_metrics import OtlpBackend, PrometheusBackend, VoiceMetrics
+
+LABELS = {"agent": "base-agent", "trunk": "ST_a"}
+
+
+def _session_metrics() -> list[metrics.AgentMetrics]:
+    return [
+        metrics.LLMMetrics(
+            label="llm",
+            request_id="r1",
+            timestamp=0,
+            duration=1.2,
+            ttft=0.4,
+            cancelled=False,
+            completion_tokens=20,
+            prompt_tokens=300,
+            prompt_cached_tokens=256,
+            total_tokens=320,
+            tokens_per_second=16,
+        ),
+        metrics.TTSMetrics(
+            label="tts",
+            request_id="r2",
+            timestamp=0,
+            ttfb=0.15,
+            duration=0.9,
+            audio_duration=2.0,
+            cancelled=False,
+            characters_count=42,
+            streamed=True,
+        ),
+        # Cancelled before the first byte: counts usage but not latency.
+        metrics.TTSMetrics(
+            label="tts",
+            request_id="r3",
+            timestamp=0,
+            ttfb=-1,
+            duration=0.1,
+            audio_duration=0,
+            cancelled=True,
+            characters_count=8,
+            streamed=True,
+        ),
+        metrics.EOUMetrics(
+            timestamp=0,
+            end_of_utterance_delay=0.6,
+            transcription_delay=0.25,
+            on_user_turn_completed_delay=0,
+            last_speaking_time=0,
+        ),
+    ]
+
+
+def test_prometheus_backend_records_labelled_histograms() -> None:
+    registry = prometheus_client.CollectorRegistry()
+    voice_metrics = VoiceMetrics(PrometheusBackend(registry), agent="base-agent")
+    # the SIP leg sets the trunk label, other participants leave it alone
+    voice_metrics.set_trunk(SimpleNamespace(attributes={"sip.trunkID": "ST_a"}))  # pyright: ignore[reportArgumentType]
+    voice_metrics.set_trunk(SimpleNamespace(attributes={}))  # pyright: ignore[reportArgumentType]
+    for ev in _session_metrics():
+        voice_metrics.collect(ev)
+
+    def sample(name: str) -> float | None:
+        return registry.get_sample_value(name, LABELS)
+
+    assert sample("voice_llm_ttft_seconds_count") == 1
+    assert sample("voice_llm_ttft_seconds_sum") == 0.4
+    assert sample("voice_tts_ttfb_seconds_count") == 1
+    assert sample("voice_eou_delay_seconds_sum") == 0.6
+    assert sample("voice_stt_transcription_delay_seconds_sum") == 0.25
+    assert sample("voice_llm_prompt_cached_tokens_total") == 256
+    assert sample("voice_tts_characters_total") == 50
+
+
+def test_otlp_backend_records_histograms() -> None:
+    reader = InMemoryMetricReader()
+    voice_metrics = VoiceMetrics(OtlpBackend(reader), agent="base-agent", trunk="ST_a")
+    for ev in _session_metrics():
+        voice_metrics.collect(ev)
+
+    data = reader.get_metrics_data()
+    assert data is not None
+    points = {
+        metric.name: metric.data.data_points[0]
+        for resource in data.resource_metrics
+        for scope in resource.scope_metrics
+        for metric in scope.metrics
+    }
+    ttft = points["voice_llm_ttft_seconds"]
+    assert (ttft.count, ttft.sum, dict(ttft.attributes or {})) == (1, 0.4, LABELS)  # pyright: ignore[reportAttributeAccessIssue]
+    assert points["voice_tts_characters"].value == 50  # pyright: ignore[reportAttributeAccessIssue]
+
+
+def test_tool_metrics_are_labelled_per_tool() -> None:
+    registry = prometheus_client.CollectorRegistry()
+    voice_metrics = VoiceMetrics(PrometheusBackend(registry), agent="base-agent", trunk="ST_a")
+    voice_metrics.collect_tool(ToolExecution("get_course", 2.5, filler=True))
+    voice_metrics.collect_tool(ToolExecution("get_course", 10.0, timed_out=True, filler=True))
+    voice_metrics.collect_tool(ToolExecution("enroll", 0.2))
+
+    def sample(name: str, tool: str) -> float | None:
+        return registry.get_sample_value(name, LABELS | {"tool": tool})
+
+    assert sample("voice_tool_duration_seconds_count", "get_course") == 2
+    assert sample("voice_tool_duration_seconds_sum", "enroll") == 0.2
+    assert sample("voice_tool_fillers_total", "get_course") == 2
+    assert sample("voice_tool_timeouts_total", "get_course") == 1
+    assert sample("voice_tool_timeouts_total", "enroll") is None
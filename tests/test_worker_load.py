@@ -0,0 +1,70 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from shared.worker_load import WorkerLoad
+
+
+class FakeJob:
+    def __init__(self, job_id: str) -> None:
+        self.id = job_id
+        self.answer: str | None = None
+
+    async def accept(self, **_: Any) -> None:
+        self.answer = "accepted"
+
+    async def reject(self) -> None:
+        self.answer = "rejected"
+
+
+def _worker(calls: int) -> Any:
+    return SimpleNamespace(active_jobs=[object()] * calls)
+
+
+@pytest.mark.asyncio
+async def test_calls_are_admitted_while_there_is_cpu_left() -> None:
+    cpu = 0.2
+    load = WorkerLoad(threshold=0.75, session_cpu=0.1, cpu=lambda: cpu)
+    assert load.load(_worker(0)) == pytest.approx(0.2)
+
+    # calls just accepted count before they show up in the CPU
+    jobs = [FakeJob(f"job-{i}") for i in range(6)]
+    for job in jobs:
+        await load.request(job)  # pyright: ignore[reportArgumentType]
+    assert [job.answer for job in jobs] == ["accepted"] * 5 + ["rejected"]
+    assert load.current_load() == pytest.approx(0.7)
+
+    # once running, the CPU per call is learned from them
+    load.ramp_up = 0
+    cpu = 0.8
+    for _ in range(20):
+        load.load(_worker(5))
+    assert load.session_cpu == pytest.approx(0.16, abs=0.01)
+    job = FakeJob("job-6")
+    await load.request(job)  # pyright: ignore[reportArgumentType]
+    assert job.answer == "rejected"
+
+    cpu = 0.4
+    for _ in range(20):
+        load.load(_worker(5))
+    await load.request(job)  # pyright: ignore[reportArgumentType]
+    assert job.answer == "accepted"
+    assert (load.accepted, load.rejected) == (6, 2)
+
+
+@pytest.mark.asyncio
+async def test_event_loop_lag_counts_as_load() -> None:
+    load = WorkerLoad(threshold=0.75, max_lag=0.05, cpu=lambda: 0.1)
+    await load.request(FakeJob("job-0"))  # pyright: ignore[reportArgumentType]
+
+    await asyncio.sleep(0.3)
+    time.sleep(0.3)  # a blocking call on the loop, past the sampler's next wake-up
+    await asyncio.sleep(0.3)
+
+    assert load.load(_worker(1)) == 1.0
+    job = FakeJob("job-1")
+    await load.request(job)  # pyright: ignore[reportArgumentType]
+    assert job.answer == "rejected"